@@ -0,0 +1,11 @@
+"""Repeatable timestring benchmarks.
+
+    $ python -m benchmarks --output results.json
+    $ python -m benchmarks --baseline results.json   # exits 1 on a regression
+    $ python -m benchmarks parse.range findall       # only these cases
+
+Each case reports microseconds per item (best and median of the repeats),
+items per second and the peak memory traced by tracemalloc during one run.
+See benchmarks/suite.py for the cases and benchmarks/corpus.py for the
+phrases.
+"""
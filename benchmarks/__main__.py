@@ -0,0 +1,52 @@
+import argparse
+import json
+import sys
+
+from . import suite
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Run the timestring benchmarks")
+    parser.add_argument('names', nargs='*', help="Only run cases starting with these names")
+    parser.add_argument('--output', '-o', metavar='FILE', help="Write the results as JSON")
+    parser.add_argument('--baseline', '-b', metavar='FILE',
+                        help="Compare against a previous --output and exit 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=suite.THRESHOLD,
+                        help="Allowed slow down as a fraction (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=suite.REPEAT)
+    parser.add_argument('--min-time', type=float, default=suite.MIN_TIME,
+                        help="Seconds per timed repeat (default: %(default)s)")
+    parser.add_argument('--list', action='store_true', help="List the cases and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        print('\n'.join(suite.CASES))
+        return 0
+
+    def report(name, result):
+        sys.stderr.write('%-28s %12.2f us %14.1f /s %10.1f KiB\n'
+                         % (name, result['median_us'], result['ops_per_s'], result['peak_kib']))
+
+    results = suite.run(args.names, repeat=args.repeat, min_time=args.min_time, report=report)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    status = 0
+    for name, time_ratio, memory_ratio, regressed in suite.compare(results, baseline, args.threshold):
+        print('%-28s time x%.2f  memory x%.2f%s'
+              % (name, time_ratio, memory_ratio, '  REGRESSION' if regressed else ''))
+        status = status or int(regressed)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
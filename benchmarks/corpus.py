@@ -0,0 +1,102 @@
+"""Benchmark phrases, grouped by the grammar family they exercise.
+
+The phrases are taken from tests/test_range.py and tests/test_date.py and
+kept here verbatim so results stay comparable when the tests change.
+"""
+from datetime import datetime, timedelta
+
+# The reference time of the test suite
+NOW = datetime(2017, 6, 16, 19, 37, 22)
+
+RANGE_PHRASES = dict(
+    relative_days=[
+        'today', 'tomorrow', 'yesterday', 'now', 'day after tomorrow',
+        'day before yesterday', 'this day', 'this hour', 'this minute', 'this second',
+    ],
+    weekdays=[
+        'monday', 'thursday', 'saturday', 'fri', 'sun', 'wed', 'next Friday',
+        'last thursday', 'this Saturday', 'previous wed', 'upcoming sun', 'last weekend',
+    ],
+    months=[
+        'april', 'june', 'december', 'feb', 'nov', 'next june', 'last may',
+        'this feb', 'previous nov', 'upcoming feb', 'January 2013', '2017 july',
+    ],
+    durations=[
+        'last 2 days', 'last 14 days', 'last 2.5 hours', 'last 24 months',
+        'next 10 weeks', 'next 2.5 years', 'next 4 hours', 'this week',
+        'last month', 'next year', 'current month', '10 months ago',
+    ],
+    relative=[
+        '2 days ago', '45 minutes from now', '2.5 weeks ago', 'in 20 hours',
+        'in 2.5 months', 'since 2 weeks ago', 'until 20 days from now',
+        'by 45 seconds from now', 'since last Friday', 'until next weekend',
+        'since this morning', 'by next month',
+    ],
+    absolute=[
+        '2011', '2011 nov', '2011 nov 11', '2011 nov 11 at 11:11:11',
+        'nov 11 at 11am', 'Jan 1st 2014 at 10 am', 'august 25th 7:30am',
+        'october 18, 2013 10:04:32 PM', 'since April 11, 2016', 'until April 2018',
+        '11:59pm on dec 31', '2014-03-06 15:33:43.764419-05',
+    ],
+    between=[
+        'between january 10 and jan 12', 'january 10 to jan 12',
+        'from january 10th 2010 to february 2nd 2010',
+        'from jan 10 2010 5 am to jan 10, 2010 9 am',
+        'between january 15th at 3 am and august 5th 5pm',
+        '2012 feb 2 1:13PM to 6:41 am on sept 8 2012',
+        'Thursday to Saturday', 'January to August', 'tomorrow 10am to 5pm',
+        '10am to 11pm', '7pm to 8pm', 'From 04/17/13 04:18:00 to 05/01/13 17:01:00',
+    ],
+    postgres=[
+        '["2013-12-09 06:57:46.54502-05",infinity)',
+        '["2013-12-09 06:57:46.54502-05","2013-12-10 00:00:00-05")',
+        '("2017-06-16 00:00:00+00","2017-06-17 00:00:00+00"]',
+    ],
+)
+
+DATE_PHRASES = dict(
+    relative_days=['today', 'tomorrow', 'yesterday', 'now', 'day after tomorrow'],
+    times=['11am', '11p', '11:11', '11:11:11', '11:59pm on Feb 28', '10 am'],
+    durations=['6d', '12h', '10 m', '10s', '2 days ago', '45 minutes from now', '2.5 weeks ago'],
+    absolute=[
+        '2011 nov 11 at 11:11', 'jan 10', 'feb 2011', 'Jan 1st 2014 at 10 am',
+        'october 18, 2013 10:04:32 PM', '2014-03-06 15:33:43.764419-05', '1497641842',
+    ],
+)
+
+SENTENCES = [
+    'once upon a time, about 3 weeks ago, there was a boy whom was born on august 15th at 7:20 am.',
+    'The quarterly report is due next friday and the review happens the day after tomorrow.',
+    'Shipments between january 10 and jan 12 were delayed until 2 days from now.',
+    'Nothing in this sentence mentions a time at all, it is only filler for the scanner.',
+    'Logs since 2 hours ago show 45 errors; the deploy at 11:59pm on dec 31 was rolled back.',
+    'We met on october 18, 2013 10:04:32 PM and again last tuesday.',
+    'Plain prose with numbers like 42 and 7 and words like may and march to tempt the grammar.',
+]
+
+
+FILLER = 'Nothing in this sentence mentions it at all, it is only filler for the scanner.'
+
+
+def document(size, every=1):
+    """:return: about `size` characters of prose mixing timestrings and filler
+
+    :param every: take one sentence of SENTENCES every `every` sentences and
+     FILLER otherwise
+    """
+    sentences = []
+    length = 0
+    while length < size:
+        n = len(sentences)
+        sentence = SENTENCES[n // every % len(SENTENCES)] if n % every == 0 else FILLER
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(sentences)
+
+
+def log_lines(count):
+    """:return: `count` syslog lines a second apart, ending at NOW"""
+    start = NOW - timedelta(seconds=count)
+    return ['%s web sshd[%d]: Accepted publickey for deploy from 10.0.0.%d'
+            % ((start + timedelta(seconds=n)).strftime('%b %d %H:%M:%S'), 500 + n % 97, n % 255)
+            for n in range(count)]
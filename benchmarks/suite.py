@@ -0,0 +1,480 @@
+"""Benchmark cases, the runner and the baseline comparison.
+
+A case is a function returning ``(run, items)``: `run` does the work once
+and `items` is how many phrases, values or characters it handles, so results
+are reported per item and stay comparable when the corpus grows.
+"""
+import atexit
+import gc
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+
+from timestring import Date, Range, findall
+from timestring.batch import UTC_EPOCH, get_zone, to_micros
+from timestring.utils import search
+from . import corpus
+
+CASES = OrderedDict()
+MIN_TIME = 0.05       # seconds per timed repeat
+REPEAT = 5
+THRESHOLD = 0.25      # a case regresses when 25% slower than the baseline
+MEMORY_FLOOR = 64     # KiB of peak growth ignored as noise
+
+
+def case(name):
+    """Register a case factory under `name`."""
+    def decorator(factory):
+        CASES[name] = factory
+        return factory
+    return decorator
+
+
+def _parse(cls, phrases, cached=False):
+    now = corpus.NOW
+
+    def run():
+        if not cached:
+            search.cache_clear()
+        for phrase in phrases:
+            cls(phrase, now=now)
+    return run, len(phrases)
+
+
+for _family, _phrases in corpus.RANGE_PHRASES.items():
+    case('parse.range.' + _family)(partial(_parse, Range, _phrases))
+for _family, _phrases in corpus.DATE_PHRASES.items():
+    case('parse.date.' + _family)(partial(_parse, Date, _phrases))
+
+
+@case('parse.range.cached')
+def parse_cached():
+    phrases = [phrase for phrases in corpus.RANGE_PHRASES.values() for phrase in phrases]
+    return _parse(Range, phrases, cached=True)
+
+
+@case('parse.range.persistent')
+def parse_persistent():
+    """Cold parses reading the grammar matches from a warm timestring.cache."""
+    from timestring import cache, utils
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    store = cache.PhraseCache(directory + '/phrases.sqlite')
+    phrases = [phrase for phrases in corpus.RANGE_PHRASES.values() for phrase in phrases]
+    parse, count = _parse(Range, phrases)
+
+    def run():
+        utils.persistent = store
+        try:
+            parse()
+        finally:
+            utils.persistent = None
+            store.flush()
+    return run, count
+
+
+@case('parse.range.results')
+def parse_results():
+    """Resolutions served by timestring.results until their boundary."""
+    from timestring.results import ResultCache
+    phrases = [phrase for phrases in corpus.RANGE_PHRASES.values() for phrase in phrases]
+    cache = ResultCache()
+    now = corpus.NOW
+
+    def run():
+        for phrase in phrases:
+            cache.get(phrase, now=now)
+    return run, len(phrases)
+
+
+@case('results.evaluate')
+def results_evaluate():
+    """One phrase at a year of hourly reference instants."""
+    from timestring.results import evaluate
+    nows = [corpus.NOW + timedelta(hours=hour) for hour in range(24 * 365)]
+    return partial(evaluate, 'last week', nows), len(nows)
+
+
+@case('results.evaluate.rows')
+def results_evaluate_rows():
+    """The same, one Range per instant, for comparison."""
+    nows = [corpus.NOW + timedelta(hours=hour) for hour in range(24 * 365)]
+
+    def run():
+        for now in nows:
+            Range('last week', now=now)
+    return run, len(nows)
+
+
+@case('findall.100k')
+def findall_document():
+    text = corpus.document(100000)
+    return partial(findall, text), len(text)
+
+
+@case('findall.sparse')
+def findall_sparse():
+    text = corpus.document(100000, every=100)
+    return partial(findall, text), len(text)
+
+
+def _dates(count):
+    start = Date(corpus.NOW)
+    return [Date(start.date - timedelta(minutes=(n * 7919) % 100003)) for n in range(count)]
+
+
+def _ranges(count):
+    return [Range(date, date.date + timedelta(hours=n % 48 + 1))
+            for n, date in enumerate(_dates(count))]
+
+
+@case('logs.general')
+def logs_general():
+    """The first timestring of each log line, the path timestring.logs replaces."""
+    lines = corpus.log_lines(1000)
+
+    def run():
+        search.cache_clear()
+        for line in lines:
+            try:
+                findall(line)
+            except ValueError:
+                pass
+    return run, len(lines)
+
+
+@case('logs.inferred')
+def logs_inferred():
+    from timestring.logs import infer
+    lines = corpus.log_lines(1000)
+    return (lambda: infer(lines, now=corpus.NOW).parse(lines)), len(lines)
+
+
+@case('compare.dates')
+def compare_dates():
+    dates = _dates(2000)
+    pairs = list(zip(dates, dates[1:] + dates[:1]))
+
+    def run():
+        for a, b in pairs:
+            a < b
+            a == b
+    return run, len(pairs)
+
+
+@case('sort.dates')
+def sort_dates():
+    dates = _dates(2000)
+    return partial(sorted, dates), len(dates)
+
+
+@case('sort.ranges')
+def sort_ranges():
+    ranges = _ranges(500)
+    return partial(sorted, ranges), len(ranges)
+
+
+@case('contains.ranges')
+def contains_ranges():
+    ranges = _ranges(500)
+    dates = _dates(500)
+
+    def run():
+        for _range, date in zip(ranges, dates):
+            date in _range
+    return run, len(ranges)
+
+
+@case('join.overlap')
+def join_overlap():
+    """Sessions against hourly windows, per Range of both sides."""
+    from timestring.join import join
+    sessions = _ranges(2000)
+    windows = list(Range(sessions[0].start.date - timedelta(days=80), corpus.NOW).split('hour'))
+
+    def run():
+        for _ in join(sessions, windows, index=True):
+            pass
+    return run, len(sessions) + len(windows)
+
+
+@case('arithmetic.plus_')
+def arithmetic_plus_():
+    date = Date(corpus.NOW)
+    steps = [(n, unit) for n in (1, 2.5, 12) for unit in
+             ('second', 'minute', 'hour', 'day', 'week', 'month', 'year')]
+
+    def run():
+        for num, unit in steps:
+            date.plus_(num, unit)
+    return run, len(steps)
+
+
+@case('arithmetic.plus')
+def arithmetic_plus():
+    date = Date(corpus.NOW)
+    durations = ['1 day', '3 weeks', '2 months', '10 minutes', '1 year', '-2 hours']
+
+    def run():
+        search.cache_clear()
+        for duration in durations:
+            date.plus(duration)
+    return run, len(durations)
+
+
+@case('arithmetic.range_plus')
+def arithmetic_range_plus():
+    _range = Range('this week', now=corpus.NOW)
+    durations = ['1 day', '3 weeks', '2 months', '10 minutes', '1 year', '-2 hours']
+
+    def run():
+        for duration in durations:
+            _range + duration
+    return run, len(durations)
+
+
+@case('arithmetic.shift')
+def arithmetic_shift():
+    from timestring.batch import shift
+    micros = _instants(10000)
+    return partial(shift, micros, 1, 'month', 'preserve'), len(micros)
+
+
+def _instants(count):
+    start = to_micros(datetime(2017, 1, 1))
+    return [start + (n * 7919) % 100003 * 300 * 10 ** 6 for n in range(count)]
+
+
+@case('batch.from_epoch')
+def batch_from_epoch():
+    """Millisecond unix times, unit detected, into a DateBatch."""
+    from timestring.batch import DateBatch
+    millis = array('q', (micros // 1000 for micros in _instants(10000)))
+    return partial(DateBatch.from_epoch, millis), len(millis)
+
+
+@case('batch.from_dates')
+def batch_from_dates():
+    """One Date(int) per second value, the per value path for comparison."""
+    from timestring.batch import DateBatch
+    seconds = [micros // 10 ** 6 for micros in _instants(10000)]
+    return (lambda: DateBatch.from_dates([Date(value) for value in seconds])), len(seconds)
+
+
+@case('zones.convert')
+def zones_convert():
+    from timestring.zones import convert
+    micros = _instants(10000)
+    return partial(convert, micros, 'US/Eastern'), len(micros)
+
+
+@case('zones.localize')
+def zones_localize():
+    from timestring.zones import localize
+    micros = _instants(10000)
+    return partial(localize, micros, 'US/Eastern', 'earliest', 'shift_forward'), len(micros)
+
+
+@case('zones.pytz')
+def zones_pytz():
+    """The per value conversion the tables replace, for comparison."""
+    zone = get_zone('US/Eastern')
+    values = [UTC_EPOCH + timedelta(microseconds=micros) for micros in _instants(10000)]
+    return (lambda: [value.astimezone(zone) for value in values]), len(values)
+
+
+@case('serialize.format')
+def serialize_format():
+    """Range.format, the strftime rendering the encoders replace."""
+    ranges = _ranges(1000)
+    return (lambda: [_range.format() for _range in ranges]), len(ranges)
+
+
+@case('serialize.iso')
+def serialize_iso():
+    from timestring.serialize import dumps
+    ranges = _ranges(1000)
+    return partial(dumps, ranges), len(ranges)
+
+
+@case('serialize.dict')
+def serialize_dict():
+    from timestring.serialize import dumps
+    ranges = _ranges(1000)
+    return partial(dumps, ranges, 'dict'), len(ranges)
+
+
+@case('serialize.batch')
+def serialize_batch():
+    from timestring.batch import RangeBatch
+    from timestring.serialize import dumps
+    batch = RangeBatch.from_ranges(_ranges(1000), tz='US/Eastern')
+    return partial(dumps, batch, 'dict'), len(batch)
+
+
+@case('serialize.loads')
+def serialize_loads():
+    from timestring.serialize import dumps, loads_ranges
+    text = dumps(_ranges(1000), 'dict')
+    return partial(loads_ranges, text), 1000
+
+
+def _parsed(count):
+    """Distinct Ranges parsed from phrases, carrying their phrase and pytz zone."""
+    phrases = [phrase for phrases in corpus.RANGE_PHRASES.values() for phrase in phrases]
+    ranges = []
+    while len(ranges) < count:
+        now = corpus.NOW - timedelta(minutes=len(ranges))
+        ranges.append(Range(phrases[len(ranges) % len(phrases)], now=now, tz='US/Eastern'))
+    return ranges
+
+
+@case('pickle.dumps')
+def pickle_dumps():
+    import pickle
+    ranges = _parsed(1000)
+    return partial(pickle.dumps, ranges, pickle.HIGHEST_PROTOCOL), len(ranges)
+
+
+@case('pickle.loads')
+def pickle_loads():
+    import pickle
+    text = pickle.dumps(_parsed(1000), pickle.HIGHEST_PROTOCOL)
+    return partial(pickle.loads, text), 1000
+
+
+@case('postgres.encode')
+def postgres_encode():
+    from timestring.postgres import copy_lines
+    ranges = _ranges(1000)
+    return (lambda: sum(1 for _ in copy_lines(ranges))), len(ranges)
+
+
+@case('postgres.decode')
+def postgres_decode():
+    from timestring.postgres import copy_lines, decode_ranges
+    lines = [line.rstrip('\n') for line in copy_lines(_ranges(1000))]
+    return partial(decode_ranges, lines), len(lines)
+
+
+@case('postgres.pack')
+def postgres_pack():
+    from timestring.postgres import pack_fields
+    ranges = _ranges(1000)
+    return partial(pack_fields, ranges), len(ranges)
+
+
+@case('postgres.unpack')
+def postgres_unpack():
+    from timestring.postgres import pack_fields, unpack_ranges
+    ranges = _ranges(1000)
+    return partial(unpack_ranges, pack_fields(ranges)), len(ranges)
+
+
+@case('postgres.adapt')
+def postgres_adapt():
+    """psycopg2 adaptation of query parameters, skipped without psycopg2."""
+    try:
+        from psycopg2.extensions import adapt
+    except ImportError:
+        return None
+    values = _ranges(500) + _dates(500)
+
+    def run():
+        for value in values:
+            adapt(value).getquoted()
+    return run, len(values)
+
+
+def _timed(run, loops):
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def _peak(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(run, items, repeat=REPEAT, min_time=MIN_TIME):
+    """Time `run` and trace its peak allocation.
+
+    :return: a result dict, times are per item
+    """
+    run()  # warm up imports and caches
+    loops = 1
+    while True:
+        elapsed = _timed(run, loops)
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed) + 1)
+    times = sorted([elapsed] + [_timed(run, loops) for _ in range(repeat - 1)])
+    per_item = [t / loops / items * 1e6 for t in times]
+    return OrderedDict(items=items,
+                       loops=loops,
+                       best_us=round(per_item[0], 4),
+                       median_us=round(per_item[len(per_item) // 2], 4),
+                       ops_per_s=round(1e6 / per_item[len(per_item) // 2], 1),
+                       peak_kib=round(_peak(run) / 1024, 1))
+
+
+def metadata():
+    return OrderedDict(python=sys.version.split()[0],
+                       implementation=platform.python_implementation(),
+                       platform=platform.platform(),
+                       created=time.strftime('%Y-%m-%dT%H:%M:%S'))
+
+
+def run(names=None, repeat=REPEAT, min_time=MIN_TIME, report=None):
+    """Run the cases whose name starts with one of `names` (all by default).
+
+    :param report: called with (name, result) after each case
+    :return: {"meta": ..., "results": {name: result}}
+    """
+    results = OrderedDict()
+    for name, factory in CASES.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        made = factory()
+        if made is None:
+            continue
+        results[name] = measure(made[0], made[1], repeat=repeat, min_time=min_time)
+        if report:
+            report(name, results[name])
+    return OrderedDict(meta=metadata(), results=results)
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Compare two runs case by case.
+
+    :return: a list of (name, time ratio, memory ratio, regressed) for the
+     cases found in both runs; a ratio above 1 means slower or bigger
+    """
+    rows = []
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        time_ratio = result['median_us'] / base['median_us'] if base['median_us'] else 1.0
+        memory_ratio = result['peak_kib'] / base['peak_kib'] if base['peak_kib'] else 1.0
+        regressed = time_ratio > 1 + threshold \
+            or (memory_ratio > 1 + threshold and result['peak_kib'] - base['peak_kib'] > MEMORY_FLOOR)
+        rows.append((name, time_ratio, memory_ratio, regressed))
+    return rows
@@ -1,19 +1,34 @@
 #!/usr/bin/env python
+import os
+import runpy
+
 from setuptools import setup
+from setuptools.command.build_py import build_py
 
 version = '1.6.2'
 classifiers = ["Development Status :: 5 - Production/Stable",
                "License :: OSI Approved :: Apache Software License",
                "Programming Language :: Python",
-               "Programming Language :: Python :: 2.6",
-               "Programming Language :: Python :: 2.7",
-               "Programming Language :: Python :: 3.2",
-               "Programming Language :: Python :: 3.3",
-               "Programming Language :: Python :: 3.4",
-               "Programming Language :: Python :: 3.5",
-               "Programming Language :: Python :: 3.6",
+               "Programming Language :: Python :: 3",
+               "Programming Language :: Python :: 3 :: Only",
+               "Programming Language :: Python :: 3.8",
+               "Programming Language :: Python :: 3.9",
+               "Programming Language :: Python :: 3.10",
+               "Programming Language :: Python :: 3.11",
+               "Programming Language :: Python :: 3.12",
                "Programming Language :: Python :: Implementation :: PyPy"]
 
+
+
+class BuildPy(build_py):
+    """Regenerate the prebuilt pattern (timestring/_pattern.py) from the grammar."""
+
+    def run(self):
+        grammar = runpy.run_path(os.path.join('timestring', 'timestring_re.py'))
+        grammar['write_pattern'](os.path.join('timestring', '_pattern.py'))
+        build_py.run(self)
+
+
 setup(name='timestring',
       version=version,
       description="Human expressed time to Dates and Ranges",
@@ -28,5 +43,8 @@ setup(name='timestring',
       packages=['timestring'],
       include_package_data=True,
       zip_safe=True,
+      python_requires='>=3.8',
       install_requires=["pytz"],
+      extras_require={'pandas': ['pandas']},
+      cmdclass={'build_py': BuildPy},
       entry_points={'console_scripts': ['timestring=timestring:main']})
@@ -0,0 +1,154 @@
+import random
+import unittest
+from array import array
+from datetime import datetime, timedelta
+
+import pytz
+
+from timestring import Date, TimestringInvalid
+from timestring.batch import DateBatch, RangeBatch, EPOCH, INFINITY, NEG_INFINITY, \
+    civil_from_days, days_from_civil, epoch_micros, floor, partition, shift, to_micros
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def micros(*args):
+    return to_micros(datetime(*args))
+
+
+def plus_(values, num, unit, eom):
+    """The expected results, one Date.plus_ at a time."""
+    return [to_micros(Date(EPOCH + timedelta(microseconds=value)).plus_(num, unit, eom=eom))
+            for value in values]
+
+
+def samples(count=2000, seed=1):
+    rnd = random.Random(seed)
+    return [rnd.randrange(-6 * 10 ** 16, 2 * 10 ** 17) for _ in range(count)] \
+        + [micros(2016, 1, 31, 5), micros(2016, 2, 29), micros(2017, 2, 28, 23, 59)]
+
+
+STEPS = [(num, unit) for num in (1, -1, 13, -25, 2.5, -0.3)
+         for unit in ('years', 'months', 'quarters', 'weeks', 'days', 'hours', 'seconds')]
+
+
+class T(unittest.TestCase):
+    def test_civil(self):
+        for days in range(-719000, 2900000, 997):
+            value = EPOCH + timedelta(days=days)
+            self.assertEqual(civil_from_days(days), (value.year, value.month, value.day))
+            self.assertEqual(days_from_civil(value.year, value.month, value.day), days)
+
+    def test_shift(self):
+        self.assertEqual(list(shift([micros(2016, 1, 31), INFINITY, NEG_INFINITY], 1, 'month')),
+                         [micros(2016, 2, 29), INFINITY, NEG_INFINITY])
+        self.assertEqual(list(shift([micros(2017, 2, 28)], 1, 'month', eom='preserve')),
+                         [micros(2017, 3, 31)])
+        values = samples()
+        for num, unit in STEPS:
+            for eom in ('clamp', 'preserve'):
+                self.assertEqual(list(shift(values, num, unit, eom)), plus_(values, num, unit, eom),
+                                 (num, unit, eom))
+        with self.assertRaises(TimestringInvalid):
+            shift(values, 1, 'fortnight')
+        with self.assertRaises(ValueError):
+            shift(values, 1, 'month', eom='overflow')
+
+    @unittest.skipUnless(numpy, 'numpy is not installed')
+    def test_shift_numpy(self):
+        values = samples() + [INFINITY, NEG_INFINITY]
+        for num, unit in STEPS:
+            for eom in ('clamp', 'preserve'):
+                shifted = shift(numpy.array(values), num, unit, eom)
+                self.assertIsInstance(shifted, numpy.ndarray)
+                self.assertEqual(list(shifted), list(shift(values, num, unit, eom)), (num, unit, eom))
+
+    def test_floor(self):
+        value = micros(2017, 8, 16, 19, 37, 22)
+        self.assertEqual(floor(value, 'year'), micros(2017, 1, 1))
+        self.assertEqual(floor(value, 'quarter'), micros(2017, 7, 1))
+        self.assertEqual(floor(value, 'month'), micros(2017, 8, 1))
+        self.assertEqual(floor(value, 'week'), micros(2017, 8, 14))
+        self.assertEqual(floor(value, 'week', week_start=7), micros(2017, 8, 13))
+        self.assertEqual(floor(value, 'day'), micros(2017, 8, 16))
+        self.assertEqual(floor(value, 'hours', 6), micros(2017, 8, 16, 18))
+        self.assertEqual(floor(value, 'minutes', 15), micros(2017, 8, 16, 19, 30))
+        self.assertEqual(floor(micros(1969, 12, 31, 23, 59), 'hour'), micros(1969, 12, 31, 23))
+        with self.assertRaises(TimestringInvalid):
+            floor(value, 'fortnight')
+
+    def test_partition(self):
+        start, end = micros(2017, 6, 1, 12), micros(2017, 6, 3)
+        self.assertEqual(list(partition(start, end, (1, 'day'))),
+                         [(start, micros(2017, 6, 2)), (micros(2017, 6, 2), end)])
+        self.assertEqual(list(partition(start, end, 3)),
+                         [(start, micros(2017, 6, 2)), (micros(2017, 6, 2), micros(2017, 6, 2, 12)),
+                          (micros(2017, 6, 2, 12), end)])
+        self.assertEqual(list(partition(start, start + 2, 5)), [(start, start + 1), (start + 1, start + 2)])
+        with self.assertRaises(TimestringInvalid):
+            list(partition(start, INFINITY, (1, 'day')))
+
+    def test_batches(self):
+        dates = DateBatch([micros(2017, 1, 31), INFINITY]).plus_(1, 'month')
+        self.assertEqual(list(dates.micros), [micros(2017, 2, 28), INFINITY])
+
+        # 2017-03-12 02:30 does not exist in US/Eastern, 2017-11-05 01:30 happens twice
+        aware = DateBatch([micros(2017, 2, 12, 7, 30), micros(2017, 10, 5, 5, 30)], tz='US/Eastern')
+        self.assertEqual(list(aware.plus_(1, 'month').micros),
+                         [micros(2017, 3, 12, 7), micros(2017, 11, 5, 5, 30)])
+        self.assertEqual(list(aware.plus_(1, 'day').micros),
+                         [micros(2017, 2, 13, 7, 30), micros(2017, 10, 6, 5, 30)])
+
+        ranges = RangeBatch([NEG_INFINITY, micros(2017, 11, 30)], [micros(2017, 1, 1), INFINITY])
+        moved = ranges.plus_(-1, 'quarter')
+        self.assertEqual(list(moved.starts), [NEG_INFINITY, micros(2017, 8, 30)])
+        self.assertEqual(list(moved.ends), [micros(2016, 10, 1), INFINITY])
+
+    def test_epoch(self):
+        instant = micros(2017, 6, 16, 19, 37, 22)
+        seconds = instant // 10 ** 6
+        mixed = [seconds, seconds * 1000 + 123, seconds * 10 ** 6 + 123456, seconds * 10 ** 9 + 123456789, 0]
+        expected = [instant, instant + 123000, instant + 123456, instant + 123456, 0]
+        self.assertEqual(list(epoch_micros(mixed)), expected)
+        self.assertEqual(list(epoch_micros(array('q', mixed))), expected)
+        self.assertEqual(list(epoch_micros(array('q', mixed).tobytes())), expected)
+        self.assertEqual(list(epoch_micros([seconds + 0.5, -1.5])), [instant + 500000, -1500000])
+        self.assertEqual(list(epoch_micros([seconds], 'ms')), [seconds * 1000])
+        self.assertEqual(list(epoch_micros(array('q', [instant]), 'us')), [instant])
+        self.assertEqual(list(epoch_micros([-1999], 'ns')), [-2])
+        with self.assertRaises(ValueError):
+            epoch_micros(mixed, 'seconds')
+
+        dates = DateBatch.from_epoch(mixed[:2], tz='US/Eastern')
+        self.assertEqual(dates[0].date, datetime(2017, 6, 16, 19, 37, 22, tzinfo=pytz.utc))
+        self.assertEqual(str(dates[1].date), '2017-06-16 15:37:22.123000-04:00')
+        ranges = RangeBatch.from_epoch([seconds], [seconds * 1000 + 1000])
+        self.assertEqual((ranges[0].start.date, ranges[0].end.date),
+                         (datetime(2017, 6, 16, 19, 37, 22, tzinfo=pytz.utc),
+                          datetime(2017, 6, 16, 19, 37, 23, tzinfo=pytz.utc)))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_epoch_numpy(self):
+        base = numpy.array(samples(), dtype='int64')
+        for unit, scale in (('s', 10 ** 6), ('ms', 10 ** 3), ('us', 1)):
+            values = base // scale
+            self.assertEqual(list(epoch_micros(values, unit)), [int(v) * scale for v in values])
+        values = base // 100
+        self.assertEqual(list(epoch_micros(values, 'ns')), [int(v) // 1000 for v in values])
+        mixed = numpy.array([1497641842, 1497641842123, 1497641842123456, 1497641842123456789])
+        self.assertEqual(list(epoch_micros(mixed)), list(epoch_micros(mixed.tolist())))
+        self.assertEqual(list(epoch_micros(mixed.astype('float64')))[:3], list(epoch_micros(mixed.tolist()))[:3])
+        self.assertEqual(list(epoch_micros(numpy.array([1.5, -1.5]), 's')), [1500000, -1500000])
+        # the same rounding with and without numpy
+        for unit, values in (('ns', [1497641842123456789.0, 1497641842123999744.0, -1999.5, 999.9]),
+                             ('auto', [1497641842123456789.0, 1497641842.0000025, 1497641842123.4567]),
+                             ('ms', [0.0015, -0.0015, 1.0005])):
+            values = numpy.array(values)
+            self.assertEqual(list(epoch_micros(values, unit)), list(epoch_micros(values.tolist(), unit)), unit)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks import suite
+
+
+class T(unittest.TestCase):
+    def test_run(self):
+        results = suite.run(['parse.date.relative_days', 'sort.dates'], repeat=2, min_time=0)
+        self.assertEqual(list(results['results']), ['parse.date.relative_days', 'sort.dates'])
+        result = results['results']['sort.dates']
+        self.assertEqual(result['items'], 2000)
+        self.assertGreater(result['median_us'], 0)
+        self.assertGreater(result['peak_kib'], 0)
+
+    def test_compare(self):
+        def results(median_us, peak_kib):
+            return dict(results=dict(case=dict(median_us=median_us, peak_kib=peak_kib)))
+
+        self.assertEqual(suite.compare(results(1.2, 100), results(1.0, 100)),
+                         [('case', 1.2, 1.0, False)])
+        self.assertTrue(suite.compare(results(1.5, 100), results(1.0, 100))[0][3])
+        # memory growth below the floor is noise
+        self.assertFalse(suite.compare(results(1.0, 20), results(1.0, 10))[0][3])
+        self.assertTrue(suite.compare(results(1.0, 400), results(1.0, 100))[0][3])
+        self.assertEqual(suite.compare(results(1.0, 1), dict(results={})), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
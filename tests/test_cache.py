@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import timestring
+from timestring import Date, Range, cache, utils
+from timestring.timestring_re import TIMESTRING_RE
+
+NOW = datetime(2017, 6, 16, 19, 37, 22)
+PHRASES = ['next 2 weeks', 'last friday at 10am', 'June 16th, 2017', 'nothing to see', 'in 3 days']
+
+
+def _parse(path):
+    cache.enable(path)
+    for phrase in PHRASES:
+        utils.search(phrase + ' (child %d)' % os.getpid())
+    cache.disable()
+
+
+class T(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'phrases.sqlite')
+
+    def tearDown(self):
+        cache.disable()
+        utils.search.cache_clear()
+        self.directory.cleanup()
+
+    def test_search(self):
+        expected = [(Range(phrase, now=NOW).start, Range(phrase, now=NOW).end)
+                    for phrase in ('next 2 weeks', 'last friday')]
+        store = cache.enable(self.path)
+        for phrase in PHRASES:
+            utils.search(phrase)
+        store.flush()
+        self.assertEqual(len(store), len(PHRASES))
+
+        # a new process would start with an empty LRU cache
+        utils.search.cache_clear()
+        fresh = cache.PhraseCache(self.path)
+        for phrase in PHRASES:
+            phrase = phrase.lower()
+            hit, match = fresh.get(phrase)
+            self.assertTrue(hit)
+            res = TIMESTRING_RE.search(phrase)
+            self.assertEqual(match, res.groupdict() if res else None)
+        self.assertEqual(fresh.get('not cached'), (False, None))
+
+        actual = [(Range(phrase, now=NOW).start, Range(phrase, now=NOW).end)
+                  for phrase in ('next 2 weeks', 'last friday')]
+        self.assertEqual(actual, expected)
+        self.assertEqual(Date('June 16th, 2017 at 10am', now=NOW), datetime(2017, 6, 16, 10))
+
+    def test_normalized(self):
+        store = cache.enable(self.path)
+        for phrase in ('Next Week', ' next week ', 'next week', 'NEXT WEEK'):
+            utils.search(phrase)
+        store.flush()
+        self.assertEqual(len(store), 1)
+        self.assertTrue(store.get('next week')[0])
+        self.assertEqual(Range('Next Week', now=NOW), Range('next week', now=NOW))
+
+    def test_processes(self):
+        env = dict(os.environ, TIMESTRING_CACHE=self.path)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(timestring.__file__)))
+        env['PYTHONPATH'] = root
+        subprocess.check_call([sys.executable, '-c', 'import timestring; timestring.Range("next 2 weeks")'],
+                              env=env)
+        self.assertTrue(cache.PhraseCache(self.path).get('next 2 weeks')[0])
+
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_parse, args=(self.path,)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(len(cache.PhraseCache(self.path)), 1 + 4 * len(PHRASES))
+
+    def test_eviction(self):
+        store = cache.PhraseCache(self.path, max_entries=10)
+        for number in range(100):
+            store.put('phrase %d' % number, None)
+        self.assertEqual(len(store), 10)
+        self.assertTrue(store.get('phrase 99')[0])
+        self.assertFalse(store.get('phrase 0')[0])
+        store.clear()
+        self.assertEqual(len(store), 0)
+
+    def test_grammar_change(self):
+        store = cache.PhraseCache(self.path)
+        store.put('next week', TIMESTRING_RE.search('next week').groupdict())
+        store.close()
+        db = sqlite3.connect(self.path)
+        db.execute("INSERT INTO phrases VALUES ('an old grammar', 'next month', NULL)")
+        db.commit()
+        db.close()
+        # left to the version that wrote them, until evicted or cleared
+        store = cache.PhraseCache(self.path)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.get('next month'), (False, None))
+        db = sqlite3.connect(self.path)
+        self.assertEqual(db.execute('SELECT count(*) FROM phrases').fetchone()[0], 2)
+        db.close()
+        store.clear()
+        self.assertEqual(len(store), 0)
+
+    def test_locked(self):
+        # another process holds the lock past the timeout
+        other = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(other.close)
+        other.execute('BEGIN EXCLUSIVE')
+        cache.enable(self.path, timeout=0.01)
+        with self.assertWarns(RuntimeWarning):
+            self.assertEqual(Date('3 hours ago', now=NOW), datetime(2017, 6, 16, 16, 37, 22))
+        locked = cache.PhraseCache(self.path, timeout=0.01)
+        with self.assertWarns(RuntimeWarning):
+            self.assertEqual(len(locked), 0)
+        with self.assertWarns(RuntimeWarning):
+            locked.clear()
+        other.execute('COMMIT')
+
+        store = cache.enable(self.path, timeout=0.01)
+        self.assertEqual(store.get('today'), (False, None))
+        other.execute('BEGIN IMMEDIATE')
+        for number in range(cache.FLUSH_EVERY - 1):
+            store.put('phrase %d' % number, None)
+        with self.assertWarns(RuntimeWarning):
+            store.put('last phrase', None)
+        other.execute('COMMIT')
+        self.assertEqual(len(store), 0)
+        store.put('phrase', None)
+        store.flush()
+        self.assertEqual(len(store), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+import unittest
+from io import StringIO
+from unittest import mock
+
+from freezegun import freeze_time
+
+from timestring import cli
+from timestring.cli import build_parser, run_stdin
+
+
+@freeze_time('2017-06-16 19:37:22')
+class T(unittest.TestCase):
+    def run_stdin(self, text, *argv):
+        args = build_parser().parse_args(['--stdin'] + list(argv))
+        stdout = StringIO()
+        status = run_stdin(args, stdin=StringIO(text), stdout=stdout)
+        return status, stdout.getvalue()
+
+    def test_jsonl(self):
+        status, out = self.run_stdin('today\nnext week\ntoday\n')
+        self.assertEqual(status, 0)
+        self.assertEqual([json.loads(line) for line in out.splitlines()], [
+            {'phrase': 'today', 'start': '2017-06-16T00:00:00', 'end': '2017-06-17T00:00:00'},
+            {'phrase': 'next week', 'start': '2017-06-19T00:00:00', 'end': '2017-06-26T00:00:00'},
+            {'phrase': 'today', 'start': '2017-06-16T00:00:00', 'end': '2017-06-17T00:00:00'},
+        ])
+
+    def test_csv(self):
+        text = 'id,when\n1,tomorrow\n2,"jan 1, 2017"\n'
+        status, out = self.run_stdin(text, '--csv-column', 'when', '--format', 'tsv', '--date')
+        self.assertEqual(out, 'phrase\tdate\n'
+                              'tomorrow\t2017-06-17T00:00:00\n'
+                              'jan 1, 2017\t2017-01-01T00:00:00\n')
+        status, out = self.run_stdin('1,tomorrow\n', '--csv-column', '1', '--format', 'csv',
+                                     '--timestamps', 'epoch', '--zone', 'UTC')
+        self.assertEqual(out.splitlines()[1], 'tomorrow,1497657600.0,1497744000.0')
+
+    def test_now(self):
+        status, out = self.run_stdin('today\n10 days\n', '--now', 'jan 5 2015 at 3pm', '--format', 'csv')
+        self.assertEqual(out.splitlines()[1:], [
+            'today,2015-01-05T00:00:00,2015-01-06T00:00:00',
+            '10 days,2014-12-26T15:00:00,2015-01-05T15:00:00',
+        ])
+
+    def test_errors(self):
+        status, out = self.run_stdin('today\ngarbage\n')
+        self.assertEqual(status, 1)
+        self.assertEqual(len(out.splitlines()), 1)
+
+        status, out = self.run_stdin('today\ngarbage\n', '--errors', 'skip')
+        self.assertEqual(status, 0)
+        self.assertEqual(len(out.splitlines()), 1)
+
+        status, out = self.run_stdin('garbage\n', '--errors', 'null')
+        self.assertEqual(json.loads(out), {'phrase': 'garbage', 'start': None, 'end': None,
+                                           'error': 'Invalid range: garbage'})
+
+    def test_cache(self):
+        text = 'today\nyesterday\ntoday\nnext week\ntoday\n'
+        with mock.patch.object(cli, '_resolve_safe', wraps=cli._resolve_safe) as resolved:
+            status, out = self.run_stdin(text * 20)
+            self.assertEqual(resolved.call_count, 3)
+        self.assertEqual(out, self.run_stdin(text)[1] * 20)
+        # only the CACHE_PHRASES last seen phrases are remembered
+        with mock.patch.multiple(cli, CACHE_PHRASES=1, CHUNK_LINES=2), \
+                mock.patch.object(cli, '_resolve_safe', wraps=cli._resolve_safe) as resolved:
+            status, out = self.run_stdin(text)
+            self.assertEqual(resolved.call_count, 5)
+        self.assertEqual(self.run_stdin(text), (status, out))
+
+    def test_workers(self):
+        text = 'today\nyesterday\nnext week\n' * 50
+        self.assertEqual(self.run_stdin(text, '--now', 'jan 5 2015', '--workers', '2'),
+                         self.run_stdin(text, '--now', 'jan 5 2015'))
+
+
+def main():
+    os.environ['TZ'] = 'UTC'
+    time.tzset()
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,16 @@
 import os
+import pickle
 import time
 import unittest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+import pytz
 
 from ddt import ddt
 from freezegun import freeze_time
 
-from timestring import Date, TimestringInvalid
+from timestring import Context, Date, TimestringInvalid
+from timestring.utils import search
 
 
 @freeze_time('2017-06-16 19:37:22')
@@ -45,6 +49,12 @@ class T(unittest.TestCase):
         self.assert_date('today', datetime(2017, 6, 16))
         # TODO: 13/5/2012
 
+        # nothing of now's clock is kept, nor a day the month does not have
+        now = datetime(2017, 1, 31, 12, 0, 0, 5)
+        self.assertEqual(Date('june 16 2017', now=now).date, datetime(2017, 6, 16))
+        self.assertEqual(Date('june', now=now).date, datetime(2017, 6, 1))
+        self.assertEqual(Date('february 28', now=now).date, datetime(2017, 2, 28))
+
     def test_time_formats(self):
         for time_str in ['11am', '11 AM', '11a', "11 o'clock", '11 oclock',]:
             self.assert_date(time_str, datetime(2017, 6, 17, 11, 0, 0))
@@ -117,9 +127,10 @@ class T(unittest.TestCase):
 
     def test_plus(self):
         date_1 = Date('jan 10')
-        date_1.microsecond = 1
         date_2 = Date('jan 11')
-        date_2.microsecond = 1
+        with self.assertWarns(DeprecationWarning):
+            date_1.microsecond = 1
+            date_2.microsecond = 1
         self.assertEqual(date_1 + '1 day', date_2)
 
         date1 = Date('october 18, 2013 10:04:32 PM')
@@ -128,26 +139,56 @@ class T(unittest.TestCase):
 
     def test_minus(self):
         date_1 = Date('jan 10')
-        date_1.microsecond = 1
         date_2 = Date('jan 5')
-        date_2.microsecond = 1
+        with self.assertWarns(DeprecationWarning):
+            date_1.microsecond = 1
+            date_2.microsecond = 1
         self.assertEqual(Date(date_1) - '5 days', date_2)
 
+    def test_replace(self):
+        date_1 = Date('jan 10').replace(microsecond=1)
+        self.assertEqual(date_1 + '1 day', Date('jan 11').replace(microsecond=1))
+        self.assertEqual(Date(date_1) - '5 days', Date('jan 5').replace(microsecond=1))
+        self.assertEqual(date_1.microsecond, 1)
+        self.assertEqual(Date('jan 10').microsecond, 0)
+
     def test_adjustment(self):
         d = Date('Jan 1st 2014 at 10 am')
         self.assert_date(d, datetime(2014, 1, 1, 10))
 
-        d.hour = 5
-        d.day = 15
-        d.month = 4
-        d.year = 2013
-        d.minute = 40
-        d.second = 14
-        d.microsecond = 10001
+        with self.assertWarns(DeprecationWarning):
+            d.hour = 5
+            d.day = 15
+            d.month = 4
+            d.year = 2013
+            d.minute = 40
+            d.second = 14
+            d.microsecond = 10001
         self.assertEqual(d, datetime(2013, 4, 15, 5, 40, 14, 10001))
 
         self.assertEqual(str(d.date), '2013-04-15 05:40:14.010001')
 
+    def test_values(self):
+        date = Date('Jan 1st 2014 at 10 am')
+        moved = [date.replace(hour=5), date.plus_(1, 'day'), date + '1 hour', date + 60,
+                 date + timedelta(days=1), date - '1 day', date - timedelta(days=1)]
+        self.assertEqual(date, datetime(2014, 1, 1, 10))
+        self.assertEqual(len(set(id(value) for value in moved + [date])), len(moved) + 1)
+        self.assertIs(Date(date).date, date.date)
+        infinity = Date('infinity')
+        self.assertIs(infinity + '1 day', infinity)
+        self.assertIs(infinity.replace(hour=1), infinity)
+
+        Date.mutable = False
+        try:
+            with self.assertRaises(AttributeError):
+                date.hour = 5
+            with self.assertRaises(AttributeError):
+                date.tz = 'US/Eastern'
+        finally:
+            Date.mutable = True
+        self.assertEqual(date, datetime(2014, 1, 1, 10))
+
     def test_next_prev(self):
         # Month
 
@@ -200,7 +241,7 @@ class T(unittest.TestCase):
         self.assert_date('2 seconds ago', datetime(2017, 6, 16, 19, 37, 20))
 
         # Implicit change of year, month, date etc
-        self.assert_date('10 months ago', datetime(2016, 4, 16, 19, 37, 22))
+        self.assert_date('10 months ago', datetime(2016, 8, 16, 19, 37, 22))
         self.assert_date('20 days ago', datetime(2017, 5, 27, 19, 37, 22))
         self.assert_date('20 hours ago', datetime(2017, 6, 15, 23, 37, 22))
         self.assert_date('45 minutes ago', datetime(2017, 6, 16, 18, 52, 22))
@@ -238,6 +279,73 @@ class T(unittest.TestCase):
         self.assert_date('in 45 minutes', datetime(2017, 6, 16, 20, 22, 22))
         self.assert_date('in 45 seconds', datetime(2017, 6, 16, 19, 38, 7))
 
+    def test_from_fields(self):
+        search.cache_clear()
+        for phrase, fields in (('june 16 2017 at 10:30', dict(year=2017, month=6, day=16, hour=10, minute=30)),
+                               ('next friday', dict(weekday=5, direction='next')),
+                               ('last monday', dict(weekday='Monday', direction='last')),
+                               ('tomorrow at 10pm', dict(relative_day='tomorrow', hour=22)),
+                               ('feb', dict(month=2)),
+                               ('this evening', dict(daytime='evening', direction='this')),
+                               ('in 3 days', dict(num=3, unit='days', sign=1)),
+                               ('2.5 hours ago', dict(num=2.5, unit='hours', sign=-1))):
+            self.assertEqual(Date.from_fields(**fields).date, Date(phrase).date, phrase)
+        self.assertEqual(Date.from_fields(weekday=1, context=Context.PREV), datetime(2017, 6, 12))
+        self.assertEqual(Date.from_fields(year=2017, tz='US/Eastern').tz.zone, 'US/Eastern')
+
+        search.cache_clear()
+        Date.from_fields(year=2017, month=6, day=16)
+        self.assertEqual(search.cache_info().currsize, 0)
+
+        with self.assertRaises(TimestringInvalid):
+            Date.from_fields(month=13)
+        with self.assertRaises(TimestringInvalid):
+            Date.from_fields(weekday=8)
+        with self.assertRaises(ValueError):
+            Date.from_fields(weekday=1, direction='previous')
+        with self.assertRaises(ValueError):
+            Date.from_fields(num=2, unit='days', sign=2)
+
+    def test_pickle(self):
+        eastern = pytz.timezone('US/Eastern')
+        dates = [Date('today'), Date('infinity'), Date('2017-06-16 10:00:00', tz='UTC'),
+                 Date(eastern.localize(datetime(2017, 12, 16, 10, 0, 0, 5))),
+                 Date(datetime(2017, 6, 16, tzinfo=timezone(timedelta(hours=-2))))]
+        for date in dates:
+            restored = pickle.loads(pickle.dumps(date))
+            self.assertEqual(restored, date)
+            self.assertEqual(str(restored), str(date))
+            self.assertEqual(restored.tz, date.tz)
+        self.assertEqual(pickle.loads(pickle.dumps(dates[3])).tz.zone, 'US/Eastern')
+        # the offset of pytz's default tzinfo (LMT) survives, not only the instant
+        lmt = Date('2017-06-16 19:37:22').replace(tzinfo=eastern)
+        restored = pickle.loads(pickle.dumps(lmt))
+        self.assertEqual(restored.date, lmt.date)
+        self.assertEqual((restored.hour, restored.minute), (19, 37))
+        self.assertEqual(restored.date.utcoffset(), lmt.date.utcoffset())
+        # only the instant and the zone name are kept
+        date = Date('next friday at 10am', tz='US/Eastern')
+        self.assertLess(len(pickle.dumps(date)) * 2, len(pickle.dumps(date.__dict__)))
+
+    def test_calendar_arithmetic(self):
+        self.assertEqual(Date('2017-12-15').plus_(1, 'month'), datetime(2018, 1, 15))
+        self.assertEqual(Date('2017-01-15').plus_(-1, 'month'), datetime(2016, 12, 15))
+        self.assertEqual(Date('2017-06-15').plus_(-18, 'months'), datetime(2015, 12, 15))
+        self.assertEqual(Date('2016-01-31').plus_(1, 'month'), datetime(2016, 2, 29))
+        self.assertEqual(Date('2017-01-31').plus_(3, 'months'), datetime(2017, 4, 30))
+        self.assertEqual(Date('2017-02-28').plus_(1, 'month'), datetime(2017, 3, 28))
+        self.assertEqual(Date('2017-02-28').plus_(1, 'month', eom='preserve'), datetime(2017, 3, 31))
+        self.assertEqual(Date('2017-04-30').plus_(-2, 'month', eom='preserve'), datetime(2017, 2, 28))
+        self.assertEqual(Date('2016-02-29').plus_(1, 'year'), datetime(2017, 2, 28))
+        self.assertEqual(Date('2016-02-29').plus_(-4, 'years'), datetime(2012, 2, 29))
+        self.assertEqual(Date('2017-11-30').plus_(1, 'quarter'), datetime(2018, 2, 28))
+        self.assertEqual(Date('2017-02-15').plus_(1, 'quarter', sign=-1), datetime(2016, 11, 15))
+        self.assertEqual(Date('2017-01-01').plus_(1.5, 'month'), datetime(2017, 2, 16))
+        with self.assertRaises(ValueError):
+            Date('2017-01-01').plus_(1, 'month', eom='overflow')
+        with self.assertRaises(TimestringInvalid):
+            Date(datetime(9999, 6, 1)).plus_(1, 'year')
+
 
 def main():
     os.environ['TZ'] = 'UTC'
@@ -0,0 +1,47 @@
+import os
+import random
+import time
+import unittest
+
+from freezegun import freeze_time
+
+from timestring import Date, Range, findall, _scan, _windows
+from timestring.timestring_re import TIMESTRING_RE
+
+PHRASES = ['today', 'next week', '3 weeks ago', 'august 15th at 7:20 am', 'between january 10 and jan 12',
+           'last 2.5 days', '2017-06-16', "'17", '10pm', 'noon', '1497641842', 'this time', 'in 2 days']
+FILLER = ['the', 'quick', 'fox', "it's", 'was', 'a', 'd', 'S', 'm', 'in', 'by', 'at', 'on', 'and', 'to',
+          ';', '(', ')', '!', '?', '"', '.', ',', '-', '/', ':', '@', '<', '>=', '5.5', '.5', '5.',
+          'MAY', 'Sun', 'Mon', 'ſun', 'K', 'İ', 'café']
+
+
+@freeze_time('2017-06-16 19:37:22')
+class T(unittest.TestCase):
+    def test_findall(self):
+        text = "once upon a time, about 3 weeks ago, there was a boy whom was born on august 15th at 7:20 am. epic."
+        results = findall(text)
+        self.assertEqual([phrase for phrase, _ in results], ['3 weeks ago,', 'august 15th at 7:20 am'])
+        self.assertEqual(results[0][1], Date('3 weeks ago'))
+        self.assertIsInstance(findall('from jan 10 to jan 12!')[0][1], Range)
+        self.assertEqual(findall('Nothing to see here. Really!'), [])
+
+    def test_windows(self):
+        text = 'No dates here. But next week (perhaps) works!'
+        self.assertEqual([text[start:end] for start, end in _windows(text)], [' But next week '])
+
+    def test_same_as_findall(self):
+        rand = random.Random(7)
+        for _ in range(2000):
+            words = [rand.choice(PHRASES + FILLER) for _ in range(rand.randint(1, 12))]
+            text = rand.choice([' ', '', '.', '\n', ', ', '!']).join(words)
+            self.assertEqual(_scan(text), TIMESTRING_RE.findall(text), text)
+
+
+def main():
+    os.environ['TZ'] = 'UTC'
+    time.tzset()
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
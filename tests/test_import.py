@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import timestring
+from timestring import timestring_re
+
+# Cumulative `import timestring` time with warm bytecode caches
+IMPORT_BUDGET_US = 75000
+LAZY_MODULES = ('pytz', 'word2number', 'psycopg2', 'argparse', 'sqlite3', 'timestring.postgres')
+
+
+class T(unittest.TestCase):
+    def importtime(self):
+        """:return: {module: cumulative microseconds} of a fresh `import timestring`"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(timestring.__file__)))
+        with tempfile.TemporaryDirectory() as cache:
+            env = dict(os.environ, PYTHONPYCACHEPREFIX=cache, PYTHONPATH=root)
+            env.pop('PYTHONDONTWRITEBYTECODE', None)
+            command = [sys.executable, '-X', 'importtime', '-c', 'import timestring']
+            subprocess.check_call(command, env=env, stderr=subprocess.DEVNULL)
+            stderr = subprocess.run(command, env=env, stderr=subprocess.PIPE,
+                                    universal_newlines=True, check=True).stderr
+        modules = {}
+        for line in stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                _, cumulative, name = line.split('|')
+                if cumulative.strip().isdigit():
+                    modules[name.strip()] = int(cumulative)
+        return modules
+
+    def test_importtime(self):
+        modules = self.importtime()
+        for name in LAZY_MODULES:
+            self.assertNotIn(name, modules)
+        self.assertLess(modules['timestring'], IMPORT_BUDGET_US)
+
+    def test_prebuilt_pattern(self):
+        # Regenerate with `python timestring/timestring_re.py`
+        from timestring import _pattern
+        self.assertEqual(_pattern.GRAMMAR, timestring_re.GRAMMAR)
+        self.assertEqual(_pattern.PATTERN, timestring_re.strip(timestring_re.GRAMMAR))
+        self.assertEqual(timestring_re.TIMESTRING_RE.pattern, _pattern.PATTERN)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime
+
+from timestring import Date, Range, TimestringInvalid, instrument
+from timestring import utils
+
+NOW = datetime(2017, 6, 16, 19, 37, 22)
+
+
+class T(unittest.TestCase):
+    def tearDown(self):
+        instrument.disable()
+
+    def test_disabled(self):
+        init = Range.__dict__['__init__']
+        with instrument.collect():
+            self.assertIsNot(Range.__dict__['__init__'], init)
+            self.assertTrue(instrument.enabled())
+        self.assertIs(Range.__dict__['__init__'], init)
+        self.assertIs(Range.__init__.__globals__['search'], utils.search)
+        self.assertFalse(instrument.enabled())
+
+    def test_records(self):
+        records = []
+        instrument.enable(records.append)
+        r = Range('next 2 weeks', now=NOW)
+        Date('today', now=NOW).plus_(2, 'day')
+        with self.assertRaises(TimestringInvalid):
+            Range('garbage')
+        instrument.disable(records.append)
+
+        self.assertEqual(str(r), str(Range('next 2 weeks', now=NOW)))
+        self.assertEqual([record['kind'] for record in records], ['Range', 'Date', 'Date.plus_', 'Range'])
+        record = records[0]
+        self.assertEqual(record['phrase'], 'next 2 weeks')
+        self.assertEqual(record['branches'], ['next and (num or article)'])
+        self.assertGreater(record['subparses'], 0)
+        self.assertGreater(record['phases']['regex'], 0)
+        self.assertGreater(record['phases']['arithmetic'], 0)
+        self.assertAlmostEqual(sum(record['phases'].values()), record['total'])
+        self.assertIsNone(record['error'])
+        self.assertEqual(records[3]['error'], 'TimestringInvalid')
+
+    def test_collect(self):
+        with instrument.collect() as stats:
+            Range('last week', now=NOW)
+            Range('since 2 days ago', now=NOW)
+            Range('between january 10 and jan 12', now=NOW)
+        report = stats.report()
+        self.assertEqual(report['calls'], 3)
+        self.assertEqual(report['kinds'], {'Range': 3})
+        self.assertEqual(report['branches'], {'prev': 1, 'ago or from_now or in': 1, 'and or to': 1})
+        self.assertEqual(len(report['slowest']), 3)
+        self.assertEqual(set(report['phases_ms']), set(instrument.PHASES))
+
+    def test_verbose_callable(self):
+        branches = []
+        Range('tomorrow', now=NOW, verbose=branches.append)
+        self.assertEqual(branches, ['relative_day or weekday'])
+
+
+if __name__ == '__main__':
+    unittest.main()
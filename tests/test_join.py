@@ -0,0 +1,77 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from timestring import Range
+from timestring.batch import RangeBatch, INFINITY, NEG_INFINITY
+from timestring.join import join, pairs
+
+
+def intervals(count, seed):
+    rnd = random.Random(seed)
+    starts, ends = [], []
+    for _ in range(count):
+        start = rnd.randrange(0, 1000)
+        starts.append(start)
+        ends.append(start + rnd.choice([0, 1, 5, 20, 100]))
+    return starts, ends
+
+
+def brute(left, right, closed):
+    found = set()
+    for i, (a, b) in enumerate(zip(*left)):
+        for j, (c, d) in enumerate(zip(*right)):
+            if closed == 'left' and a < d and c < b and a < b and c < d:  # empty Ranges share no time
+                found.add((i, j))
+            elif closed == 'both' and a <= d and c <= b:
+                found.add((i, j))
+    return found
+
+
+class T(unittest.TestCase):
+    def test_pairs(self):
+        for seed in range(5):
+            left, right = intervals(300, seed), intervals(200, seed + 100)
+            for closed in ('left', 'both'):
+                found = list(pairs(left[0], left[1], right[0], right[1], closed))
+                self.assertEqual(len(found), len(set(found)))
+                self.assertEqual(set(found), brute(left, right, closed), (seed, closed))
+        with self.assertRaises(ValueError):
+            list(pairs([], [], [], [], closed='right'))
+
+    def test_join(self):
+        day = datetime(2017, 6, 16)
+        sessions = [Range(day, day + timedelta(hours=2)),
+                    Range(day + timedelta(hours=3), day + timedelta(hours=4)),
+                    Range(day + timedelta(hours=5), 'infinity')]
+        incidents = [Range(day + timedelta(hours=1), day + timedelta(hours=3)),
+                     Range(day + timedelta(hours=3, minutes=30), day + timedelta(hours=3, minutes=40))]
+
+        self.assertEqual(sorted(join(sessions, incidents, index=True)), [(0, 0), (1, 1)])
+        self.assertEqual(sorted(join(sessions, incidents, index=True, closed='both')), [(0, 0), (1, 0), (1, 1)])
+        self.assertEqual(list(join(sessions, incidents, mode='contains', index=True)), [(1, 1)])
+        self.assertEqual(list(join(incidents, sessions, mode='within', index=True)), [(1, 1)])
+        session, incident = next(join(sessions[:1], incidents))
+        self.assertIs(session, sessions[0])
+        self.assertIs(incident, incidents[0])
+
+        self.assertEqual(sorted(join(sessions, incidents, overlap=True, index=True)),
+                         [(0, 0, timedelta(hours=1)), (1, 1, timedelta(minutes=10))])
+        self.assertEqual(list(join(sessions, incidents, min_overlap=timedelta(minutes=30), index=True)),
+                         [(0, 0)])
+
+    def test_batches(self):
+        left = RangeBatch([NEG_INFINITY, 10, 50], [20, 30, INFINITY])
+        right = RangeBatch([25, 100], [40, 200])
+        self.assertEqual(sorted(join(left, right, index=True)), [(1, 0), (2, 1)])
+        self.assertEqual(sorted(join(left, right, index=True, overlap=True))[-1], (2, 1, timedelta(microseconds=100)))
+        infinite = list(join(left, RangeBatch([NEG_INFINITY], [INFINITY]), overlap=True, index=True))
+        self.assertEqual(sorted(infinite), [(0, 0, timedelta.max), (1, 0, timedelta(microseconds=20)),
+                                            (2, 0, timedelta.max)])
+        self.assertEqual(len(list(join(left, right))), 2)
+        with self.assertRaises(ValueError):
+            list(join(left, right, mode='touches'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from timestring import Date
+from timestring.logs import LogParser, infer, parse_lines
+
+NOW = datetime(2017, 6, 16, 19, 37, 22)
+EXPECTED = datetime(2017, 6, 16, 19, 37, 22)
+
+LOGS = dict(
+    syslog=['Jun 16 19:37:22 web sshd[512]: Accepted publickey for deploy',
+            'Jun  6 01:02:03 web CRON[77]: (root) CMD (run-parts /etc/cron.hourly)'],
+    apache=['127.0.0.1 - - [16/Jun/2017:19:37:22 +0000] "GET / HTTP/1.1" 200 512',
+            '10.10.0.12 - bob [06/Jun/2017:01:02:03 -0700] "GET /a HTTP/1.1" 404 0'],
+    iso=['2017-06-16T19:37:22Z INFO worker started',
+         '2017-06-06 01:02:03,250 WARN queue is 2017 items long'],
+    ctime=['[Fri Jun 16 19:37:22 2017] [error] [client 10.0.0.1] File does not exist',
+           '[Tue Jun  6 01:02:03 2017] [notice] caught SIGTERM, shutting down'],
+    epoch=['1497641842 login ok', '1496710923.25 logout'],
+)
+
+
+class T(unittest.TestCase):
+    def test_infer(self):
+        for (layout, lines), start in zip(LOGS.items(), (0, 15, 0, 1, 0)):
+            parser = infer(lines * 3, now=NOW)
+            self.assertEqual((parser.layout, parser.start), (layout, start))
+            parser.parse(lines)
+            self.assertEqual((parser.lines, parser.fallbacks), (2, 0))
+
+    def test_decode(self):
+        self.assertEqual(infer(LOGS['syslog'], now=NOW)(LOGS['syslog'][1]), datetime(2017, 6, 6, 1, 2, 3))
+        parser = infer(LOGS['apache'], now=NOW)
+        self.assertEqual(parser(LOGS['apache'][0]).date, EXPECTED.replace(tzinfo=timezone.utc))
+        date = parser(LOGS['apache'][1]).date
+        self.assertEqual(date.utcoffset(), timedelta(hours=-7))
+        self.assertEqual(date.replace(tzinfo=None), datetime(2017, 6, 6, 1, 2, 3))
+        parser = infer(LOGS['iso'], now=NOW)
+        self.assertEqual(parser(LOGS['iso'][0]).date, EXPECTED.replace(tzinfo=timezone.utc))
+        self.assertEqual(parser(LOGS['iso'][1]).date, datetime(2017, 6, 6, 1, 2, 3, 250000))
+        self.assertEqual(parser('2017-06-16T19:37:22.1234567+02:00 x').date,
+                         datetime(2017, 6, 16, 19, 37, 22, 123456, timezone(timedelta(hours=2))))
+        self.assertEqual(infer(LOGS['ctime'], now=NOW)(LOGS['ctime'][1]), datetime(2017, 6, 6, 1, 2, 3))
+        parser = infer(LOGS['epoch'], now=NOW)
+        self.assertEqual(parser(LOGS['epoch'][0]), Date(1497641842))
+        self.assertEqual(parser(LOGS['epoch'][1]), Date(1496710923).date + timedelta(milliseconds=250))
+
+    def test_syslog_year(self):
+        parser = infer(LOGS['syslog'], now=datetime(2018, 1, 2))
+        self.assertEqual(parser('Dec 31 23:59:59 web x: y').date, datetime(2017, 12, 31, 23, 59, 59))
+        self.assertEqual(parser('Jan  1 00:00:01 web x: y').date, datetime(2018, 1, 1, 0, 0, 1))
+        # an aware now is read on its wall clock
+        parser = infer(LOGS['syslog'], now=datetime(2018, 1, 2, tzinfo=timezone.utc))
+        self.assertEqual(parser.layout, 'syslog')
+        self.assertEqual(parser('Dec 31 23:59:59 web x: y').date, datetime(2017, 12, 31, 23, 59, 59))
+
+    def test_fallback(self):
+        parser = infer(LOGS['iso'] + ['a stack trace line', '2017-06-16T19:37:22 ok'], now=NOW)
+        self.assertEqual(parser.layout, 'iso')
+        self.assertEqual(parser('  continued: 2017-06-16T19:37:22 ok').date, EXPECTED)
+        self.assertIsNone(parser('2017-13-16T19:37:22 not a month'))
+        self.assertIsNone(parser('Traceback (most recent call last):'))
+        self.assertEqual((parser.lines, parser.fallbacks), (3, 2))
+
+        parser = infer(['no timestamps', 'here either'], now=NOW)
+        self.assertIsNone(parser.layout)
+        self.assertEqual(parser('since june 16th, 2017').date.date(), EXPECTED.date())
+        self.assertEqual(parser.fallbacks, 1)
+        # the start of a Range
+        self.assertEqual(parser('from june 16th, 2017 to june 18th, 2017: down').date.date(), EXPECTED.date())
+
+    def test_parse_lines(self):
+        lines = LOGS['syslog'] * 60
+        parser, dates = parse_lines(iter(lines), sample=10, now=NOW)
+        self.assertEqual(parser.layout, 'syslog')
+        dates = list(dates)
+        self.assertEqual([line for line, _ in dates], lines)
+        self.assertEqual(dates[2][1], EXPECTED)
+        self.assertEqual((parser.lines, parser.fallbacks), (120, 0))
+
+    def test_general(self):
+        """The fast path agrees with the general parser where both apply"""
+        parser = LogParser('iso', 0, NOW)
+        for stamp in ('2017-06-16 19:37:22', '2011-11-11 11:11:11', '2014-03-06 15:33:43'):
+            self.assertEqual(parser(stamp + ' INFO x'), Date(stamp))
+        self.assertEqual(parser.fallbacks, 0)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
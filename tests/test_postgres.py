@@ -0,0 +1,222 @@
+import os
+import time
+import unittest
+from datetime import datetime
+from io import BytesIO, StringIO
+
+import pytz
+from freezegun import freeze_time
+
+from timestring import Date, Range, TimestringInvalid
+from timestring.batch import DateBatch, RangeBatch, INFINITY, NEG_INFINITY
+from timestring.postgres import CopyStream, copy_lines, encode, write_copy, \
+    decode_range, decode_ranges, decode_timestamp, decode_timestamps, \
+    pack_timestamp, pack_range, pack_fields, unpack_timestamp, unpack_range, \
+    unpack_timestamps, unpack_ranges, write_copy_binary, read_copy_binary
+
+DAY = bytes.fromhex('000000141dd76000')  # 2000-01-02, 86400 * 10 ** 6
+BOUND = bytes.fromhex('00000008')
+
+
+@freeze_time('2017-06-16 19:37:22')
+class T(unittest.TestCase):
+    def test_encode(self):
+        self.assertEqual(encode(None), '\\N')
+        self.assertEqual(encode(Date('today')), '2017-06-16 00:00:00')
+        self.assertEqual(encode(Date('infinity')), 'infinity')
+        self.assertEqual(encode(datetime(2017, 6, 16, 1, 2, 3, 4)), '2017-06-16 01:02:03.000004')
+        self.assertEqual(encode(Range('today')),
+                         '["2017-06-16 00:00:00","2017-06-17 00:00:00")')
+        self.assertEqual(encode(Range('today', 'infinity')),
+                         '["2017-06-16 00:00:00",infinity)')
+        self.assertEqual(encode(Range('infinity')), '[-infinity,infinity)')
+        self.assertEqual(encode(Range('today', 'today')), 'empty')
+
+        eastern = pytz.timezone('US/Eastern')
+        start = eastern.localize(datetime(2017, 6, 16))
+        self.assertEqual(encode(Range(start, start.replace(day=17))),
+                         '["2017-06-16 00:00:00-04:00","2017-06-17 00:00:00-04:00")')
+
+    def test_write_copy(self):
+        fp = StringIO()
+        rows = write_copy(fp, [Range('today'), None], [Date('tomorrow'), Date('infinity')])
+        self.assertEqual(rows, 2)
+        self.assertEqual(fp.getvalue(),
+                         '["2017-06-16 00:00:00","2017-06-17 00:00:00")\t2017-06-17 00:00:00\n'
+                         '\\N\tinfinity\n')
+
+    def test_batches(self):
+        ranges = [Range('today'), Range('this week'), Range('today', 'infinity')]
+        batch = RangeBatch.from_ranges(ranges)
+        self.assertEqual(list(copy_lines(batch)), list(copy_lines(ranges)))
+        self.assertEqual(batch.ends[2], INFINITY)
+
+        batch = RangeBatch([NEG_INFINITY, 0], [0, 0], tz='UTC')
+        self.assertEqual(list(copy_lines(batch)),
+                         ['[-infinity,"1970-01-01 00:00:00+00:00")\n', 'empty\n'])
+
+        dates = DateBatch([1497571200000000, INFINITY])
+        self.assertEqual(list(copy_lines(dates)),
+                         ['2017-06-16 00:00:00\n', 'infinity\n'])
+        self.assertEqual([d.date for d in dates], [datetime(2017, 6, 16), 'infinity'])
+
+    def test_copy_stream(self):
+        ranges = [Range('today')] * 100
+        expected = ''.join(copy_lines(ranges))
+        stream = CopyStream(ranges)
+        chunks = iter(lambda: stream.read(37), '')
+        self.assertEqual(''.join(chunks), expected)
+
+        stream = CopyStream(ranges)
+        self.assertEqual(stream.read(10), expected[:10])
+        self.assertEqual(stream.readline(), expected.splitlines(True)[0][10:])
+        self.assertEqual(stream.read(), expected.split('\n', 1)[1])
+
+    def test_decode_timestamp(self):
+        self.assertEqual(decode_timestamp('2014-03-06 15:33:43.764419-05'),
+                         datetime(2014, 3, 6, 20, 33, 43, 764419, tzinfo=pytz.utc))
+        self.assertEqual(decode_timestamp('2014-03-06 15:33:43.5+05:30'),
+                         datetime(2014, 3, 6, 10, 3, 43, 500000, tzinfo=pytz.utc))
+        self.assertEqual(decode_timestamp('2014-03-06 15:33:43'), datetime(2014, 3, 6, 15, 33, 43))
+        self.assertEqual(decode_timestamp('-infinity'), 'infinity')
+        self.assertIsNone(decode_timestamp('\\N'))
+        with self.assertRaises(TimestringInvalid):
+            decode_timestamp('yesterday')
+
+        # Same instant as the general parser
+        self.assertEqual(Date(decode_timestamp('2014-03-06 15:33:43.764419-05')).hour, 20)
+        self.assertEqual(decode_timestamp('2014-03-06 15:33:43.764419-05').astimezone(pytz.utc).hour,
+                         Date('2014-03-06 15:33:43.764419-05').hour)
+
+    def test_decode_range(self):
+        r = decode_range('["2013-12-09 06:57:46.54502-05","2013-12-10 00:00:00-05")')
+        self.assertEqual(r.start.date, datetime(2013, 12, 9, 11, 57, 46, 545020, tzinfo=pytz.utc))
+        self.assertEqual(r.end.date, datetime(2013, 12, 10, 5, tzinfo=pytz.utc))
+
+        r = decode_range('("2017-06-16 00:00:00","2017-06-17 00:00:00"]')
+        self.assertEqual(r.start.date, datetime(2017, 6, 16, 0, 0, 0, 1))
+        self.assertEqual(r.end.date, datetime(2017, 6, 17, 0, 0, 0, 1))
+
+        r = decode_range('["2013-12-09 06:57:46.54502-05",infinity)')
+        self.assertEqual(r.end.date, 'infinity')
+        self.assertTrue(Date('today') in r)
+        r = decode_range('(,"2013-12-09 06:57:46+00")')
+        self.assertEqual(r.start.date, 'infinity')
+        self.assertEqual(decode_range('[-infinity,infinity)').start.date, 'infinity')
+        # quoted infinities
+        r = decode_range('["infinity",)')
+        self.assertEqual((r.start.date, r.end.date), ('infinity', 'infinity'))
+        r = decode_range('("-infinity","2017-06-16 00:00:00")')
+        self.assertEqual((r.start.date, r.end.date), ('infinity', datetime(2017, 6, 16)))
+
+        self.assertEqual(encode(decode_range('empty')), 'empty')
+        self.assertIsNone(decode_range(None))
+        with self.assertRaises(TimestringInvalid):
+            decode_range('"2013-12-09 06:57:46+00"')
+
+    def test_decode_columns(self):
+        column = ['["2017-06-16 00:00:00+00","2017-06-17 00:00:00+00")',
+                  '[-infinity,"2017-06-17 00:00:00+00")',
+                  'empty']
+        batch = decode_ranges(column, batch=True)
+        self.assertEqual(list(batch.starts), [1497571200000000, NEG_INFINITY, 0])
+        self.assertEqual(list(batch.ends), [1497657600000000, 1497657600000000, 0])
+        self.assertEqual(batch.tz, pytz.utc)
+        self.assertEqual(list(copy_lines(batch)), list(copy_lines(decode_ranges(column))))
+
+        dates = decode_timestamps(['2017-06-16 00:00:00', 'infinity', '\\N'])
+        self.assertEqual(dates[0].date, datetime(2017, 6, 16))
+        self.assertEqual(dates[1].date, 'infinity')
+        self.assertIsNone(dates[2])
+        batch = decode_timestamps(['2017-06-16 00:00:00', 'infinity'], batch=True)
+        self.assertEqual(list(batch.micros), [1497571200000000, INFINITY])
+        self.assertIsNone(batch.tz)
+        with self.assertRaises(TimestringInvalid):
+            decode_timestamps([None], batch=True)
+
+    def test_pack(self):
+        self.assertEqual(pack_timestamp(datetime(2000, 1, 1)), bytes(8))
+        self.assertEqual(pack_timestamp(Date('jan 2 2000')), DAY)
+        self.assertEqual(pack_timestamp(datetime(2000, 1, 2, 5, tzinfo=pytz.FixedOffset(300))), DAY)
+        self.assertEqual(pack_timestamp(Date('infinity')), bytes.fromhex('7fffffffffffffff'))
+
+        self.assertEqual(pack_range(Range(datetime(2000, 1, 1), datetime(2000, 1, 2))),
+                         b'\x02' + BOUND + bytes(8) + BOUND + DAY)
+        self.assertEqual(pack_range(Range('infinity')),
+                         b'\x02' + BOUND + bytes.fromhex('8000000000000000')
+                         + BOUND + bytes.fromhex('7fffffffffffffff'))
+        self.assertEqual(pack_range(Range('today', 'today')), b'\x01')
+
+    def test_unpack(self):
+        self.assertEqual(unpack_timestamp(DAY), datetime(2000, 1, 2))
+        self.assertEqual(unpack_timestamp(DAY, tz='US/Eastern'),
+                         pytz.timezone('US/Eastern').localize(datetime(2000, 1, 1, 19)))
+        self.assertEqual(unpack_timestamp(bytes.fromhex('8000000000000000')), 'infinity')
+
+        r = unpack_range(b'\x02' + BOUND + bytes(8) + BOUND + DAY)
+        self.assertEqual((r.start.date, r.end.date), (datetime(2000, 1, 1), datetime(2000, 1, 2)))
+        # (2000-01-01, 2000-01-02]
+        r = unpack_range(b'\x04' + BOUND + bytes(8) + BOUND + DAY)
+        self.assertEqual((r.start.date, r.end.date),
+                         (datetime(2000, 1, 1, 0, 0, 0, 1), datetime(2000, 1, 2, 0, 0, 0, 1)))
+        # (,2000-01-02)
+        r = unpack_range(b'\x08' + BOUND + DAY, tz='UTC')
+        self.assertEqual((r.start.date, r.end.date), ('infinity', datetime(2000, 1, 2, tzinfo=pytz.utc)))
+        r = unpack_range(b'\x18')
+        self.assertEqual((r.start.date, r.end.date), ('infinity', 'infinity'))
+        self.assertEqual(encode(unpack_range(b'\x01')), 'empty')
+
+    def test_fields(self):
+        ranges = [Range('today'), None, Range('today', 'infinity'), Range('infinity')]
+        data = pack_fields(ranges)
+        self.assertEqual(data[:4], bytes.fromhex('00000019'))
+        self.assertEqual(data[29:33], bytes.fromhex('ffffffff'))
+        self.assertEqual([encode(r) for r in unpack_ranges(memoryview(data))],
+                         [encode(r) for r in ranges])
+
+        batch = RangeBatch.from_ranges([r for r in ranges if r])
+        self.assertEqual(pack_fields(batch), pack_fields([r for r in ranges if r]))
+        unpacked = unpack_ranges(pack_fields(batch), batch=True)
+        self.assertEqual(list(unpacked.starts), list(batch.starts))
+        self.assertEqual(list(unpacked.ends), list(batch.ends))
+
+        dates = [Date('jan 2 2000'), Date('infinity')]
+        self.assertEqual(pack_fields(dates), BOUND + DAY + BOUND + bytes.fromhex('7fffffffffffffff'))
+        self.assertEqual([d.date for d in unpack_timestamps(pack_fields(dates))],
+                         [datetime(2000, 1, 2), 'infinity'])
+        self.assertEqual(list(unpack_timestamps(pack_fields(dates), batch=True).micros),
+                         [946771200000000, INFINITY])
+
+    def test_copy_binary(self):
+        fp = BytesIO()
+        rows = write_copy_binary(fp, [Range(datetime(2000, 1, 1), datetime(2000, 1, 2))],
+                                 [Date('jan 2 2000')])
+        self.assertEqual(rows, 1)
+        self.assertEqual(fp.getvalue(),
+                         b'PGCOPY\n\xff\r\n\x00' + bytes(8)
+                         + b'\x00\x02' + bytes.fromhex('00000019') + b'\x02' + BOUND + bytes(8) + BOUND + DAY
+                         + BOUND + DAY
+                         + b'\xff\xff')
+
+        ranges, dates = read_copy_binary(fp.getvalue(), 'tsrange', 'timestamptz')
+        self.assertEqual(ranges[0].end.date, datetime(2000, 1, 2))
+        self.assertEqual(dates[0].date, datetime(2000, 1, 2, tzinfo=pytz.utc))
+
+        ranges, dates = read_copy_binary(memoryview(fp.getvalue()), 'tsrange', 'timestamp', batch=True)
+        self.assertEqual(list(ranges.ends), [946771200000000])
+        self.assertEqual(list(dates.micros), [946771200000000])
+
+        with self.assertRaises(TimestringInvalid):
+            read_copy_binary(fp.getvalue(), 'tsrange')
+        with self.assertRaises(TimestringInvalid):
+            read_copy_binary(b'COPY', 'tsrange')
+
+
+def main():
+    os.environ['TZ'] = 'UTC'
+    time.tzset()
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
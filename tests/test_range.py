@@ -1,8 +1,10 @@
 import os
+import pickle
 import time
 import unittest
 from datetime import datetime, timedelta
 
+import pytz
 from ddt import ddt
 from freezegun import freeze_time
 
@@ -295,6 +297,181 @@ class T(unittest.TestCase):
         self.assertEqual(r1.start, r.start + timedelta(days=10))
         self.assertEqual(r1.end, r.end)
 
+    def assert_bounds(self, ranges, *bounds):
+        self.assertEqual([(r.start.date, r.end.date) for r in ranges], list(zip(bounds, bounds[1:])))
+
+    def test_next_prev_step(self):
+        week = Range('this week')
+        self.assertEqual(week.step(), (7, 'days', 'clamp'))
+        self.assert_bounds([week.next()], datetime(2017, 6, 19), datetime(2017, 6, 26))
+        self.assert_bounds([week.next(3)], datetime(2017, 7, 3), datetime(2017, 7, 10))
+        self.assert_bounds([week.prev(2)], datetime(2017, 5, 29), datetime(2017, 6, 5))
+
+        month = Range('this month')
+        self.assertEqual(month.step(), (1, 'months', 'clamp'))
+        self.assert_bounds([month.next(7)], datetime(2018, 1, 1), datetime(2018, 2, 1))
+
+        ends = Range(datetime(2017, 1, 31), datetime(2017, 2, 28))
+        self.assertEqual(ends.step(), (1, 'months', 'preserve'))
+        self.assert_bounds([ends.next()], datetime(2017, 2, 28), datetime(2017, 3, 31))
+        self.assert_bounds([ends.next(2)], datetime(2017, 3, 31), datetime(2017, 4, 30))
+
+        hours = Range(datetime(2017, 6, 16, 10), datetime(2017, 6, 16, 12, 30))
+        self.assert_bounds([hours.next()], datetime(2017, 6, 16, 12, 30), datetime(2017, 6, 16, 15))
+
+        with self.assertRaises(TimestringInvalid):
+            Range('today', 'infinity').next()
+
+    def test_preceding_following(self):
+        self.assert_bounds(reversed(list(Range('this week').preceding(3))),
+                           datetime(2017, 5, 22), datetime(2017, 5, 29),
+                           datetime(2017, 6, 5), datetime(2017, 6, 12))
+        self.assert_bounds(Range('this month').following(3),
+                           datetime(2017, 7, 1), datetime(2017, 8, 1),
+                           datetime(2017, 9, 1), datetime(2017, 10, 1))
+        self.assertEqual(list(Range('today').following(0)), [])
+
+    def test_windows_dst(self):
+        # Days stay midnight to midnight across the end of daylight saving time
+        eastern = pytz.timezone('US/Eastern')
+        day = Range(eastern.localize(datetime(2017, 11, 4)), eastern.localize(datetime(2017, 11, 5)))
+        sunday, monday = day.following(2)
+        self.assertEqual(str(sunday.start.date), '2017-11-05 00:00:00-04:00')
+        self.assertEqual(str(sunday.end.date), '2017-11-06 00:00:00-05:00')
+        self.assertEqual(len(sunday), 25 * 3600)
+        self.assertEqual(len(monday), 24 * 3600)
+
+    def test_rolling(self):
+        june = Range(datetime(2017, 6, 1), datetime(2017, 6, 5))
+        self.assert_bounds(june.rolling('2 days'),
+                           datetime(2017, 6, 1), datetime(2017, 6, 3), datetime(2017, 6, 5))
+        self.assertEqual([(r.start.date.day, r.end.date.day) for r in june.rolling('2 days', '1 day')],
+                         [(1, 3), (2, 4), (3, 5)])
+        self.assertEqual(len(list(june.rolling(timedelta(hours=6)))), 16)
+        self.assertEqual(len(list(june.rolling(3600, stride='12 hours'))), 8)
+        self.assertEqual(list(june.rolling('1 week')), [])
+        with self.assertRaises(TimestringInvalid):
+            list(june.rolling('-1 day'))
+        for args in (('0.0000001 seconds',), ('1 day', '0.0000001 seconds')):
+            with self.assertRaises(TimestringInvalid):
+                next(june.rolling(*args))
+
+    def test_split(self):
+        last = Range('last 3 days')
+        self.assert_bounds(last.split('day'),
+                           datetime(2017, 6, 13, 19, 37, 22), datetime(2017, 6, 14),
+                           datetime(2017, 6, 15), datetime(2017, 6, 16), datetime(2017, 6, 16, 19, 37, 22))
+        self.assert_bounds(last.split('day', align=False),
+                           datetime(2017, 6, 13, 19, 37, 22), datetime(2017, 6, 14, 19, 37, 22),
+                           datetime(2017, 6, 15, 19, 37, 22), datetime(2017, 6, 16, 19, 37, 22))
+        self.assert_bounds(last.split(2),
+                           datetime(2017, 6, 13, 19, 37, 22), datetime(2017, 6, 15, 7, 37, 22),
+                           datetime(2017, 6, 16, 19, 37, 22))
+        spring = Range(datetime(2017, 1, 15), datetime(2017, 5, 2))
+        self.assert_bounds(spring.split('month'),
+                           datetime(2017, 1, 15), datetime(2017, 2, 1), datetime(2017, 3, 1),
+                           datetime(2017, 4, 1), datetime(2017, 5, 1), datetime(2017, 5, 2))
+        self.assert_bounds(spring.split('quarter'),
+                           datetime(2017, 1, 15), datetime(2017, 4, 1), datetime(2017, 5, 2))
+        self.assert_bounds(Range(datetime(2017, 6, 1), datetime(2017, 6, 20)).split('week', week_start=7),
+                           datetime(2017, 6, 1), datetime(2017, 6, 4), datetime(2017, 6, 11),
+                           datetime(2017, 6, 18), datetime(2017, 6, 20))
+        self.assert_bounds(Range(datetime(2017, 6, 16, 10, 7), datetime(2017, 6, 16, 10, 50)).split('15 minutes'),
+                           datetime(2017, 6, 16, 10, 7), datetime(2017, 6, 16, 10, 15),
+                           datetime(2017, 6, 16, 10, 30), datetime(2017, 6, 16, 10, 45),
+                           datetime(2017, 6, 16, 10, 50))
+        self.assertEqual(list(Range(datetime(2017, 6, 1), datetime(2017, 6, 1)).split('day')), [])
+        with self.assertRaises(TimestringInvalid):
+            Range('today', 'infinity').split('day')
+        with self.assertRaises(TimestringInvalid):
+            list(last.split('0 days'))
+        for align in (True, False):
+            with self.assertRaises(TimestringInvalid):
+                list(last.split('0.0000001 seconds', align=align))
+            for by in ('0.000000000001 days', '0.0000000000001 weeks', '0.0000000000001 months'):
+                with self.assertRaises(TimestringInvalid):
+                    list(Range(datetime(2017, 6, 1), datetime(2017, 6, 5)).split(by, align=align))
+
+    def test_split_dst(self):
+        eastern = pytz.timezone('US/Eastern')
+        weekend = Range(eastern.localize(datetime(2017, 11, 4, 12)), eastern.localize(datetime(2017, 11, 6, 3)))
+        days = list(weekend.split('day'))
+        self.assertEqual([str(day.start.date) for day in days],
+                         ['2017-11-04 12:00:00-04:00', '2017-11-05 00:00:00-04:00', '2017-11-06 00:00:00-05:00'])
+        self.assertEqual([len(day) for day in days], [12 * 3600, 25 * 3600, 3 * 3600])
+        self.assertEqual(sum(len(hour) for hour in weekend.split('hour')), len(weekend))
+
+        # naive Ranges are wall clock times in tz
+        batch = Range(datetime(2017, 11, 5), datetime(2017, 11, 7)).split('day', tz='US/Eastern', batch=True)
+        self.assertEqual(batch.tz, eastern)
+        self.assertEqual([str(day.end.date) for day in batch],
+                         ['2017-11-06 00:00:00-05:00', '2017-11-07 00:00:00-05:00'])
+
+    def test_pickle(self):
+        for _range in (Range('next 2 weeks'), Range('today', 'infinity'), Range('infinity', 'today'),
+                       Range('this week', tz='US/Eastern')):
+            restored = pickle.loads(pickle.dumps(_range))
+            self.assertEqual((restored.start, restored.end), (_range.start, _range.end))
+            self.assertEqual(restored.tz, _range.tz)
+        lmt = Range('today').replace(tzinfo=pytz.timezone('US/Eastern'))
+        restored = pickle.loads(pickle.dumps(lmt))
+        self.assertEqual((restored.start.date, restored.end.date), (lmt.start.date, lmt.end.date))
+        self.assertEqual(str(restored.start.date), str(lmt.start.date))
+        _range = Range('this week', tz='US/Eastern')
+        state = (_range.start.__dict__, _range.end.__dict__)
+        self.assertLess(len(pickle.dumps(_range)) * 2, len(pickle.dumps(state)))
+
+    def test_from_fields(self):
+        for phrase, fields in (('june', dict(month=6)),
+                               ('june 2017', dict(year=2017, month='june')),
+                               ('2017', dict(year=2017)),
+                               ('june 16 2017', dict(year=2017, month=6, day=16)),
+                               ('2017-06-16 10:30', dict(year=2017, month=6, day=16, hour=10, minute=30)),
+                               ('monday', dict(weekday=1)),
+                               ('last friday', dict(weekday=5, direction='last')),
+                               ('tomorrow at 10am', dict(relative_day='tomorrow', hour=10)),
+                               ('monday morning', dict(weekday=1, daytime='morning')),
+                               ('2 weeks ago', dict(num=2, unit='weeks', sign=-1)),
+                               ('last 2 weeks', dict(num=2, unit='weeks', direction='last')),
+                               ('next week', dict(unit='week', direction='next')),
+                               ('this month', dict(unit='month', direction='this'))):
+            self.assertEqual(tuple(Range.from_fields(**fields)), tuple(Range(phrase)), phrase)
+        self.assertEqual(tuple(Range.from_fields(unit='week', direction='this', week_start=7)),
+                         tuple(Range('this week', week_start=7)))
+        self.assertEqual(Range.from_fields(relative_day='today', tz='US/Eastern').tz.zone, 'US/Eastern')
+        self.assertEqual(tuple(Range(dict(relative_day='today'))), tuple(Range('today')))
+
+    def test_values(self):
+        start, end = Date('today'), Date('tomorrow')
+        _range = Range(start, end)
+        self.assertEqual(_range.start, start)
+        # setting its source Date does not move the Range
+        with self.assertWarns(DeprecationWarning):
+            start.hour = 5
+        self.assertEqual(_range.start.hour, 0)
+        start = start.replace(hour=0)
+        Date.mutable = False
+        try:
+            self.assertIs(Range(start, end).start, start)
+        finally:
+            Date.mutable = True
+
+        eastern = _range.replace(tzinfo=pytz.timezone('US/Eastern'))
+        self.assertEqual(eastern.tz.zone, 'US/Eastern')
+        self.assertIsNone(_range.tz)
+        self.assertIs(Range('today', 'infinity').replace(hour=1).end.date, 'infinity')
+
+        with self.assertWarns(DeprecationWarning):
+            _range.tz = 'US/Eastern'
+        self.assertEqual(_range.tz.zone, 'US/Eastern')
+        self.assertIsNone(start.tz)
+        Date.mutable = False
+        try:
+            with self.assertRaises(AttributeError):
+                _range.tz = None
+        finally:
+            Date.mutable = True
+
     def test_infinity(self):
         infinity = Date('infinity')
         self.assertTrue(infinity > 'now')
@@ -554,8 +731,8 @@ class T(unittest.TestCase):
 
         # Implicit change of year, month, date etc
         self.assert_range('10 months ago',
-                          datetime(2016, 4, 16),
-                          datetime(2016, 4, 17))
+                          datetime(2016, 8, 16),
+                          datetime(2016, 8, 17))
 
         self.assert_range('20 days ago',
                           datetime(2017, 5, 27),
@@ -707,7 +884,7 @@ class T(unittest.TestCase):
         self.assert_range('since 2 seconds ago', datetime(2017, 6, 16, 19, 37, 20), now)
 
         # Implicit change of year, month, date etc
-        self.assert_range('since 10 months ago', datetime(2016, 4, 16), now)
+        self.assert_range('since 10 months ago', datetime(2016, 8, 16), now)
         self.assert_range('since 20 days ago', datetime(2017, 5, 27), now)
         self.assert_range('since 20 hours ago', datetime(2017, 6, 15, 23), now)
         self.assert_range('since 45 minutes ago', datetime(2017, 6, 16, 18, 52), now)
@@ -1288,6 +1465,17 @@ class T(unittest.TestCase):
                               datetime(2017, 6, 19, WEEKEND_END_HOUR),
                               week_start=0)
 
+    def test_now(self):
+        # Same results as freezing the clock at `now`
+        now = datetime(2014, 2, 12, 8, 15, 30)
+        for phrase in ['today', 'this week', 'last 2 weeks', 'next month', '3 days ago',
+                       'this weekend', 'next weekend', 'since tuesday', 'until 5pm',
+                       'from jan 1 to feb 2', 'tomorrow at 10am', '10 days']:
+            with freeze_time(now):
+                expected = list(map(str, Range(phrase)))
+            self.assertEqual(list(map(str, Range(phrase, now=now))), expected, phrase)
+            self.assertEqual(list(map(str, Range(phrase, now=Date(now)))), expected, phrase)
+
 
 def main():
     os.environ['TZ'] = 'UTC'
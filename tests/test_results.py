@@ -0,0 +1,153 @@
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+from freezegun import freeze_time
+
+from timestring import Context, Date, Range
+from timestring.batch import NEG_INFINITY, to_micros
+from timestring.results import ResultCache, evaluate, valid_for
+
+NOW = datetime(2017, 6, 16, 19, 37, 22)
+EASTERN = pytz.timezone('US/Eastern')
+
+
+class T(unittest.TestCase):
+    def test_valid_for(self):
+        for phrase, kind, until in (('today', Range, datetime(2017, 6, 17)),
+                                    ('yesterday at 10am', Date, datetime(2017, 6, 17)),
+                                    ('this hour', Range, datetime(2017, 6, 16, 20)),
+                                    ('this week', Range, datetime(2017, 6, 19)),
+                                    ('last week', Range, datetime(2017, 6, 19)),
+                                    ('this month', Range, datetime(2017, 7, 1)),
+                                    ('this year', Range, datetime(2018, 1, 1)),
+                                    ('2 days ago', Range, datetime(2017, 6, 17)),
+                                    ('monday', Range, datetime(2017, 6, 19)),
+                                    ('last 5 minutes', Range, NOW),
+                                    ('now', Date, NOW),
+                                    ('infinity', Range, None)):
+            entry = valid_for(kind, phrase, now=NOW)
+            self.assertEqual(entry.valid_until, until, phrase)
+            self.assertEqual(entry.value, kind(phrase, now=NOW), phrase)
+            if until is not None and until > NOW:
+                before = until - timedelta(microseconds=1)
+                self.assertEqual(kind(phrase, now=before), entry.value, phrase)
+                self.assertNotEqual(kind(phrase, now=until), entry.value, phrase)
+
+    def test_absolute(self):
+        now = NOW.replace(microsecond=5)
+        for phrase in ('june 16 2017', 'june 2017', '2017'):
+            self.assertIsNone(valid_for(Range, phrase, now=now).valid_until, phrase)
+
+    def test_week_start(self):
+        self.assertEqual(valid_for(Range, 'this week', week_start=7, now=NOW).valid_until,
+                         datetime(2017, 6, 18))
+
+    def test_zone(self):
+        now = EASTERN.localize(NOW)
+        entry = valid_for(Range, 'today', tz='US/Eastern', now=now)
+        self.assertEqual(entry.valid_until, EASTERN.localize(datetime(2017, 6, 17)))
+        # the hour after 1am is skipped when the clocks go forward
+        now = EASTERN.localize(datetime(2017, 3, 12, 1, 30))
+        entry = valid_for(Range, 'this hour', tz='US/Eastern', now=now)
+        self.assertEqual(entry.valid_until, EASTERN.localize(datetime(2017, 3, 12, 3)))
+        self.assertEqual(entry.valid_until - now, timedelta(minutes=30))
+        # an instant in another zone is read on the clock of `tz`
+        entry = valid_for(Range, 'today', tz='Europe/Paris', now=EASTERN.localize(NOW))
+        paris = pytz.timezone('Europe/Paris')
+        self.assertEqual(entry.value, Range('tomorrow', tz='Europe/Paris', now=paris.localize(NOW)))
+        self.assertEqual(entry.valid_until, paris.localize(datetime(2017, 6, 18)))
+
+    def test_cache(self):
+        cache = ResultCache()
+        first = cache.lookup('today', now=NOW)
+        self.assertIs(cache.get('today', now=NOW + timedelta(hours=4)), first.value)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # served until the boundary passes, then resolved again
+        later = cache.lookup('today', now=datetime(2017, 6, 17, 0, 0, 1))
+        self.assertIsNot(later.value, first.value)
+        self.assertEqual(later.value, Range('tomorrow', now=NOW))
+        self.assertEqual(later.valid_until, datetime(2017, 6, 18))
+        # nor before it was resolved, when the clock went back
+        self.assertEqual(cache.get('today', now=NOW), Range('today', now=NOW))
+        self.assertEqual(cache.misses, 3)
+
+        # phrases that change every second are resolved on every call
+        cache.clear()
+        for second in range(3):
+            now = NOW + timedelta(seconds=second)
+            entry = cache.lookup('last 5 minutes', now=now)
+            self.assertEqual(entry, (Range('last 5 minutes', now=now), now))
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+    def test_keys(self):
+        cache = ResultCache()
+        self.assertEqual(cache.get('today', tz='US/Eastern', now=EASTERN.localize(NOW)).start.date,
+                         EASTERN.localize(datetime(2017, 6, 16)))
+        self.assertNotEqual(cache.get('this week', now=NOW), cache.get('this week', week_start=7, now=NOW))
+        self.assertEqual(cache.get('monday', context=Context.PREV, now=NOW), Range('last monday', now=NOW))
+        self.assertEqual(cache.get('today', kind=Date, now=NOW), Date('today', now=NOW))
+        self.assertEqual(len(cache), 5)
+
+    def test_eviction(self):
+        cache = ResultCache(max_entries=2)
+        for phrase in ('today', 'this week', 'this month'):
+            cache.get(phrase, now=NOW)
+        self.assertEqual(len(cache), 2)
+        cache.get('today', now=NOW)
+        self.assertEqual(cache.misses, 4)
+
+    def test_evaluate(self):
+        daily = [datetime(2017, 1, 1, 7) + timedelta(days=day) for day in range(365)]
+        hourly = [NOW + timedelta(hours=hour, minutes=13) for hour in range(24 * 40)]
+        for nows in (daily, hourly[::-1]):
+            for phrase in ('last week', 'this month', 'today', 'monday', 'since last friday',
+                           'this weekend', '2 days ago', '10am', 'this hour', 'infinity'):
+                for skip in (True, False):
+                    batch = evaluate(phrase, nows, skip=skip)
+                    self.assertIsNone(batch.tz)
+                    expected = [Range(phrase, now=now) for now in nows]
+                    self.assertEqual(list(batch.ends), [to_micros(r.end) for r in expected], phrase)
+                    self.assertEqual(list(batch.starts), [NEG_INFINITY if r.start == 'infinity'
+                                                          else to_micros(r.start) for r in expected], phrase)
+            batch = evaluate('yesterday at 10am', nows, kind=Date)
+            self.assertEqual(list(batch.micros), [to_micros(Date('yesterday at 10am', now=now))
+                                                  for now in nows])
+
+    def test_evaluate_zones(self):
+        zones = ['US/Eastern', 'Asia/Tokyo', 'Europe/Paris']
+        now = pytz.utc.localize(NOW)
+        batch = evaluate('today', [now], tz=zones)
+        self.assertEqual(str(batch.tz), 'UTC')
+        for (start, end), zone in zip(zip(batch.starts, batch.ends), zones):
+            expected = Range('today', tz=zone, now=now.astimezone(pytz.timezone(zone)))
+            self.assertEqual((start, end), (to_micros(expected.start), to_micros(expected.end)))
+        self.assertEqual(batch.starts[0], to_micros(EASTERN.localize(datetime(2017, 6, 16))))
+
+        batch = evaluate('today', [now, now + timedelta(days=1)], tz='US/Eastern')
+        self.assertEqual(str(batch.tz), 'US/Eastern')
+        self.assertEqual(list(batch), [Range('today', now=EASTERN.localize(NOW)),
+                                       Range('tomorrow', now=EASTERN.localize(NOW))])
+        self.assertEqual(len(evaluate('today', tz=zones)), 3)
+        # naive nows are wall clock times of the zone
+        self.assertEqual(list(evaluate('today', [NOW], tz='US/Eastern')),
+                         [Range('today', now=EASTERN.localize(NOW))])
+        batch = evaluate('today', [NOW], tz=zones)
+        self.assertEqual(batch.starts[1], to_micros(pytz.timezone('Asia/Tokyo').localize(datetime(2017, 6, 16))))
+        with self.assertRaises(ValueError):
+            evaluate('today', [now, now], tz=zones)
+
+    @freeze_time('2017-06-16 19:37:22')
+    def test_clock(self):
+        from timestring import results
+        self.assertEqual(results.valid_until('this hour'), datetime(2017, 6, 16, 20))
+        self.assertEqual(results.get('this hour'), Range('this hour'))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
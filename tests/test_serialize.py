@@ -0,0 +1,98 @@
+import json
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+from freezegun import freeze_time
+
+from timestring import Date, Range, TimestringInvalid
+from timestring.batch import DateBatch, RangeBatch, EPOCH, INFINITY, NEG_INFINITY
+from timestring.serialize import dumps, iso_strings, loads_dates, loads_ranges
+
+EASTERN = pytz.timezone('US/Eastern')
+
+
+def aware_ranges(count=500, seed=1):
+    rnd = random.Random(seed)
+    ranges = []
+    for _ in range(count):
+        start = EPOCH + timedelta(seconds=rnd.randrange(0, 2 * 10 ** 9), microseconds=rnd.choice([0, 5]))
+        start = pytz.utc.localize(start).astimezone(EASTERN)
+        ranges.append(Range(start, EASTERN.normalize(start + timedelta(hours=rnd.randrange(1, 5000)))))
+    return ranges
+
+
+@freeze_time('2017-06-16 19:37:22')
+class T(unittest.TestCase):
+    def assert_same(self, a, b, zone=True):
+        self.assertEqual(a.start, b.start)
+        self.assertEqual(a.end, b.end)
+        if zone:  # ISO text keeps the offsets only
+            self.assertEqual(a.start.tz, b.start.tz)
+
+    def test_date(self):
+        date = Date('today')
+        self.assertEqual(date.to_iso(), '2017-06-16T00:00:00')
+        self.assertEqual(date.to_dict(), dict(date='2017-06-16T00:00:00', tz=None))
+        self.assertEqual(Date.from_iso('2017-06-16T00:00:00'), date)
+        self.assertEqual(Date.from_dict(date.to_dict()), date)
+        self.assertEqual(Date('infinity').to_iso(), 'infinity')
+        self.assertEqual(Date.from_iso('infinity'), 'infinity')
+
+        aware = Date(EASTERN.localize(datetime(2017, 12, 16, 10)))
+        self.assertEqual(aware.to_dict(), dict(date='2017-12-16T10:00:00-05:00', tz='US/Eastern'))
+        back = Date.from_dict(aware.to_dict())
+        self.assertEqual(back, aware)
+        self.assertEqual(back.tz.zone, 'US/Eastern')
+        self.assertEqual(back.date.tzname(), 'EST')
+        with self.assertRaises(TimestringInvalid):
+            Date.from_iso('next week')
+
+    def test_range(self):
+        today = Range('today')
+        self.assertEqual(today.to_iso(), '2017-06-16T00:00:00/2017-06-17T00:00:00')
+        self.assertEqual(today.to_dict(), dict(start='2017-06-16T00:00:00', end='2017-06-17T00:00:00', tz=None))
+        self.assert_same(Range.from_iso(today.to_iso()), today)
+        self.assert_same(Range.from_dict(today.to_dict()), today)
+
+        since = Range('today', 'infinity')
+        self.assertEqual(since.to_iso(), '2017-06-16T00:00:00/..')
+        until = Range.from_iso('../2017-06-16T00:00:00')
+        self.assertEqual(until.start, 'infinity')
+        self.assertEqual(until.to_dict()['start'], '-infinity')
+        self.assert_same(Range.from_dict(until.to_dict()), until)
+        with self.assertRaises(TimestringInvalid):
+            Range.from_iso('2017-06-16')
+
+    def test_round_trip(self):
+        ranges = aware_ranges() + [Range('today'), Range('today', 'infinity')]
+        for format in ('iso', 'dict'):
+            text = dumps(ranges, format)
+            self.assertEqual(len(json.loads(text)), len(ranges))
+            for before, after in zip(ranges, loads_ranges(text)):
+                self.assert_same(before, after, zone=format == 'dict')
+
+        dates = [r.start for r in ranges]
+        for format in ('iso', 'dict'):
+            self.assertEqual(loads_dates(dumps(dates, format)), dates)
+
+    def test_batches(self):
+        ranges = aware_ranges()
+        batch = RangeBatch.from_ranges(ranges, tz=EASTERN)
+        for format in ('iso', 'dict'):
+            self.assertEqual(dumps(batch, format), dumps(ranges, format))
+        dates = DateBatch.from_dates([r.start for r in ranges], tz=EASTERN)
+        self.assertEqual(dumps(dates, 'dict'), dumps(list(r.start for r in ranges), 'dict'))
+
+        self.assertEqual(dumps(RangeBatch([NEG_INFINITY, 0], [0, INFINITY])),
+                         '["../1970-01-01T00:00:00","1970-01-01T00:00:00/.."]')
+        self.assertEqual(list(iso_strings([0], 'Asia/Kolkata')), ['1970-01-01T05:30:00+05:30'])
+        self.assertEqual(list(iso_strings([0], 'Europe/Amsterdam')), ['1970-01-01T01:00:00+01:00'])
+        self.assertEqual(dumps([]), '[]')
+        with self.assertRaises(ValueError):
+            dumps(ranges, 'csv')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from datetime import datetime
+
+try:
+    import pandas as pd
+    import timestring.series  # noqa: registers the accessor
+except ImportError:
+    pd = None
+
+from timestring import Range, TimestringInvalid
+
+NOW = datetime(2017, 6, 16, 19, 37, 22)
+
+
+@unittest.skipUnless(pd, 'pandas is not installed')
+class T(unittest.TestCase):
+    def test_range(self):
+        series = pd.Series(['next week', 'today', 'next week', 'today to infinity'], index=list('abcd'))
+        frame = series.timestring.range(now=NOW)
+        self.assertEqual(list(frame.index), list('abcd'))
+        self.assertEqual(str(frame.start.dtype), 'datetime64[ns]')
+        self.assertEqual(list(frame.start[:3]), [pd.Timestamp('2017-06-19'), pd.Timestamp('2017-06-16'),
+                                                 pd.Timestamp('2017-06-19')])
+        self.assertEqual(frame.end['a'], pd.Timestamp(Range('next week', now=NOW).end.date))
+        self.assertEqual(frame.end['d'], pd.Timestamp.max)
+
+        frame = series.timestring.range(tz='US/Eastern', now=NOW)
+        self.assertEqual(str(frame.end.dtype), 'datetime64[ns, US/Eastern]')
+        self.assertEqual(frame.start['b'], pd.Timestamp('2017-06-16', tz='US/Eastern'))
+
+        intervals = series[:2].timestring.range(now=NOW, interval=True)
+        self.assertIsInstance(intervals, pd.IntervalIndex)
+        self.assertEqual(intervals.closed, 'left')
+        self.assertIn(pd.Timestamp('2017-06-16 12:00'), intervals[1])
+
+    def test_errors(self):
+        series = pd.Series(['today', 'garbage', None])
+        with self.assertRaises(TimestringInvalid):
+            series.timestring.range(now=NOW)
+        frame = series.timestring.range(now=NOW, errors='coerce')
+        self.assertEqual(list(frame.start.isna()), [False, True, True])
+        self.assertEqual(list(frame.end.isna()), [False, True, True])
+
+    def test_parses_uniques(self):
+        parsed = []
+        init = Range.__init__
+
+        def counting(self, start, *args, **kwargs):
+            parsed.append(start)
+            init(self, start, *args, **kwargs)
+        Range.__init__ = counting
+        try:
+            pd.Series(['today', 'tomorrow'] * 50).timestring.range(now=NOW)
+        finally:
+            Range.__init__ = init
+        self.assertEqual(sorted(parsed), ['today', 'tomorrow'])
+
+    def test_date(self):
+        dates = pd.Series(['today', 'jan 5 2015', 'today']).timestring.date(now=NOW)
+        self.assertEqual(list(dates), [pd.Timestamp('2017-06-16'), pd.Timestamp('2015-01-05'),
+                                       pd.Timestamp('2017-06-16')])
+
+    def test_in_range(self):
+        series = pd.Series(pd.to_datetime(['2017-06-12 10:00', '2017-06-20 00:00', '2017-06-16 00:00']))
+        self.assertEqual(list(series.timestring.in_range('this week', now=NOW)), [True, False, True])
+        self.assertEqual(list(series.dt.tz_localize('UTC').timestring.in_range('this week', now=NOW)),
+                         [True, False, True])
+        self.assertEqual(list(series.timestring.in_range(Range('today', 'infinity', now=NOW))),
+                         [False, True, True])
+        phrases = pd.Series(['today', 'jan 5 2015'])
+        self.assertEqual(list(phrases.timestring.in_range('this year', now=NOW)), [True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
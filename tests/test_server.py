@@ -0,0 +1,106 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from io import StringIO
+
+from timestring.cli import build_parser, run_client, run_stdin
+from timestring.server import Client, make_server
+
+
+class T(unittest.TestCase):
+    def start(self, **kw):
+        server = make_server(**kw)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_tcp(self):
+        server = self.start(port=0)
+        host, port = server.server_address
+        with Client(host=host, port=port) as client:
+            response = client.request(id=7, phrases=['today', 'next week', 'garbage'], now='jan 5 2015')
+            self.assertEqual(response['id'], 7)
+            self.assertEqual(response['results'], [
+                {'start': '2015-01-05T00:00:00', 'end': '2015-01-06T00:00:00'},
+                {'start': '2015-01-12T00:00:00', 'end': '2015-01-19T00:00:00'},
+                {'error': 'Invalid range: garbage'},
+            ])
+            self.assertGreaterEqual(response['elapsed_ms'], 0)
+
+            response = client.request(phrase='tomorrow', date=True, now='jan 5 2015', tz='UTC',
+                                      timestamps='epoch')
+            self.assertEqual(response['results'], [{'date': 1420502400.0}])
+
+            for phrases in ('today', 12, ['today', None]):
+                self.assertEqual(client.request(id=8, phrases=phrases),
+                                 {'id': 8, 'error': 'Invalid phrases: expected a list of strings'})
+            self.assertIn('error', client.request(phrase=5))
+
+            stats = client.request(op='stats')['stats']
+            self.assertEqual(stats['requests'], 2)
+            self.assertEqual(stats['phrases'], 4)
+            self.assertEqual(stats['errors'], 1)
+            self.assertIn('p99_ms', stats)
+            self.assertGreater(stats['cache']['currsize'], 0)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets')
+    def test_unix_socket(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'timestring.sock')
+        self.start(socket_path=path)
+
+        with Client(path) as client:
+            self.assertEqual(client.request(op='ping')['pong'], True)
+            client._file.write(b'not json\n')
+            client._file.flush()
+            self.assertIn('Invalid request', client._file.readline().decode())
+
+        args = build_parser().parse_args(['--socket', path, '--stdin', '--now', 'jan 5 2015',
+                                          '--errors', 'skip'])
+        stdout = StringIO()
+        self.assertEqual(run_client(args, stdin=StringIO('yesterday\ngarbage\n'), stdout=stdout), 0)
+        self.assertEqual(stdout.getvalue(), '{"phrase": "yesterday", "start": "2015-01-04T00:00:00", '
+                                            '"end": "2015-01-05T00:00:00"}\n')
+
+        # the same records as without a server
+        for argv in (['--format', 'csv', '--errors', 'null'], ['--format', 'tsv', '--date'],
+                     ['--errors', 'null']):
+            argv = ['--stdin', '--now', 'jan 5 2015'] + argv
+            local = StringIO()
+            run_stdin(build_parser().parse_args(argv), stdin=StringIO('yesterday\ngarbage\n'), stdout=local)
+            remote = StringIO()
+            run_client(build_parser().parse_args(['--socket', path] + argv),
+                       stdin=StringIO('yesterday\ngarbage\n'), stdout=remote)
+            self.assertEqual(remote.getvalue(), local.getvalue())
+
+        args = build_parser().parse_args(['--socket', path, '--now', 'jan 5 2015', 'garbage'])
+        self.assertEqual(run_client(args, stdout=StringIO()), 1)
+
+        # a live server keeps its socket, a stale one is replaced
+        with self.assertRaises(OSError):
+            make_server(socket_path=path)
+        with Client(path) as client:
+            self.assertEqual(client.request(op='ping')['pong'], True)
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale_path = os.path.join(directory, 'stale.sock')
+        stale.bind(stale_path)
+        stale.close()
+        make_server(socket_path=stale_path).server_close()
+
+
+def main():
+    os.environ['TZ'] = 'UTC'
+    time.tzset()
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import itertools
+import unittest
+
+from word2number import w2n
+
+from timestring import TimestringInvalid
+from timestring.utils import get_num
+
+# Everything the `num` group of TIMESTRING_RE can capture a word of
+WORDS = ['1', '2.5', '10', 'couple', 'couple of', 'one', 'two', 'twenty', 'twelve', 'three',
+         'thirty', 'thirteen', 'four', 'fourteen', 'forty', 'five', 'fifteen', 'fifty', 'six',
+         'sixteen', 'sixty', 'seven', 'seventeen', 'seventy', 'eight', 'eighteen', 'eighty',
+         'nine', 'nineteen', 'ninety', 'ten', 'eleven', 'hundred']
+
+
+def reference(num):
+    """get_num as implemented on top of word2number"""
+    if isinstance(num, (int, float)):
+        return num
+    if 'couple' in (num or ''):
+        return 2
+    try:
+        return float(num)
+    except ValueError:
+        try:
+            return w2n.word_to_num(num or 'one')
+        except ValueError:
+            raise TimestringInvalid('Unknown number: %s' % num)
+
+
+def outcome(func, num):
+    try:
+        value = func(num)
+        return value, type(value)
+    except TimestringInvalid:
+        return TimestringInvalid
+
+
+class T(unittest.TestCase):
+    def test_get_num(self):
+        self.assertEqual(get_num(3), 3)
+        self.assertEqual(get_num(''), 1)
+        self.assertEqual(get_num('twenty one'), 21)
+        self.assertEqual(get_num('twelve hundred'), 1200)
+        self.assertEqual(get_num('one point five'), 1.5)
+        self.assertEqual(get_num(' 2.5 '), 2.5)
+        with self.assertRaises(TimestringInvalid):
+            get_num('some')
+
+    def test_word2number_compatible(self):
+        for size in (1, 2, 3):
+            for words in itertools.product(WORDS, repeat=size):
+                for num in (' '.join(words), ' '.join(words) + ' '):
+                    self.assertEqual(outcome(get_num, num), outcome(reference, num), num)
+
+
+if __name__ == '__main__':
+    unittest.main()
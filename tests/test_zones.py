@@ -0,0 +1,147 @@
+import os
+import random
+import time
+import unittest
+from array import array
+from datetime import datetime, timedelta
+
+import pytz
+
+from timestring import Date, TimestringInvalid
+from timestring.batch import DateBatch, RangeBatch, EPOCH, INFINITY, NEG_INFINITY, to_micros
+from timestring.zones import transitions, convert, localize, convert_datetimes, localize_datetimes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EASTERN = pytz.timezone('US/Eastern')
+ZONES = ('US/Eastern', 'Europe/London', 'Australia/Lord_Howe', 'Pacific/Apia',
+         'Asia/Kolkata', 'America/Sao_Paulo', 'UTC')
+
+
+def wall(*args):
+    return to_micros(datetime(*args))
+
+
+def samples(count=5000, seed=1):
+    rnd = random.Random(seed)
+    return [rnd.randrange(-2 * 10 ** 15, 2 * 10 ** 15) for _ in range(count)]
+
+
+def fromutc(micros, zone):
+    utc = (EPOCH + timedelta(microseconds=micros)).replace(tzinfo=zone)
+    return to_micros(zone.fromutc(utc).replace(tzinfo=None))
+
+
+class T(unittest.TestCase):
+    def test_table(self):
+        table = transitions('US/Eastern')
+        self.assertIs(table, transitions(EASTERN))
+        self.assertEqual(table.transitions[0], NEG_INFINITY)
+        self.assertEqual(table.offsets[table.index(wall(2017, 6, 16))], -4 * 3600 * 10 ** 6)
+        self.assertEqual(table.offsets[table.index(wall(2017, 12, 16))], -5 * 3600 * 10 ** 6)
+        self.assertEqual(list(transitions('UTC').offsets), [0])
+        self.assertEqual(list(transitions(pytz.FixedOffset(90)).offsets), [90 * 60 * 10 ** 6])
+
+    def test_convert(self):
+        self.assertEqual(convert([wall(2017, 6, 16, 4), INFINITY, NEG_INFINITY], 'US/Eastern'),
+                         array('q', [wall(2017, 6, 16), INFINITY, NEG_INFINITY]))
+        for name in ZONES:
+            zone = pytz.timezone(name)
+            values = samples()
+            self.assertEqual(list(convert(values, zone)), [fromutc(v, zone) for v in values], name)
+
+    def test_localize(self):
+        self.assertEqual(localize([wall(2017, 6, 16), INFINITY], 'US/Eastern'),
+                         array('q', [wall(2017, 6, 16, 4), INFINITY]))
+        for name in ZONES:
+            zone = pytz.timezone(name)
+            walls = convert(samples(), zone)
+            for ambiguous in ('earliest', 'latest'):
+                utc = localize(walls, zone, ambiguous=ambiguous)
+                self.assertEqual(convert(utc, zone), walls, name)
+            for value, utc in zip(walls, localize(walls, zone, ambiguous='earliest')):
+                local = EPOCH + timedelta(microseconds=value)
+                try:
+                    expected = zone.localize(local, is_dst=None)
+                except pytz.AmbiguousTimeError:
+                    expected = zone.localize(local, is_dst=True)
+                self.assertEqual(utc, to_micros(expected), (name, local))
+
+    def test_ambiguous(self):
+        twice = [wall(2017, 11, 5, 1, 30)]
+        with self.assertRaises(TimestringInvalid):
+            localize(twice, EASTERN)
+        self.assertEqual(localize(twice, EASTERN, ambiguous='earliest')[0],
+                         to_micros(EASTERN.localize(datetime(2017, 11, 5, 1, 30), is_dst=True)))
+        self.assertEqual(localize(twice, EASTERN, ambiguous='latest')[0],
+                         to_micros(EASTERN.localize(datetime(2017, 11, 5, 1, 30), is_dst=False)))
+        with self.assertRaises(ValueError):
+            localize(twice, EASTERN, ambiguous='first')
+
+    def test_nonexistent(self):
+        never = [wall(2017, 3, 12, 2, 30)]
+        with self.assertRaises(TimestringInvalid):
+            localize(never, EASTERN)
+        jump = to_micros(datetime(2017, 3, 12, 7, tzinfo=pytz.utc))
+        self.assertEqual(localize(never, EASTERN, nonexistent='shift_forward')[0], jump)
+        self.assertEqual(localize(never, EASTERN, nonexistent='shift_backward')[0], jump - 1)
+        with self.assertRaises(ValueError):
+            localize(never, EASTERN, nonexistent='skip')
+
+    @unittest.skipUnless(numpy, 'numpy is not installed')
+    def test_numpy(self):
+        for name in ZONES:
+            zone = pytz.timezone(name)
+            values = samples() + [INFINITY, NEG_INFINITY]
+            walls = convert(numpy.array(values), zone)
+            self.assertIsInstance(walls, numpy.ndarray)
+            self.assertEqual(list(walls), list(convert(values, zone)), name)
+            for ambiguous in ('earliest', 'latest'):
+                for nonexistent in ('shift_forward', 'shift_backward'):
+                    self.assertEqual(list(localize(walls, zone, ambiguous, nonexistent)),
+                                     list(localize(list(walls), zone, ambiguous, nonexistent)), name)
+        edges = numpy.array([wall(2017, 11, 5, 1, 30), wall(2017, 3, 12, 2, 30)])
+        with self.assertRaises(TimestringInvalid):
+            localize(edges[:1], EASTERN)
+        with self.assertRaises(TimestringInvalid):
+            localize(edges[1:], EASTERN, ambiguous='latest')
+
+    def test_datetimes(self):
+        summer = convert_datetimes([datetime(2017, 6, 16, 4), Date('2017-12-16 05:00:00'), 'infinity'], EASTERN)
+        self.assertEqual(summer[0], EASTERN.localize(datetime(2017, 6, 16)))
+        self.assertEqual(summer[0].tzname(), 'EDT')
+        self.assertEqual(summer[1].tzname(), 'EST')
+        self.assertEqual(summer[2], 'infinity')
+        aware = convert_datetimes([datetime(2017, 6, 16, 4, tzinfo=pytz.utc)], 'Europe/London')
+        self.assertEqual(aware[0].replace(tzinfo=None), datetime(2017, 6, 16, 5))
+
+        local = localize_datetimes([datetime(2017, 11, 5, 1, 30)], EASTERN, ambiguous='latest')
+        self.assertEqual(local[0], EASTERN.localize(datetime(2017, 11, 5, 1, 30), is_dst=False))
+        self.assertEqual(local[0].tzname(), 'EST')
+
+    def test_batches(self):
+        dates = DateBatch([wall(2017, 6, 16), wall(2017, 12, 16), INFINITY])
+        aware = dates.localize('US/Eastern')
+        self.assertEqual(aware.tz, EASTERN)
+        self.assertEqual(list(aware.micros), [wall(2017, 6, 16, 4), wall(2017, 12, 16, 5), INFINITY])
+        self.assertEqual(aware.wall().micros, dates.micros)
+        self.assertIsNone(aware.wall().tz)
+
+        ranges = RangeBatch([NEG_INFINITY, wall(2017, 6, 16)], [wall(2017, 6, 16), INFINITY])
+        aware = ranges.localize(EASTERN)
+        self.assertEqual(list(aware.starts), [NEG_INFINITY, wall(2017, 6, 16, 4)])
+        self.assertEqual(aware.wall().starts, ranges.starts)
+        self.assertEqual(aware.wall().ends, ranges.ends)
+
+
+def main():
+    os.environ['TZ'] = 'UTC'
+    time.tzset()
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
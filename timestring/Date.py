@@ -1,14 +1,12 @@
 import re
 import time
-from copy import copy
-from datetime import datetime, timedelta
+import warnings
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Union
 
-import pytz
-
 from timestring import TimestringInvalid, Context
-from .timestring_re import TIMESTRING_RE
-from .utils import get_num
+from .utils import add_months, check_eom, fields, get_num, groups, search
 
 try:
     unicode
@@ -55,20 +53,105 @@ TIMEDELTA_UNITS = dict(
 )
 
 
+def _zone_key(tz):
+    """:return: a small picklable key of a tzinfo: a pytz zone name, the
+     seconds of a fixed offset, or the tzinfo itself
+    """
+    if tz is None:
+        return None
+    name = getattr(tz, 'zone', None)
+    if name is not None:
+        return name
+    if isinstance(tz, timezone):
+        return int(tz.utcoffset(None).total_seconds())
+    return tz
+
+
+@lru_cache(maxsize=64)
+def _zone(key):
+    if isinstance(key, str):
+        import pytz
+        return pytz.timezone(key)
+    if isinstance(key, int):
+        return timezone(timedelta(seconds=key))
+    return key
+
+
+def _state(value):
+    """:return: the (micros, zone key) a datetime or 'infinity' is pickled
+     as. A pytz offset its zone does not have at that instant, like the LMT
+     of a zone's default tzinfo, is kept as (wall clock micros, tzinfo).
+    """
+    if value == 'infinity':
+        return None, None
+    from .batch import from_micros, to_micros
+    micros, tz = to_micros(value), value.tzinfo
+    key = _zone_key(tz)
+    if isinstance(key, str) and from_micros(micros, _zone(key)).tzinfo is not tz:
+        return to_micros(value.replace(tzinfo=None)), tz
+    return micros, key
+
+
+def _restore(micros, zone):
+    """Rebuild a pickled Date, see Date.__reduce__"""
+    if micros is None:
+        return _wrap('infinity')
+    from .batch import from_micros
+    if hasattr(zone, 'localize'):
+        return _wrap(from_micros(micros).replace(tzinfo=zone))
+    return _wrap(from_micros(micros, _zone(zone) if zone is not None else None))
+
+
+def _wrap(value):
+    """:return: a Date of a resolved datetime (or 'infinity'), without parsing"""
+    date = Date.__new__(Date)
+    date._original = value
+    date.date = value
+    return date
+
+
+def _share(date):
+    """:return: `date` to keep in a Range, or while the deprecated setters
+     can still move it in place, a new Date of its datetime
+    """
+    return _wrap(date.date) if Date.mutable else date
+
+
+def _set(date, name, **k):
+    """Move `date` in place for the deprecated setters."""
+    if not Date.mutable:
+        raise AttributeError('Date.%s is read-only, use Date.replace' % name)
+    warnings.warn('Setting Date.%s is deprecated, Dates are shared values: use '
+                  'Date.replace for a new Date' % name, DeprecationWarning, stacklevel=3)
+    date.date = date.date.replace(**k)
+
+
 class Date(object):
+    """A resolved instant. Dates are values: `replace`, `plus` and the
+    arithmetic return new Dates, and with `mutable` False Dates are shared,
+    not copied, by the Ranges built from them.
+    """
+    # The setters (year, month, ..., tz) still move a Date in place, with a
+    # DeprecationWarning, so Ranges keep their own Dates. False makes them
+    # raise AttributeError instead.
+    mutable = True
+
     def __init__(self, date=None, offset: dict = None, tz: str = None,
                  now: datetime = None, verbose=False, context=None):
         self._original = date
         if tz:
+            import pytz
             tz = pytz.timezone(str(tz))
         else:
             tz = None
 
         if not now:
             now = datetime.now(tz)
+        elif isinstance(now, Date):
+            now = now.date
 
         if isinstance(date, Date):
-            self.date = copy(date.date)
+            self.date = date.date
 
         elif isinstance(date, datetime):
             self.date = date
@@ -91,18 +174,16 @@ class Date(object):
             if type(date) in (str, unicode):
                 # Convert the string to a dict
                 _date = date.lower()
-                res = TIMESTRING_RE.search(_date.strip())
+                res = search(_date.strip())
 
                 if res:
-                    date = res.groupdict()
+                    date = groups(res)
                     if verbose:
-                        print("Matches:\n", ''.join(["\t%s: %s\n" % (k, v) for k, v in date.items() if v]))
+                        print("Matches:\n", ''.join(["\t%s: %s\n" % (k, v) for k, v in date.items()]))
                 else:
                     raise TimestringInvalid('Invalid date string: %s' % date)
 
-                date = dict((k, v if type(v) is str else v) for k, v in date.items() if v)
-
-            new_date = copy(now)
+            new_date = now
 
             # TODO Refactor
             if isinstance(date, dict):  # This will always be True
@@ -165,7 +246,8 @@ class Date(object):
                     else:
                         month_ord = MONTH_ORDINALS.get(month_, new_date.month)
 
-                    new_date = new_date.replace(month=int(month_ord))
+                    # clamped, "june" on the 31st is not June 31st
+                    new_date = add_months(new_date, int(month_ord) - new_date.month)
 
                     if year == []:
                         if date.get('next') or context == Context.NEXT:
@@ -226,7 +308,7 @@ class Date(object):
                 if (year != [] or month) and weekday is None and not (day or hour):
                     new_date = new_date.replace(day=1)
                 if not hour and daytime is None and not unit:
-                    new_date = new_date.replace(hour=0, minute=0, second=0)
+                    new_date = new_date.replace(hour=0, minute=0, second=0, microsecond=0)
 
             self.date = new_date
 
@@ -236,9 +318,32 @@ class Date(object):
         if offset and isinstance(offset, dict):
             self.date = self.date.replace(**offset)
 
+    @classmethod
+    def from_fields(cls, tz: str = None, now: datetime = None, context=None,
+                    offset: dict = None, **kwargs):
+        """The Date of a phrase given as its fields instead of text, with the
+        same rules, such as the next Friday of weekday=5.
+
+        >>> Date.from_fields(year=2017, month=6, day=16, hour=19, minute=37)
+        >>> Date.from_fields(num=3, unit='days', sign=1)  # "in 3 days"
+
+        :param kwargs: the fields, see utils.fields
+        """
+        return cls(fields(**kwargs), offset=offset, tz=tz, now=now, context=context)
+
     def __repr__(self):
         return "<timestring.Date %s %s>" % (str(self), id(self))
 
+    def __reduce__(self):
+        """Pickle as microseconds since the epoch (UTC for aware values)
+        and a zone key only, not the phrase parsed or the tzinfo.
+        """
+        return _restore, _state(self.date)
+
+    def __conform__(self, protocol):
+        from .postgres import conform
+        return conform(self, protocol)
+
     @property
     def year(self):
         if self.date != 'infinity':
@@ -246,7 +351,7 @@ class Date(object):
 
     @year.setter
     def year(self, year: int):
-        self.date = self.date.replace(year=year)
+        _set(self, 'year', year=year)
 
     @property
     def month(self):
@@ -255,7 +360,7 @@ class Date(object):
 
     @month.setter
     def month(self, month: int):
-        self.date = self.date.replace(month=month)
+        _set(self, 'month', month=month)
 
     @property
     def day(self):
@@ -264,7 +369,7 @@ class Date(object):
 
     @day.setter
     def day(self, day: int):
-        self.date = self.date.replace(day=day)
+        _set(self, 'day', day=day)
 
     @property
     def hour(self):
@@ -273,7 +378,7 @@ class Date(object):
 
     @hour.setter
     def hour(self, hour: int):
-        self.date = self.date.replace(hour=hour)
+        _set(self, 'hour', hour=hour)
 
     @property
     def minute(self):
@@ -282,7 +387,7 @@ class Date(object):
 
     @minute.setter
     def minute(self, minute: int):
-        self.date = self.date.replace(minute=minute)
+        _set(self, 'minute', minute=minute)
 
     @property
     def second(self):
@@ -291,7 +396,7 @@ class Date(object):
 
     @second.setter
     def second(self, second: int):
-        self.date = self.date.replace(second=second)
+        _set(self, 'second', second=second)
 
     @property
     def microsecond(self):
@@ -300,7 +405,7 @@ class Date(object):
 
     @microsecond.setter
     def microsecond(self, microsecond: int):
-        self.date = self.date.replace(microsecond=microsecond)
+        _set(self, 'microsecond', microsecond=microsecond)
 
     @property
     def isoweekday(self):
@@ -321,62 +426,40 @@ class Date(object):
     def tz(self, tz: str):
         if self.date != 'infinity':
             if tz is None:
-                self.date = self.date.replace(tzinfo=None)
+                _set(self, 'tz', tzinfo=None)
             else:
-                self.date = self.date.replace(tzinfo=pytz.timezone(tz))
+                import pytz
+                _set(self, 'tz', tzinfo=pytz.timezone(tz))
 
     def replace(self, **k):
         """Note returns a new Date obj"""
         if self.date != 'infinity':
-            return Date(self.date.replace(**k))
+            return _wrap(self.date.replace(**k))
         else:
-            return Date('infinity')
+            return self
 
-    def plus_(self, num: Union[str, int, float], unit: str, sign: int = 1):
+    def plus_(self, num: Union[str, int, float], unit: str, sign: int = 1, eom: str = 'clamp'):
+        """
+        :return: a new Date moved by `num` units. Years, quarters and months
+         are calendar arithmetic, see utils.add_months for `eom`; fractions of
+         them are added as 365 (year) and 30 (month) days
+        """
         assert sign in [-1, 1]
+        check_eom(eom)
         mag = get_num(num)
         n = sign * mag
         whole = int(n)
         fraction = n - whole
 
         unit = unit.lower().strip()
-        new_date = copy(self.date)
+        new_date = self.date
         if unit.startswith('y'):
-            try:
-                new_date = new_date.replace(year=new_date.year + whole)
-                new_date += timedelta(days=365 * fraction)
-            except ValueError:  # Leap date in a non-leap year
-                new_date += timedelta(days=365 * n)
+            new_date = add_months(new_date, 12 * whole, eom) + timedelta(days=365 * fraction)
         elif unit.startswith('month'):
-            try:
-                month = new_date.month + whole
-                new_date = new_date.replace(
-                    year=new_date.year + month // 12,
-                    month=abs(month) % 12
-                )
-                new_date += timedelta(days=30 * fraction)
-            except ValueError:  # No such day in that month
-                new_date += timedelta(days=30 * n)
-
+            new_date = add_months(new_date, whole, eom) + timedelta(days=30 * fraction)
         elif unit.startswith('q'):
-            # TODO This section is not working
-            q1 = datetime(new_date.year, 1, 1)
-            q2 = datetime(new_date.year, 4, 1)
-            q3 = datetime(new_date.year, 7, 1)
-            q4 = datetime(new_date.year, 10, 1)
-            if q1 <= new_date < q2:
-                if n == -1:
-                    new_date = datetime(new_date.year - 1, 10, 1)
-                else:
-                    new_date = q2
-            elif q2 <= new_date < q3:
-                pass
-            elif q3 <= new_date < q4:
-                pass
-            else:
-                pass
-            new_date += timedelta(days=91 * n)
-
+            months = int(3 * n)
+            new_date = add_months(new_date, months, eom) + timedelta(days=30 * (3 * n - months))
         else:
             _unit = TIMEDELTA_UNITS.get(unit[0])
             if _unit:
@@ -384,7 +467,7 @@ class Date(object):
             else:
                 raise TimestringInvalid('Unknown time unit: ' + unit)
 
-        return Date(new_date)
+        return _wrap(new_date)
 
     def plus(self, duration: Union[str, int, float, timedelta]):
         """
@@ -395,20 +478,16 @@ class Date(object):
         if self.date == 'infinity':
             return
         if isinstance(duration, timedelta):
-            return Date(self.date + duration)
+            return _wrap(self.date + duration)
         if isinstance(duration, (str, unicode)):
             duration = duration.lower().strip()
-            res = TIMESTRING_RE.search(duration)
-            if res:
-                res = res.groupdict()
+            res = search(duration)
             sign = -1 if duration.startswith('-') else 1
             num = res.get('num')
             unit = res.get('delta') or res.get('delta_2')
             return self.plus_(num, unit, sign)
         elif isinstance(duration, (float, int)):
-            new = copy(self)
-            new.date = new.date + timedelta(seconds=duration)
-            return new
+            return _wrap(self.date + timedelta(seconds=duration))
 
         raise TimestringInvalid('Invalid type for plus(): %s'
                                 % (type(duration)))
@@ -418,14 +497,14 @@ class Date(object):
 
     def __add__(self, duration: Union[str, int, float, timedelta]):
         if self.date == 'infinity':
-            return copy(self)
+            return self
         return self.plus(duration)
 
     def __sub__(self, other):
         if isinstance(other, timedelta):
-            return Date(self.date - other)
+            return _wrap(self.date - other)
         if self.date == 'infinity':
-            return copy(self)
+            return self
         if isinstance(other, (str, unicode)):
             other = other[1:] if other.startswith('-') else ('-' + other)
         elif type(other) in (int, float, long):
@@ -538,3 +617,38 @@ class Date(object):
             return time.mktime(self.date.timetuple())
         else:
             return -1
+
+    def to_iso(self):
+        """:return: the ISO 8601 text of this Date, or 'infinity'"""
+        if self.date == 'infinity':
+            return 'infinity'
+        return self.date.isoformat()
+
+    @classmethod
+    def from_iso(cls, text: str, tz: str = None):
+        """:return: a Date of an ISO 8601 text (or 'infinity'), without
+         parsing it as a phrase. An aware value is converted to the zone `tz`.
+        """
+        if text in ('infinity', '-infinity'):
+            value = 'infinity'
+        else:
+            try:
+                value = datetime.fromisoformat(text)
+            except (TypeError, ValueError):
+                raise TimestringInvalid('Not an ISO 8601 date: %s' % text)
+            if tz and value.tzinfo is not None:
+                import pytz
+                value = value.astimezone(pytz.timezone(tz))
+        date = cls.__new__(cls)
+        date._original = text
+        date.date = value
+        return date
+
+    def to_dict(self):
+        """:return: {"date": ISO 8601 text, "tz": pytz zone name or None}"""
+        return dict(date=self.to_iso(), tz=getattr(self.tz, 'zone', None))
+
+    @classmethod
+    def from_dict(cls, value: dict):
+        """:return: the Date of a `to_dict` result"""
+        return cls.from_iso(value['date'], value.get('tz'))
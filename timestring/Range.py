@@ -1,15 +1,12 @@
 import re
-from copy import copy
+import warnings
 from datetime import datetime, timedelta
 from typing import Union
 
-import pytz
-
 from timestring import TimestringInvalid, Context, \
     WEEKEND_START_DAY, WEEKEND_START_HOUR, WEEKEND_END_DAY, WEEKEND_END_HOUR
-from .Date import Date
-from .timestring_re import TIMESTRING_RE
-from .utils import get_num
+from .Date import Date, _restore as _restore_date, _share, _state, _wrap
+from .utils import GROUPS, days_in_month, fields, get_num, search
 
 try:
     unicode
@@ -24,69 +21,145 @@ POSTGRES_RANGE_RE = re.compile(
 )
 
 
+def _say(verbose, message):
+    """Report the branch taken to a `verbose` callable, or print it."""
+    if callable(verbose):
+        verbose(message)
+    else:
+        print(message)
+
+
+def _move(date: Date, num, unit: str, eom: str = 'clamp'):
+    """:return: `date` moved by a signed `num` units of wall clock time,
+     re-localized when its zone has daylight saving changes
+    """
+    moved = date.plus_(abs(num), unit, -1 if num < 0 else 1, eom=eom)
+    zone = moved.date.tzinfo
+    if hasattr(zone, 'localize'):
+        return _wrap(zone.localize(moved.date.replace(tzinfo=None)))
+    return moved
+
+
+def _duration(duration):
+    """:return: (num, unit) of a duration string such as '7 days', a number
+     of seconds or a timedelta
+    """
+    if isinstance(duration, timedelta):
+        seconds = duration.days * 86400 + duration.seconds
+        if duration.microseconds:
+            return seconds * 1000000 + duration.microseconds, 'us'
+        return seconds, 'seconds'
+    if isinstance(duration, (int, float)):
+        return duration, 'seconds'
+    res = search(duration.lower().strip())
+    unit = res and (res.get('delta') or res.get('delta_2'))
+    if not unit:
+        raise TimestringInvalid('Invalid duration: %s' % duration)
+    num = get_num(res.get('num'))
+    return (-num if duration.strip().startswith('-') else num), unit
+
+
+def _restore(start_micros, start_zone, end_micros, end_zone):
+    """Rebuild a pickled Range, see Range.__reduce__"""
+    _range = Range.__new__(Range)
+    _range._dates = (_restore_date(start_micros, start_zone), _restore_date(end_micros, end_zone))
+    return _range
+
+
 class Range(object):
     def __init__(self, start: Union[int, str, long, float, datetime, Date],
                  end: Union[datetime, Date] = None, offset: dict = None,
                  week_start: int = 1, tz: str = None,
-                 verbose=False, context: Context = None):
-        """`start` can be type <class timestring.Date> or <type str>
+                 verbose=False, context: Context = None, now: datetime = None):
+        """`start` can be type <class timestring.Date> or <type str>, or the
+        groups of a phrase as made by utils.fields
+
+        :param verbose: print the matches and the branch taken, or a
+         callable to receive the name of each branch taken
+        :param now: the reference instant relative phrases resolve against,
+         the current time by default
         """
         self._dates = []
         pgoffset = None
         if tz:
+            import pytz
             tz = pytz.timezone(str(tz))
+        if isinstance(now, Date):
+            now = now.date
 
         if start is None:
             raise TimestringInvalid("Range object requires a start value")
 
-        if not isinstance(start, (Date, datetime)):
+        if isinstance(start, Date):
+            start = _share(start)
+        if isinstance(end, Date):
+            end = _share(end)
+
+        matched = isinstance(start, dict)
+        if not isinstance(start, (Date, datetime, dict)):
             start = str(start)
         if end and not isinstance(end, (Date, datetime)):
             end = str(end)
 
         if start and end:
-            self._dates = (Date(start, tz=tz), Date(end, tz=tz))
+            if verbose:
+                _say(verbose, 'start and end')
+            self._dates = (start if isinstance(start, Date) else Date(start, tz=tz, now=now),
+                           end if isinstance(end, Date) else Date(end, tz=tz, now=now))
 
         elif start == 'infinity':
+            if verbose:
+                _say(verbose, 'infinity')
             self._dates = (Date('infinity'), Date('infinity'))
 
         elif isinstance(start, (int, long, float)) \
                     or (isinstance(start, (str, unicode)) and start.isdigit()) \
                 and len(str(int(float(start)))) > 4:
+            if verbose:
+                _say(verbose, 'unixtime')
             start = Date(start)
             end = start + '1 second'
             self._dates = start, end
 
-        elif re.search(r'(\s(and|to)\s)', start):
+        elif not matched and re.search(r'(\s(and|to)\s)', start):
+            if verbose:
+                _say(verbose, 'and or to')
             # Both sides are provided in string "start"
             start = re.sub('^(between|from)\s', '', start.lower())
             r = tuple(re.split(r'(\s(and|to)\s)', start.strip()))
-            start = Date(r[0], tz=tz)
+            start = Date(r[0], tz=tz, now=now)
             self._dates = start, Date(r[-1], now=start.date)
 
-        elif POSTGRES_RANGE_RE.match(start):
+        elif not matched and POSTGRES_RANGE_RE.match(start):
+            if verbose:
+                _say(verbose, 'postgres')
             # Postgresql tsrange and tstzranges support
             start, end = re.sub('[^\w\s\-\:\.\+\,]', '', start).split(',')
             self._dates = Date(start), Date(end)
 
         else:
-            now = datetime.now(tz)
+            if now is None:
+                now = datetime.now(tz)
 
-            if re.search(r"(\+|\-)\d{2}$", start):
+            if not matched and re.search(r"(\+|\-)\d{2}$", start):
                 # postgresql tsrange and tstzranges
                 pgoffset = re.search(r"(\+|\-)\d{2}$", start).group() + " hours"
 
             # Parse
-            res = TIMESTRING_RE.search(start)
-            if res:
-                group = res.groupdict()
+            text = start
+            if matched:
+                group = dict.fromkeys(GROUPS)
+                group.update(start)
+            else:
+                group = search(text)
+            if group:
 
                 def g(*keys):
                     return next((group.get(k) for k in keys
                                  if group.get(k) is not None),
                                 None)
 
-                if verbose:
+                if verbose and not callable(verbose):
                     print(dict(map(lambda a: (a, group.get(a)), filter(lambda a: group.get(a), group))))
 
                 if not group['this']:
@@ -99,7 +172,7 @@ class Range(object):
                 if delta:
                     delta = delta.lower().strip()
                     num = group['num']
-                    start = Date("now", offset=offset, tz=tz)
+                    start = Date("now", offset=offset, tz=tz, now=now)
                     end = None
 
                     # ago                               [     ](     )x
@@ -110,8 +183,8 @@ class Range(object):
                         whole = int(n)
                         fraction = n - whole
                         if verbose:
-                            print('ago or from_now or in')
-                        start = Date(res.string)
+                            _say(verbose, 'ago or from_now or in')
+                        start = Date(text, now=now)
                         if not re.match('(hour|minute|second)s?', delta):
                             if not fraction:
                                 start = start.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -130,19 +203,20 @@ class Range(object):
                     # "next 2 weeks", "the next hour"   x[     ][     ]
                     elif group['next'] and (group['num'] or group['article']):
                         if verbose:
-                            print('next and (num or article)')
+                            _say(verbose, 'next and (num or article)')
                         end = start.plus_(num, delta)
 
                     # "next week"                       (  x  )[      ]
                     elif group['next'] or (not group['this'] and context == Context.NEXT):
                         if verbose:
-                            print('next or (not this and Context.NEXT)')
+                            _say(verbose, 'next or (not this and Context.NEXT)')
                         this = Range('this ' + delta,
                                      offset=offset,
                                      tz=tz,
-                                     week_start=week_start)
+                                     week_start=week_start,
+                                     now=now)
                         if delta.startswith('weekend'):
-                            if 'now' in this:
+                            if Range('now', tz=tz, now=now) in this:
                                 start, end = this.plus_(num, delta)
                             else:
                                 start, end = this
@@ -153,18 +227,19 @@ class Range(object):
                     # "last 2 weeks", "the last hour"   [     ][     ]x
                     elif group['prev'] and (group['num'] or group['article']):
                         if verbose:
-                            print('prev and (num or article)')
+                            _say(verbose, 'prev and (num or article)')
 
                         end = start.plus_(num, delta, -1)
 
                     # "last week"                       [     ](  x  )
                     elif group['prev']:
                         if verbose:
-                            print('prev')
+                            _say(verbose, 'prev')
                         this = Range('this ' + delta,
                                      offset=offset,
                                      tz=tz,
-                                     week_start=week_start)
+                                     week_start=week_start,
+                                     now=now)
 
                         start = this.start.plus_(num, delta, -1)
                         end = this.end.plus_(num, delta, -1)
@@ -172,15 +247,15 @@ class Range(object):
                     # "1 year", "10 days" till now
                     elif num:
                         if verbose:
-                            print('num')
+                            _say(verbose, 'num')
 
                         end = start.plus_(num, delta, -1)
 
                     # this                             [   x  ]
                     elif group['this'] or not group['recurrence']:
                         if verbose:
-                            print('this or not recurrence')
-                        start = Date(res.string, tz=tz)
+                            _say(verbose, 'this or not recurrence')
+                        start = Date(text, tz=tz, now=now)
 
                         if delta.startswith('y'):
                             start = start.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -204,7 +279,7 @@ class Range(object):
 
                         # week
                         elif delta.startswith('w'):
-                            start.date -= timedelta(days=start.isoweekday - week_start % 7)
+                            start = start - timedelta(days=start.isoweekday - week_start % 7)
                             start = start.replace(hour=0, minute=0, second=0, microsecond=0)
 
                         elif delta.startswith('d'):
@@ -229,21 +304,21 @@ class Range(object):
 
                 elif group['relative_day'] or group['weekday']:
                     if verbose:
-                        print('relative_day or weekday')
-                    start = Date(res.string, offset=offset, tz=tz, context=context)
+                        _say(verbose, 'relative_day or weekday')
+                    start = Date(text, offset=offset, tz=tz, context=context, now=now)
                     end = start + '1 day'
 
                 elif group.get('month_1'):
                     if verbose:
-                        print('month_1')
-                    start = Date(res.string, offset=offset, tz=tz, context=context)
+                        _say(verbose, 'month_1')
+                    start = Date(text, offset=offset, tz=tz, context=context, now=now)
                     start = start.replace(hour=0, minute=0, second=0)
                     end = start + '1 month'
 
                 elif group['date_5'] or group['date_6']:
                     if verbose:
-                        print('date_5 or date_6')
-                    start = Date(res.string, offset=offset, tz=tz)
+                        _say(verbose, 'date_5 or date_6')
+                    start = Date(text, offset=offset, tz=tz, now=now)
                     year = g('year', 'year_2', 'year_3', 'year_4', 'year_5', 'year_6')
                     month = g('month', 'month_2', 'month_3', 'month_4', 'month_5')
                     day = g('date', 'date_2', 'date_3', 'date_4')
@@ -262,8 +337,8 @@ class Range(object):
 
                 if group['time_2']:
                     if verbose:
-                        print('time_2')
-                    temp = Date(res.string, offset=offset, now=start, tz=tz).date
+                        _say(verbose, 'time_2')
+                    temp = Date(text, offset=offset, now=start, tz=tz).date
                     start = start.replace(hour=temp.hour,
                                           minute=temp.minute,
                                           second=temp.second)
@@ -303,7 +378,7 @@ class Range(object):
                 end = start + '24 hours'
 
             if start > end:
-                start, end = copy(end), copy(start)
+                start, end = end, start
 
             if pgoffset:
                 start = start - pgoffset
@@ -315,9 +390,34 @@ class Range(object):
         if self._dates[0] > self._dates[1]:
             self._dates = (self._dates[0], self._dates[1] + '1 day')
 
+    @classmethod
+    def from_fields(cls, tz: str = None, now: datetime = None, week_start: int = 1,
+                    context: Context = None, offset: dict = None, **kwargs):
+        """The Range of a phrase given as its fields instead of text, with
+        the same rules, such as the week of direction="next", unit="week".
+
+        >>> Range.from_fields(weekday=5, direction='last')
+        >>> Range.from_fields(num=2, unit='weeks', sign=-1)  # "2 weeks ago"
+
+        :param kwargs: the fields, see utils.fields
+        """
+        return cls(fields(**kwargs), offset=offset, week_start=week_start, tz=tz,
+                   context=context, now=now)
+
     def __repr__(self):
         return "<timestring.Range %s %s>" % (str(self), id(self))
 
+    def __reduce__(self):
+        """Pickle as the microseconds and zone keys of the bounds, see
+        Date.__reduce__
+        """
+        start, end = (bound.date if isinstance(bound, Date) else bound for bound in self._dates)
+        return _restore, _state(start) + _state(end)
+
+    def __conform__(self, protocol):
+        from .postgres import conform
+        return conform(self, protocol)
+
     def __getitem__(self, index: int):
         return self._dates[index]
 
@@ -391,8 +491,20 @@ class Range(object):
 
     @tz.setter
     def tz(self, tz: datetime.tzinfo):
-        self.start.tz = tz
-        self.end.tz = tz
+        if not Date.mutable:
+            raise AttributeError('Range.tz is read-only, use Range.replace')
+        warnings.warn('Setting Range.tz is deprecated, Ranges are shared values: use '
+                      'Range.replace(tzinfo=...) for a new Range', DeprecationWarning, stacklevel=2)
+        if tz is not None:
+            import pytz
+            tz = pytz.timezone(tz)
+        self._dates = tuple(bound.replace(tzinfo=tz) for bound in self._dates)
+
+    def replace(self, **k):
+        """:return: a new Range with both bounds replaced like Date.replace,
+         infinite bounds are kept
+        """
+        return Range(*(bound.replace(**k) for bound in self._dates))
 
     def __len__(self):
         """Returns how many `seconds` the `Range` lasts.
@@ -488,17 +600,123 @@ class Range(object):
     def plus(self, duration: Union[str, int, float]):
         """ :return: a new instance, like datetime does"""
         return Range(self.start.plus(duration),
-                     self.end.plus(duration),
-                     tz=self.start.tz)
+                     self.end.plus(duration))
+    def step(self):
+        """The length of this Range as a step to the neighbouring Ranges:
+        whole calendar months when both bounds fall on the same day (or both
+        on the last day) and time of their months, whole days when the wall
+        clock times match, otherwise microseconds.
+
+        :return: (num, unit, eom) for Date.plus_
+        """
+        start, end = self.start.date, self.end.date
+        if start == 'infinity' or end == 'infinity':
+            raise TimestringInvalid('An infinite Range has no neighbours')
+        start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+        months = (end.year - start.year) * 12 + end.month - start.month
+        if months > 0 and start.time() == end.time():
+            if start.day == end.day:
+                return months, 'months', 'clamp'
+            if start.day == days_in_month(start.year, start.month) \
+                    and end.day == days_in_month(end.year, end.month):
+                return months, 'months', 'preserve'
+        delta = end - start
+        if delta <= timedelta(0):
+            raise TimestringInvalid('An empty Range has no neighbours')
+        if not delta.seconds and not delta.microseconds:
+            return delta.days, 'days', 'clamp'
+        return _duration(delta) + ('clamp',)
+
+    def _window(self, index: int, step):
+        """:return: the Range `index` steps away from this one"""
+        num, unit, eom = step
+        return Range(_move(self.start, index * num, unit, eom),
+                     _move(self.start, (index + 1) * num, unit, eom))
+
     def prev(self, times=1):
-        """:return: a new instance of self times is not supported yet."""
-        return Range(self.start - self.elapse,
-                     copy(self.start), tz=self.start.tz)
+        """:return: the Range `times` steps before this one, see `step`"""
+        return self._window(-times, self.step())
 
     def next(self, times=1):
-        """:return: a new instance of self times is not supported yet."""
-        return Range(copy(self.end),
-                     self.end + self.elapse, tz=self.start.tz)
+        """:return: the Range `times` steps after this one, see `step`"""
+        return self._window(times, self.step())
+
+    def preceding(self, count: int):
+        """Yield the `count` Ranges tiling the time before this one, the
+        nearest first.
+
+            >>> list(Range('this week').preceding(12))  # the last 12 weeks
+        """
+        step = self.step()
+        for index in range(1, count + 1):
+            yield self._window(-index, step)
+
+    def following(self, count: int):
+        """Yield the `count` Ranges tiling the time after this one."""
+        step = self.step()
+        for index in range(1, count + 1):
+            yield self._window(index, step)
+
+    def rolling(self, size, stride=None):
+        """Yield the windows of `size` that fit in this Range, starting at its
+        start and every `stride` (default `size`, tiling windows) after.
+
+        :param size: a duration such as '7 days', seconds or a timedelta
+        """
+        if self.start == 'infinity' or self.end == 'infinity':
+            raise TimestringInvalid('Cannot roll over an infinite Range')
+        size = _duration(size)
+        stride = _duration(stride) if stride is not None else size
+        if size[0] <= 0 or stride[0] <= 0 \
+                or not _move(self.start, *size) > self.start or not _move(self.start, *stride) > self.start:
+            raise TimestringInvalid('Window size and stride must be positive, and at least a microsecond')
+        index = 0
+        while True:
+            start = _move(self.start, index * stride[0], stride[1])
+            end = _move(start, size[0], size[1])
+            if end > self.end:
+                return
+            yield Range(start, end)
+            index += 1
+
+    def split(self, by, tz: str = None, align=True, week_start: int = 1, batch=False):
+        """Partition this Range in consecutive half open Ranges whose union
+        is exactly this Range.
+
+            >>> list(Range('last 3 days', now=now).split('day'))
+            [<Range 06/13/17 19:37:22 to 06/14/17 00:00:00>, ..., <Range 06/16/17 00:00:00 to 06/16/17 19:37:22>]
+
+        :param by: a number of parts of equal length, or a duration such as
+         'day', '6 hours' or '1 month'. Aligned parts start at the calendar
+         boundaries of the unit, the first and last are cut to this Range.
+        :param tz: the zone of the wall clock to align on, by default the
+         zone of this Range. Days and longer follow the wall clock across
+         daylight saving changes, shorter units last exactly their length.
+        :param batch: return a RangeBatch instead of a generator of Ranges
+        """
+        from .batch import RangeBatch, get_zone, make_date, make_range, from_micros, partition, to_micros
+        start, end = self.start.date, self.end.date
+        if start == 'infinity' or end == 'infinity':
+            raise TimestringInvalid('Cannot split an infinite Range')
+        zone = get_zone(tz)
+        if zone is None:
+            zone = start.tzinfo
+        if hasattr(zone, 'zone'):
+            zone = get_zone(zone.zone)  # the whole pytz zone, not one of its offsets
+        bounds = [to_micros(start), to_micros(end)]
+        if zone is not None:
+            from .zones import localize
+            for index, value in enumerate((start, end)):
+                if value.tzinfo is None:
+                    bounds[index] = localize([bounds[index]], zone, 'earliest', 'shift_forward')[0]
+        if not isinstance(by, int):
+            by = _duration(by)
+        parts = partition(bounds[0], bounds[1], by, zone, align, week_start)
+        if batch:
+            parts = list(parts)
+            return RangeBatch([lo for lo, _ in parts], [hi for _, hi in parts], tz=zone)
+        return (make_range(make_date(from_micros(lo, zone)), make_date(from_micros(hi, zone)))
+                for lo, hi in parts)
 
     def __add__(self, duration: Union[str, int, float]):
         return self.plus(duration)
@@ -521,3 +739,42 @@ class Range(object):
         else:
             e -= by
         return Range(s, e)
+
+    def to_iso(self):
+        """:return: the ISO 8601 interval "start/end", with '..' for an
+         infinite bound
+        """
+        start, end = self.start.date, self.end.date
+        return '%s/%s' % ('..' if start == 'infinity' else start.isoformat(),
+                          '..' if end == 'infinity' else end.isoformat())
+
+    @classmethod
+    def from_iso(cls, text: str, tz: str = None):
+        """:return: the Range of an ISO 8601 "start/end" interval, see
+         Date.from_iso
+        """
+        bounds = text.split('/')
+        if len(bounds) != 2:
+            raise TimestringInvalid('Not an ISO 8601 interval: %s' % text)
+        start, end = (Date.from_iso('infinity' if bound in ('', '..') else bound, tz) for bound in bounds)
+        _range = cls.__new__(cls)
+        _range._dates = (start, end)
+        return _range
+
+    def to_dict(self):
+        """:return: {"start": ..., "end": ..., "tz": ...}, the bounds as
+         ISO 8601 text or '-infinity' / 'infinity'
+        """
+        start, end = self.start.date, self.end.date
+        zone = start.tzinfo if start != 'infinity' else end.tzinfo if end != 'infinity' else None
+        return dict(start='-infinity' if start == 'infinity' else start.isoformat(),
+                    end='infinity' if end == 'infinity' else end.isoformat(),
+                    tz=getattr(zone, 'zone', None))
+
+    @classmethod
+    def from_dict(cls, value: dict):
+        """:return: the Range of a `to_dict` result"""
+        tz = value.get('tz')
+        _range = cls.__new__(cls)
+        _range._dates = (Date.from_iso(value['start'], tz), Date.from_iso(value['end'], tz))
+        return _range
@@ -1,6 +1,6 @@
+import os
 import re
-import sys
-import argparse
+from bisect import bisect_right
 from collections import namedtuple
 from datetime import datetime
 
@@ -27,39 +27,27 @@ class TimestringInvalid(Exception):
 
 from .Date import Date
 from .Range import Range
-from .timestring_re import TIMESTRING_RE
+from .timestring_re import TIMESTRING_RE, KEYWORDS_RE, LOWER_KEYWORDS_RE, BREAKS_RE
 
+if os.environ.get('TIMESTRING_CACHE'):
+    from .cache import enable
+    enable(os.environ['TIMESTRING_CACHE'])
 
-try:
-    """Register psycopg2 Adapters
 
-    if psycopg2 is installed then automatically register
-    the adapters for Date and Range.
+def register_adapters():
+    """Register the psycopg2 adapters for Date and Range.
 
+    Not required for queries, psycopg2 adapts Dates and Ranges through their
+    ``__conform__``; registering them also covers ``psycopg2.extensions.adapt``
+    lookups by type.
+
+    >>> timestring.register_adapters()
     >>> db.mogrify("insert into my_table (range) values (%s);",
                    timestring.Range("next week"))
     "insert into my_table (range) values (tstzrange('2014-03-03 00:00:00'::timestamptz, '2014-03-10 00:00:00'::timestamptz));"
     """
-    from psycopg2.extensions import register_adapter
-    from psycopg2.extensions import AsIs
-
-    def adapt_date(date):
-        if date.tz:
-            return AsIs("'%s'::timestamptz" % str(date.date))
-        else:
-            return AsIs("'%s'::timestamp" % str(date.date))
-
-    def adapt_range(_range):
-        if _range.start.tz:
-            return AsIs("tstzrange('%s', '%s')" % (str(_range.start.date), str(_range.end.date)))
-        else:
-            return AsIs("tsrange('%s', '%s')" % (str(_range.start.date), str(_range.end.date)))
-
-    register_adapter(Date, adapt_date)
-    register_adapter(Range, adapt_range)
-
-except ImportError:
-    pass
+    from .postgres import register_adapters
+    register_adapters()
 
 
 def findall(text):
@@ -71,9 +59,8 @@ def findall(text):
      ('august 15th at 7:20 am', <timestring.Date 2014-08-15 07:20:00 4483019344>)
     ]
     """
-    results = TIMESTRING_RE.findall(text)
     dates = []
-    for date in results:
+    for date in _scan(text):
         if re.compile('((next|last)\s(\d+|couple(\sof))\s(weeks|months|quarters|years))|(between|from)', re.I).match(date[0]):
             dates.append((date[0].strip(), Range(date[0])))
         else:
@@ -81,6 +68,33 @@ def findall(text):
     return dates
 
 
+def _windows(text):
+    """:return: (start, end) of the stretches of `text` between BREAKS_RE
+     that contain a keyword, the only places TIMESTRING_RE can match
+    """
+    breaks = [(b.start(), b.end()) for b in BREAKS_RE.finditer(text)]
+    starts = [start for start, _ in breaks]
+    if text.isascii():
+        keywords, scanned = LOWER_KEYWORDS_RE, text.lower()
+    else:
+        keywords, scanned = KEYWORDS_RE, text
+    hit = keywords.search(scanned)
+    while hit:
+        index = bisect_right(starts, hit.start())
+        start = breaks[index - 1][1] if index else 0
+        end = breaks[index][0] if index < len(breaks) else len(text)
+        yield start, end
+        hit = keywords.search(scanned, end)
+
+
+def _scan(text):
+    """:return: the TIMESTRING_RE.findall of `text`, scanning only the windows"""
+    results = []
+    for start, end in _windows(text):
+        results.extend(TIMESTRING_RE.findall(text, start, end))
+    return results
+
+
 def parse(string):
     try:
         matches = TIMESTRING_RE.search(string).groupdict()
@@ -102,23 +116,8 @@ def now():
 
 
 def main():
-    parser = argparse.ArgumentParser(prog='timestring',
-                                     add_help=True,
-                                     formatter_class=argparse.RawDescriptionHelpFormatter,
-                                     epilog=""" """)
-    parser.add_argument('-d', '--date', action='store_true')
-    parser.add_argument('-z', '--zone', help="Time zone")
-    parser.add_argument('--verbose', '-v', action="store_true", help="Verbose mode")
-    parser.add_argument('args', nargs="+", help="Time input")
-
-    if len(sys.argv) == 1:
-        parser.print_help()
-    else:
-        args = parser.parse_args()
-        if args.date:
-            print(Date(" ".join(args.args), verbose=args.verbose, tz=args.zone))
-        else:
-            print(Range(" ".join(args.args), verbose=args.verbose, tz=args.zone))
+    from .cli import main
+    main()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,490 @@
+"""Columnar containers for large numbers of Dates and Ranges.
+
+Instants are stored as signed 64 bit microseconds since the unix epoch in
+``array('q')`` columns, which is also how PostgreSQL stores timestamps.
+A batch with ``tz=None`` holds wall clock values (``timestamp``), otherwise
+the values are UTC instants displayed in ``tz`` (``timestamptz``).
+
+    >>> batch = RangeBatch.from_ranges([Range('today'), Range('this week')])
+    >>> batch.starts
+    array('q', [1497571200000000, 1497225600000000])
+"""
+from array import array
+from datetime import datetime, timedelta
+
+import pytz
+
+from timestring import TimestringInvalid
+from .Date import Date, _wrap
+from .Range import Range
+from .utils import check_eom
+
+EPOCH = datetime(1970, 1, 1)
+UTC_EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+INFINITY = 2 ** 63 - 1    # PostgreSQL's DT_NOEND
+NEG_INFINITY = -2 ** 63   # PostgreSQL's DT_NOBEGIN
+
+
+def get_zone(tz):
+    """:return: a tzinfo for a zone name, a tzinfo or None"""
+    if tz is None or hasattr(tz, 'utcoffset'):
+        return tz
+    return pytz.timezone(str(tz))
+
+
+def to_micros(value):
+    """Microseconds since the epoch for a datetime, Date or 'infinity'.
+
+    Aware values count from the UTC epoch, naive values by wall clock.
+    """
+    if isinstance(value, Date):
+        value = value.date
+    if isinstance(value, str):
+        if value != 'infinity':
+            raise TimestringInvalid('Not a datetime: %s' % value)
+        return INFINITY
+    delta = value - (EPOCH if value.tzinfo is None else UTC_EPOCH)
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def from_micros(micros, tz=None):
+    """:return: the datetime for `micros`, in `tz` when given"""
+    if micros == INFINITY or micros == NEG_INFINITY:
+        return 'infinity'
+    value = EPOCH + timedelta(microseconds=micros)
+    if tz is not None:
+        value = tz.fromutc(value.replace(tzinfo=tz))
+    return value
+
+
+make_date = _wrap  # wrap an already resolved datetime (or 'infinity') without parsing
+
+
+def make_range(start, end):
+    """Pair two Dates into a Range without parsing or copying."""
+    _range = Range.__new__(Range)
+    _range._dates = (start, end)
+    return _range
+
+
+DAY = 86400 * 10 ** 6
+UNIT_MICROS = dict(w=7 * DAY, d=DAY, h=3600 * 10 ** 6, m=60 * 10 ** 6, s=10 ** 6, u=1)
+
+
+def days_from_civil(year, month, day):
+    """:return: days since the epoch of a proleptic Gregorian date, with only
+     integer arithmetic so it also works on numpy arrays
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+
+def civil_from_days(days):
+    """:return: (year, month, day) of days since the epoch, see days_from_civil"""
+    days = days + 719468
+    era = days // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    month = (mp + 2) % 12 + 1
+    return yoe + era * 400 + (month <= 2), month, doy - (153 * mp + 2) // 5 + 1
+
+
+def _month_length(year, month):
+    """days_in_month without branches, for numpy arrays too"""
+    return days_from_civil(year + month // 12, month % 12 + 1, 1) - days_from_civil(year, month, 1)
+
+
+def _shift_months(micros, months, eom):
+    """Shift microseconds since the epoch by whole calendar `months`."""
+    days, time = micros // DAY, micros % DAY
+    year, month, day = civil_from_days(days)
+    total = year * 12 + month - 1 + months
+    new_year, new_month = total // 12, total % 12 + 1
+    last = _month_length(new_year, new_month)
+    if eom == 'preserve':
+        day = day + (day == _month_length(year, month)) * (last - day)
+    day = day - (day > last) * (day - last)
+    return days_from_civil(new_year, new_month, day) * DAY + time
+
+
+def shift(micros, num, unit, eom='clamp'):
+    """Move microseconds since the epoch by `num` units in one pass.
+
+    Years, quarters and months are calendar arithmetic on the values as wall
+    clock times, with the same rules and `eom` policy as Date.plus_; other
+    units are fixed lengths.
+
+    :param micros: an iterable, array('q') or numpy int64 array (returned as
+     the same kind), infinities are kept
+    :param num: a signed int or float
+    """
+    check_eom(eom)
+    unit = unit.lower().strip()
+    if unit.startswith('y'):
+        months, extra = 12 * int(num), int(round((num - int(num)) * 365 * DAY))
+    elif unit.startswith('month') or unit.startswith('q'):
+        num = 3 * num if unit.startswith('q') else num
+        months, extra = int(num), int(round((num - int(num)) * 30 * DAY))
+    else:
+        per = UNIT_MICROS.get(unit[:1])
+        if per is None:
+            raise TimestringInvalid('Unknown time unit: ' + unit)
+        months, extra = 0, int(round(num * per))
+
+    if type(micros).__module__ == 'numpy':
+        import numpy as np
+        micros = np.asarray(micros, dtype='int64')
+        infinite = (micros == INFINITY) | (micros == NEG_INFINITY)
+        values = np.where(infinite, 0, micros)
+        if months:
+            values = _shift_months(values, months, eom)
+        return np.where(infinite, micros, values + extra)
+
+    result = array('q')
+    for value in micros:
+        if value == INFINITY or value == NEG_INFINITY:
+            result.append(value)
+        elif months:
+            result.append(_shift_months(value, months, eom) + extra)
+        else:
+            result.append(value + extra)
+    return result
+
+
+def _calendar(unit):
+    unit = unit.lower().strip()
+    return unit.startswith('y') or unit.startswith('month') or unit.startswith('q')
+
+
+def _shift_column(micros, tz, num, unit, eom):
+    """Calendar units move the wall clock times of aware columns."""
+    if tz is None or not _calendar(unit):
+        return shift(micros, num, unit, eom)
+    from .zones import convert, localize
+    return localize(shift(convert(micros, tz), num, unit, eom), tz, 'earliest', 'shift_forward')
+
+
+def floor(wall, unit, num=1, week_start=1):
+    """:return: the start of the calendar `unit` holding the wall clock time
+     `wall` (microseconds): the first of its year, quarter or month, the
+     `week_start` day of its week (1 is Monday), its midnight, or the last
+     multiple of `num` hours, minutes or seconds since its midnight
+    """
+    unit = unit.lower().strip()
+    days, time = wall // DAY, wall % DAY
+    if _calendar(unit):
+        year, month, _ = civil_from_days(days)
+        if unit.startswith('y'):
+            month = 1
+        elif unit.startswith('q'):
+            month -= (month - 1) % 3
+        return days_from_civil(year, month, 1) * DAY
+    if unit.startswith('w'):
+        return (days - (days + 4 - week_start) % 7) * DAY
+    if unit.startswith('d'):
+        return days * DAY
+    per = UNIT_MICROS.get(unit[:1])
+    if per is None:
+        raise TimestringInvalid('Unknown time unit: ' + unit)
+    per = int(round(per * num))
+    return days * DAY + time // per * per
+
+
+def _bounds(start, end, num, unit, zone, align, week_start):
+    """Yield the inner boundaries of a partition by `num` units."""
+    if num <= 0:
+        raise TimestringInvalid('Cannot split by %s %s' % (num, unit))
+    unit = unit.lower().strip()
+    calendar = _calendar(unit) or unit[:1] in 'wd'
+    if calendar:
+        moves = shift([start], num, unit)[0] > start
+    else:
+        step = int(round(UNIT_MICROS[unit[:1]] * num))
+        moves = step > 0
+    if not moves:
+        raise TimestringInvalid('Cannot split by %s %s, shorter than a microsecond' % (num, unit))
+    if zone is not None:
+        from .zones import convert, localize
+    wall = convert([start], zone)[0] if zone is not None else start
+    origin = floor(wall, unit, num, week_start) if align else wall
+    index = 1
+    if calendar:
+        # days and longer follow the wall clock
+        while True:
+            bound = shift([origin], index * num, unit)[0]
+            if zone is not None:
+                bound = localize([bound], zone, 'earliest', 'shift_forward')[0]
+            if bound >= end:
+                return
+            if bound > start:
+                yield bound
+            index += 1
+    # hours and shorter are aligned on the wall clock and last the same
+    origin = start - (wall - origin)
+    while origin + index * step < end:
+        yield origin + index * step
+        index += 1
+
+
+def partition(start, end, by, tz=None, align=True, week_start=1):
+    """Split the half open [start, end) in consecutive half open parts.
+
+    :param start: microseconds, UTC instants when `tz` is given, otherwise
+     wall clock times like `end`
+    :param by: a number of parts of equal length, or (num, unit) to split at
+     every `num` units, aligned on the calendar when `align`: at midnights
+     for days, at `week_start` for weeks, on the first of the month...
+    :param tz: the zone whose wall clock the boundaries are aligned on
+    :return: a generator of (start, end) microseconds
+    """
+    if INFINITY in (start, end) or NEG_INFINITY in (start, end):
+        raise TimestringInvalid('Cannot split an infinite Range')
+    if isinstance(by, int):
+        if by < 1:
+            raise TimestringInvalid('Cannot split in %d parts' % by)
+        bounds = [start + (end - start) * part // by for part in range(1, by)]
+    else:
+        bounds = _bounds(start, end, by[0], by[1], get_zone(tz), align, week_start)
+    for bound in bounds:
+        if bound > start:
+            yield start, bound
+            start = bound
+    if end > start:
+        yield start, end
+
+
+EPOCH_UNITS = ('auto', 's', 'ms', 'us', 'ns')
+# the largest magnitude read as seconds, milliseconds and microseconds by
+# unit='auto': 10, 13 and 16 digit values are those units, 19 digit ones ns
+AUTO_LIMITS = (10 ** 11, 10 ** 14, 10 ** 17)
+_SCALE = dict(s=10 ** 6, ms=10 ** 3, us=1)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _epoch_unit(value):
+    value = abs(value)
+    if value < AUTO_LIMITS[0]:
+        return 's'
+    if value < AUTO_LIMITS[1]:
+        return 'ms'
+    if value < AUTO_LIMITS[2]:
+        return 'us'
+    return 'ns'
+
+
+def _epoch_numpy(np, values, unit):
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iuf':
+        raise TimestringInvalid('Not an epoch column: %s' % values.dtype)
+    floats = values.dtype.kind == 'f'
+    if not floats:
+        values = values.astype('int64', copy=False)
+    if unit == 'auto':
+        size = np.abs(values)
+        scale = np.where(size < AUTO_LIMITS[0], 10 ** 6, np.where(size < AUTO_LIMITS[1], 10 ** 3, 1))
+        nanos = size >= AUTO_LIMITS[2]
+    else:
+        scale, nanos = _SCALE.get(unit, 1), unit == 'ns'
+    # nanoseconds are rounded down and fractions of other units to the
+    # nearest, as in the loop of epoch_micros
+    if floats:
+        return np.where(nanos, np.floor_divide(values, 1000), np.rint(values * scale)).astype('int64')
+    return np.where(nanos, values // 1000, values * scale)
+
+
+def epoch_micros(values, unit='auto'):
+    """Convert a column of unix times to microseconds since the epoch.
+
+    :param values: array('q'), bytes of native int64, a numpy int or float
+     array or an iterable of numbers
+    :param unit: 's', 'ms', 'us', 'ns' or 'auto' to read each value by its
+     digits: 10 digits are seconds, 13 milliseconds, 16 microseconds and 19
+     nanoseconds (rounded down, other fractions are rounded to the nearest)
+    :return: array('q'), built without a Python object per value when numpy
+     is installed or the values are already microseconds
+    """
+    if unit not in EPOCH_UNITS:
+        raise ValueError('unit must be one of %s' % ', '.join(EPOCH_UNITS))
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        column = array('q')
+        column.frombytes(values)
+        values = column
+    if isinstance(values, array) and values.typecode == 'q' and unit == 'us':
+        return array('q', values)
+
+    np = _numpy() if isinstance(values, array) or type(values).__module__ == 'numpy' else None
+    if np is not None:
+        if isinstance(values, array):
+            values = np.frombuffer(values, dtype=values.typecode)
+        column = array('q')
+        column.frombytes(np.ascontiguousarray(_epoch_numpy(np, values, unit), dtype='int64').tobytes())
+        return column
+
+    result = array('q')
+    for value in values:
+        value_unit = _epoch_unit(value) if unit == 'auto' else unit
+        if value_unit == 'ns':
+            result.append(int(value // 1000))
+        elif isinstance(value, float):
+            result.append(int(round(value * _SCALE[value_unit])))
+        else:
+            result.append(value * _SCALE[value_unit])
+    return result
+
+
+def _column(values):
+    if isinstance(values, array) and values.typecode == 'q':
+        return values
+    return array('q', values)
+
+
+def _batch_zone(values):
+    for value in values:
+        if isinstance(value, Date):
+            value = value.date
+        if value is not None and value != 'infinity':
+            return value.tzinfo
+    return None
+
+
+class DateBatch(object):
+    """A column of Dates held as microseconds since the epoch."""
+
+    def __init__(self, micros=(), tz=None):
+        self.micros = _column(micros)
+        self.tz = get_zone(tz)
+
+    @classmethod
+    def from_dates(cls, dates, tz=None):
+        """:param dates: Dates, datetimes or 'infinity'"""
+        dates = list(dates)
+        if tz is None:
+            tz = _batch_zone(dates)
+        return cls(array('q', map(to_micros, dates)), tz=tz)
+
+    @classmethod
+    def from_epoch(cls, values, unit='auto', tz='UTC'):
+        """A batch of unix times, see `epoch_micros` for `values` and `unit`.
+
+        :param tz: the zone the instants are displayed in, UTC by default
+        """
+        return cls(epoch_micros(values, unit), tz=tz)
+
+    def __repr__(self):
+        return "<timestring.DateBatch %d dates %s>" % (len(self), self.tz)
+
+    def __len__(self):
+        return len(self.micros)
+
+    def __getitem__(self, index: int):
+        return make_date(from_micros(self.micros[index], self.tz))
+
+    def __iter__(self):
+        tz = self.tz
+        for micros in self.micros:
+            yield make_date(from_micros(micros, tz))
+
+    def datetimes(self):
+        """:return: a list of datetimes ('infinity' for infinite values)"""
+        tz = self.tz
+        return [from_micros(micros, tz) for micros in self.micros]
+
+    def plus_(self, num, unit, eom='clamp'):
+        """:return: a new batch moved by `num` units, see `shift`. Aware
+         batches move by calendar units on the wall clock, taking the
+         earliest instant of ambiguous times and shifting nonexistent ones
+         forward.
+        """
+        return DateBatch(_shift_column(self.micros, self.tz, num, unit, eom), tz=self.tz)
+
+    def localize(self, tz, ambiguous='raise', nonexistent='raise'):
+        """:return: this wall clock batch as UTC instants in `tz`, see
+         timestring.zones.localize for the policies
+        """
+        from .zones import localize
+        return DateBatch(localize(self.micros, tz, ambiguous, nonexistent), tz=tz)
+
+    def wall(self):
+        """:return: the wall clock times of this batch in its zone"""
+        from .zones import convert
+        return DateBatch(convert(self.micros, self.tz) if self.tz else array('q', self.micros))
+
+
+class RangeBatch(object):
+    """A column of Ranges held as two columns of microseconds.
+
+    Infinite bounds are stored as NEG_INFINITY / INFINITY and a Range whose
+    start equals its end is empty.
+    """
+
+    def __init__(self, starts=(), ends=(), tz=None):
+        self.starts = _column(starts)
+        self.ends = _column(ends)
+        if len(self.starts) != len(self.ends):
+            raise ValueError('starts and ends must be the same length')
+        self.tz = get_zone(tz)
+
+    @classmethod
+    def from_ranges(cls, ranges, tz=None):
+        starts, ends = array('q'), array('q')
+        ranges = list(ranges)
+        if tz is None:
+            tz = _batch_zone(r.start for r in ranges)
+        for _range in ranges:
+            start = to_micros(_range.start)
+            starts.append(NEG_INFINITY if start == INFINITY else start)
+            ends.append(to_micros(_range.end))
+        return cls(starts, ends, tz=tz)
+
+    @classmethod
+    def from_epoch(cls, starts, ends, unit='auto', tz='UTC'):
+        """A batch of unix time bounds, see DateBatch.from_epoch"""
+        return cls(epoch_micros(starts, unit), epoch_micros(ends, unit), tz=tz)
+
+    def __repr__(self):
+        return "<timestring.RangeBatch %d ranges %s>" % (len(self), self.tz)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index: int):
+        return make_range(make_date(from_micros(self.starts[index], self.tz)),
+                          make_date(from_micros(self.ends[index], self.tz)))
+
+    def __iter__(self):
+        tz = self.tz
+        for start, end in zip(self.starts, self.ends):
+            yield make_range(make_date(from_micros(start, tz)),
+                             make_date(from_micros(end, tz)))
+
+    def plus_(self, num, unit, eom='clamp'):
+        """:return: a new batch with both bounds moved, see DateBatch.plus_"""
+        return RangeBatch(_shift_column(self.starts, self.tz, num, unit, eom),
+                          _shift_column(self.ends, self.tz, num, unit, eom), tz=self.tz)
+
+    def localize(self, tz, ambiguous='raise', nonexistent='raise'):
+        """:return: this wall clock batch as UTC instants in `tz`, see
+         timestring.zones.localize for the policies
+        """
+        from .zones import localize
+        return RangeBatch(localize(self.starts, tz, ambiguous, nonexistent),
+                          localize(self.ends, tz, ambiguous, nonexistent), tz=tz)
+
+    def wall(self):
+        """:return: the wall clock times of this batch in its zone"""
+        from .zones import convert
+        if self.tz is None:
+            return RangeBatch(array('q', self.starts), array('q', self.ends))
+        return RangeBatch(convert(self.starts, self.tz), convert(self.ends, self.tz))
@@ -0,0 +1,200 @@
+"""A persistent cache of grammar matches, shared by processes and restarts.
+
+`utils.search` keeps its matches in an in-process LRU cache, which every new
+process starts empty. With a persistent cache enabled, misses are looked up
+in an SQLite database before running TIMESTRING_RE, and new matches are
+written back, so other processes and later runs start warm:
+
+    >>> timestring.cache.enable('/var/cache/timestring.sqlite')
+
+or set ``TIMESTRING_CACHE=/var/cache/timestring.sqlite`` before importing
+timestring.
+
+Only the groups matched (or that nothing matched) are stored, which do not
+depend on the time of the parse; Dates and Ranges are still resolved against
+`now` as usual. Entries are keyed on the phrase, stripped and lowercased as
+the grammar reads it, and a hash of the compiled grammar, so a changed grammar never reads stale matches. Entries of
+other grammars are left to other versions sharing the database, as during a
+rolling deploy, until eviction or `clear` drops them.
+
+Many processes can share one database: it uses SQLite's write ahead log,
+waits for locks up to `timeout` and writes new entries in batches. Once it
+holds more than `max_entries`, the oldest entries are evicted. A database
+that stays locked or fails otherwise never fails a parse: the lookup is a
+miss and the writes are dropped, with a RuntimeWarning.
+"""
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import warnings
+
+from . import utils
+from .timestring_re import PATTERN
+
+FORMAT = 1            # bump when the stored representation changes
+MAX_ENTRIES = 100000
+FLUSH_EVERY = 64      # pending writes before they are committed
+TIMEOUT = 5.0         # seconds to wait for another process' lock
+
+GRAMMAR = hashlib.sha1(('%d:%s' % (FORMAT, PATTERN)).encode()).hexdigest()[:16]
+GROUPS = utils.GROUPS
+
+
+class PhraseCache(object):
+    """The grammar matches of phrases in an SQLite database at `path`."""
+
+    def __init__(self, path, max_entries=MAX_ENTRIES, timeout=TIMEOUT):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._pending = []
+        self._lock = threading.Lock()
+        self._pid = None
+        self._db = None
+
+    def __repr__(self):
+        return "<timestring.PhraseCache %s>" % self.path
+
+    def _connect(self):
+        """:return: the connection of this process, opened on first use and
+         again after a fork, as SQLite connections must not cross one
+        """
+        if self._pid != os.getpid():
+            self._pending = []
+            db = sqlite3.connect(self.path, timeout=self.timeout,
+                                 isolation_level=None, check_same_thread=False)
+            try:
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute('PRAGMA synchronous=NORMAL')
+                db.execute('CREATE TABLE IF NOT EXISTS phrases ('
+                           'grammar TEXT NOT NULL, phrase TEXT NOT NULL, groups TEXT, '
+                           'PRIMARY KEY (grammar, phrase))')
+            except sqlite3.Error:
+                db.close()
+                raise
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def _failed(self, error, what):
+        warnings.warn('timestring cache %s: %s %s' % (self.path, what, error), RuntimeWarning, stacklevel=4)
+
+    def get(self, phrase):
+        """:param phrase: stripped and lowercased, as utils.search looks it up
+        :return: (True, groupdict or None) when `phrase` is cached, else
+         (False, None)
+        """
+        with self._lock:
+            try:
+                row = self._connect().execute('SELECT groups FROM phrases WHERE grammar = ? AND phrase = ?',
+                                              (GRAMMAR, phrase)).fetchone()
+            except sqlite3.Error as e:
+                self._failed(e, 'lookup missed,')
+                return False, None
+        if row is None:
+            return False, None
+        if row[0] is None:
+            return True, None
+        match = dict.fromkeys(GROUPS)
+        match.update(json.loads(row[0]))
+        return True, match
+
+    def put(self, phrase, match):
+        """Queue the groupdict (or None) of `phrase`, written every
+        FLUSH_EVERY entries and on `flush`.
+        """
+        groups = None
+        if match is not None:
+            groups = json.dumps(dict((k, v) for k, v in match.items() if v is not None),
+                                separators=(',', ':'))
+        with self._lock:
+            try:
+                self._connect()
+            except sqlite3.Error as e:
+                self._failed(e, 'write dropped,')
+                return
+            self._pending.append((GRAMMAR, phrase, groups))
+            if len(self._pending) >= FLUSH_EVERY:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        db = self._db
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                db.executemany('INSERT OR IGNORE INTO phrases (grammar, phrase, groups) VALUES (?, ?, ?)',
+                               self._pending)
+                # rowids grow with every insert, the smallest are the oldest
+                db.execute('DELETE FROM phrases WHERE rowid <= (SELECT max(rowid) FROM phrases) - ?',
+                           (self.max_entries,))
+                db.execute('COMMIT')
+            except sqlite3.Error:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            self._failed(e, '%d writes dropped,' % len(self._pending))
+        finally:
+            self._pending = []
+
+    def __len__(self):
+        """:return: the entries of this grammar, 0 when the database fails"""
+        self.flush()
+        with self._lock:
+            try:
+                return self._connect().execute('SELECT count(*) FROM phrases WHERE grammar = ?',
+                                               (GRAMMAR,)).fetchone()[0]
+            except sqlite3.Error as e:
+                self._failed(e, 'count failed,')
+                return 0
+
+    def clear(self):
+        """Drop every entry, of every grammar."""
+        with self._lock:
+            self._pending = []
+            try:
+                self._connect().execute('DELETE FROM phrases')
+            except sqlite3.Error as e:
+                self._failed(e, 'clear failed,')
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = self._pid = None
+
+
+def enable(path, max_entries=MAX_ENTRIES, timeout=TIMEOUT):
+    """Consult and fill the persistent cache at `path` on `utils.search`
+    misses, replacing any cache enabled before.
+
+    :return: the PhraseCache
+    """
+    disable()
+    cache = PhraseCache(path, max_entries, timeout)
+    utils.persistent = cache
+    utils.search.cache_clear()
+    return cache
+
+
+def disable():
+    """Write the pending entries and stop using the persistent cache."""
+    cache, utils.persistent = utils.persistent, None
+    if cache is not None:
+        cache.close()
+
+
+@atexit.register
+def _close():
+    if utils.persistent is not None:
+        utils.persistent.flush()
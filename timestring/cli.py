@@ -0,0 +1,267 @@
+"""The ``timestring`` console script.
+
+    $ timestring next week
+    From 06/19/17 00:00:00 to 06/26/17 00:00:00
+
+With ``--stdin`` it resolves one phrase per line (or one CSV column) against
+a single reference time and writes a JSONL, CSV or TSV record per input row.
+Repeated phrases are resolved once while they are among the CACHE_PHRASES
+last seen.
+
+    $ cut -f3 events.tsv | timestring --stdin --format tsv --timestamps epoch
+
+``timestring serve`` runs a resident server (see timestring.server) and
+``--socket`` / ``--port`` turn the command into a thin client of it.
+
+    $ timestring serve --socket /tmp/timestring.sock &
+    $ timestring --socket /tmp/timestring.sock last 2 weeks
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import OrderedDict
+
+from timestring import TimestringInvalid
+from .Date import Date
+from .Range import Range
+
+FORMATS = ('jsonl', 'csv', 'tsv')
+ERROR_POLICIES = ('raise', 'skip', 'null')
+CHUNK_LINES = 10000
+CACHE_PHRASES = 4096  # distinct phrases remembered by --stdin
+
+# Per process settings for the worker pool
+_settings = {}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='timestring',
+                                     add_help=True,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=""" """)
+    parser.add_argument('-d', '--date', action='store_true')
+    parser.add_argument('-z', '--zone', help="Time zone")
+    parser.add_argument('--verbose', '-v', action="store_true", help="Verbose mode")
+    parser.add_argument('--stdin', action='store_true',
+                        help="Resolve newline delimited phrases read from stdin")
+    parser.add_argument('--csv-column', metavar='COLUMN',
+                        help="Read stdin as CSV and take phrases from this column "
+                             "(a header name or a 0-based index)")
+    parser.add_argument('--format', choices=FORMATS, default='jsonl',
+                        help="Output format for --stdin (default: jsonl)")
+    parser.add_argument('--timestamps', choices=('iso', 'epoch'), default='iso',
+                        help="Write ISO 8601 strings or unix epoch seconds")
+    parser.add_argument('--now', help="Reference time every phrase is resolved against")
+    parser.add_argument('--workers', type=int, default=0, metavar='N',
+                        help="Resolve phrases in a pool of N processes")
+    parser.add_argument('--errors', choices=ERROR_POLICIES, default='raise',
+                        help="On an unparsable phrase stop (raise), drop the row (skip) "
+                             "or write empty values and the error (null)")
+    parser.add_argument('--socket', metavar='PATH',
+                        help="Send the phrases to a `timestring serve` on this Unix socket")
+    parser.add_argument('--host', default='127.0.0.1', help="Host of a `timestring serve`")
+    parser.add_argument('--port', type=int, help="Send the phrases to a `timestring serve` on this port")
+    parser.add_argument('args', nargs="*", help="Time input")
+    return parser
+
+
+def build_serve_parser():
+    parser = argparse.ArgumentParser(prog='timestring serve',
+                                     description="Resolve phrases sent as line delimited JSON")
+    parser.add_argument('--socket', metavar='PATH', help="Listen on this Unix socket")
+    parser.add_argument('--host', default='127.0.0.1', help="Listen on this host (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, help="Listen on this TCP port")
+    return parser
+
+
+def _timestamp(date, epoch):
+    value = date.date
+    if value == 'infinity':
+        return 'infinity'
+    if isinstance(value, Date):
+        value = value.date
+    return value.timestamp() if epoch else value.isoformat()
+
+
+def resolve(phrase, date=False, tz=None, now=None, epoch=False):
+    """:return: the output values of one phrase, (date,) or (start, end)"""
+    if date:
+        return (_timestamp(Date(phrase, tz=tz, now=now), epoch),)
+    _range = Range(phrase, tz=tz, now=now)
+    return _timestamp(_range.start, epoch), _timestamp(_range.end, epoch)
+
+
+def _init_worker(settings):
+    _settings.update(settings)
+
+
+def _resolve_safe(phrase):
+    try:
+        return resolve(phrase, **_settings), None
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+
+
+def _phrases(stdin, column):
+    if column is None:
+        for line in stdin:
+            yield line.rstrip('\r\n')
+        return
+    reader = csv.reader(stdin)
+    if column.isdigit():
+        index = int(column)
+    else:
+        header = next(reader, [])
+        if column not in header:
+            raise TimestringInvalid('No such CSV column: %s' % column)
+        index = header.index(column)
+    for row in reader:
+        yield row[index] if index < len(row) else ''
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _records(args, stdout):
+    """:return: a function writing the record of a phrase, its values and
+     error in --format, applying --errors; it returns False to stop
+    """
+    fields = ['phrase'] + (['date'] if args.date else ['start', 'end'])
+    if args.errors == 'null':
+        fields.append('error')
+    if args.format == 'jsonl':
+        def write(row):
+            stdout.write(json.dumps(dict(zip(fields, row))) + '\n')
+    else:
+        writer = csv.writer(stdout, delimiter='\t' if args.format == 'tsv' else ',',
+                            lineterminator='\n')
+        writer.writerow(fields)
+        write = writer.writerow
+
+    def record(phrase, values, error):
+        if error is not None:
+            if args.errors == 'raise':
+                sys.stderr.write('timestring: %s\n' % error)
+                return False
+            if args.errors == 'skip':
+                return True
+            values = (None,) * (len(fields) - 2)
+        row = [phrase]
+        row.extend(values)
+        if args.errors == 'null':
+            row.append(error)
+        write(row)
+        return True
+    return record
+
+
+def run_stdin(args, stdin=None, stdout=None):
+    """Resolve phrases from `stdin` and write one record per row to `stdout`.
+
+    :return: the process exit status
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    now = Date(args.now or 'now', tz=args.zone).date
+    settings = dict(date=args.date, tz=args.zone, now=now, epoch=args.timestamps == 'epoch')
+    _settings.update(settings)
+    record = _records(args, stdout)
+
+    pool = None
+    if args.workers > 1:
+        from multiprocessing import Pool
+        pool = Pool(args.workers, initializer=_init_worker, initargs=(settings,))
+
+    cache = OrderedDict()
+    try:
+        for chunk in _chunks(_phrases(stdin, args.csv_column), CHUNK_LINES):
+            new = []
+            for phrase in dict.fromkeys(chunk):
+                if phrase in cache:
+                    cache.move_to_end(phrase)
+                else:
+                    new.append(phrase)
+            if pool:
+                cache.update(zip(new, pool.map(_resolve_safe, new, chunksize=64)))
+            else:
+                cache.update((phrase, _resolve_safe(phrase)) for phrase in new)
+            for phrase in chunk:
+                if not record(phrase, *cache[phrase]):
+                    return 1
+            # the phrases of a chunk are kept until it is written
+            while len(cache) > CACHE_PHRASES:
+                cache.popitem(last=False)
+    finally:
+        if pool:
+            pool.terminate()
+    return 0
+
+
+def run_client(args, stdin=None, stdout=None):
+    """Resolve the phrases in a running server and write them like
+    `run_stdin`, or the JSON result of the one phrase of the arguments.
+
+    :return: the process exit status
+    """
+    from .server import Client
+    stdout = stdout or sys.stdout
+    request = dict(date=args.date, tz=args.zone, now=args.now, timestamps=args.timestamps)
+    rows = args.stdin or args.csv_column
+    if rows:
+        chunks = _chunks(_phrases(stdin or sys.stdin, args.csv_column), CHUNK_LINES)
+        record = _records(args, stdout)
+    else:
+        chunks = [[" ".join(args.args)]]
+    with Client(args.socket, host=args.host, port=args.port) as client:
+        for chunk in chunks:
+            response = client.request(phrases=chunk, **request)
+            if 'error' in response:
+                sys.stderr.write('timestring: %s\n' % response['error'])
+                return 1
+            for phrase, result in zip(chunk, response['results']):
+                if rows:
+                    values = (result.get('date'),) if args.date else (result.get('start'), result.get('end'))
+                    if not record(phrase, values, result.get('error')):
+                        return 1
+                elif 'error' in result and args.errors == 'raise':
+                    sys.stderr.write('timestring: %s\n' % result['error'])
+                    return 1
+                elif 'error' not in result or args.errors == 'null':
+                    stdout.write(json.dumps(result) + '\n')
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv:
+        parser.print_help()
+        return
+    if argv[0] == 'serve':
+        args = build_serve_parser().parse_args(argv[1:])
+        if not args.socket and args.port is None:
+            build_serve_parser().error('one of --socket or --port is required')
+        from .server import serve
+        serve(args.socket, host=args.host, port=args.port)
+        return
+    args = parser.parse_args(argv)
+    if args.socket or args.port:
+        sys.exit(run_client(args))
+    elif args.stdin or args.csv_column:
+        sys.exit(run_stdin(args))
+    elif not args.args:
+        parser.print_help()
+    elif args.date:
+        print(Date(" ".join(args.args), verbose=args.verbose, tz=args.zone))
+    else:
+        print(Range(" ".join(args.args), verbose=args.verbose, tz=args.zone))
@@ -0,0 +1,226 @@
+"""Opt-in timing of the parse pipeline.
+
+    >>> with instrument.collect() as stats:
+    ...     Range('next 2 weeks')
+    >>> stats.report()
+    {'calls': 1, 'errors': 0, 'total_ms': 0.41, 'phases_ms': {'regex': 0.05, ...},
+     'subparses': 5, 'branches': {'next and (num or article)': 1}}
+
+Every top level Date or Range construction (and Date arithmetic called
+directly) produces one record, split into exclusive phases:
+
+- regex: matching the grammar (`utils.search`, cached)
+- groups: extracting the matched groups
+- get_num: converting numbers and spelled out numbers
+- arithmetic: Date.plus_ and Date.plus
+- subparse: nested Date and Range constructions
+- other: the rest of the top level constructor
+
+Range records also list the branches of Range.__init__ taken. Records go to
+the callbacks passed to `enable`; `collect` aggregates them in a Stats.
+
+Disabled, which is the default, nothing is timed and the pipeline runs its
+own functions: `enable` swaps in timed wrappers, process wide, and the last
+`disable` puts the originals back.
+"""
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+from .Date import Date
+from .Range import Range
+
+PHASES = ('regex', 'groups', 'get_num', 'arithmetic', 'subparse', 'other')
+
+_callbacks = []
+_originals = []
+_local = threading.local()
+_lock = threading.Lock()
+
+
+class _Call(object):
+    """The record being built for one top level call in this thread."""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.phrase = args[1] if len(args) > 1 and name in ('Date', 'Range') else None
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.subparses = 0
+        self.branches = []
+        self.frames = []
+
+    def record(self, total, error):
+        return dict(kind=self.name,
+                    phrase=self.phrase,
+                    total=total,
+                    phases=self.phases,
+                    subparses=self.subparses,
+                    branches=self.branches,
+                    error=error)
+
+
+def _timed(func, name, phase=None, branches=False):
+    """Wrap `func` to add its exclusive time to `phase`.
+
+    Constructors (no `phase`) count as "other" at the top level and as
+    "subparse" when nested.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        call = getattr(_local, 'call', None)
+        top = call is None
+        if top:
+            call = _local.call = _Call(name, args)
+            # Range(self, start, end, offset, week_start, tz, verbose, ...)
+            if branches and len(args) < 7 and not kwargs.get('verbose'):
+                kwargs['verbose'] = call.branches.append
+        if phase:
+            key = phase
+        elif top:
+            key = 'other'
+        else:
+            key = 'subparse'
+            call.subparses += 1
+
+        frame = [0.0]
+        call.frames.append(frame)
+        error = None
+        started = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except BaseException as e:
+            error = e.__class__.__name__
+            raise
+        finally:
+            elapsed = perf_counter() - started
+            call.frames.pop()
+            call.phases[key] += elapsed - frame[0]
+            if call.frames:
+                call.frames[-1][0] += elapsed
+            if top:
+                _local.call = None
+                record = call.record(elapsed, error)
+                for callback in list(_callbacks):
+                    callback(record)
+    return wrapper
+
+
+def _targets():
+    """:return: (owner, attribute, name, phase, branches) of every timed function"""
+    date_module = sys.modules[Date.__module__]
+    range_module = sys.modules[Range.__module__]
+    return [
+        (date_module, 'search', 'search', 'regex', False),
+        (date_module, 'groups', 'groups', 'groups', False),
+        (date_module, 'get_num', 'get_num', 'get_num', False),
+        (range_module, 'search', 'search', 'regex', False),
+        (range_module, 'get_num', 'get_num', 'get_num', False),
+        (Date, 'plus_', 'Date.plus_', 'arithmetic', False),
+        (Date, 'plus', 'Date.plus', 'arithmetic', False),
+        (Date, '__init__', 'Date', None, False),
+        (Range, '__init__', 'Range', None, True),
+    ]
+
+
+def _install():
+    for owner, attribute, name, phase, branches in _targets():
+        func = owner.__dict__[attribute]
+        _originals.append((owner, attribute, func))
+        setattr(owner, attribute, _timed(func, name, phase, branches))
+
+
+def _uninstall():
+    while _originals:
+        owner, attribute, func = _originals.pop()
+        setattr(owner, attribute, func)
+
+
+def enabled():
+    return bool(_callbacks)
+
+
+def enable(callback):
+    """Start timing, calling `callback(record)` after every top level call.
+
+    A record is a dict with the keys kind ("Date", "Range", "Date.plus_"...),
+    phrase, total and phases (seconds), subparses, branches and error (the
+    exception class name or None).
+    """
+    with _lock:
+        if not _callbacks:
+            _install()
+        _callbacks.append(callback)
+
+
+def disable(callback=None):
+    """Stop sending records to `callback`, or to every callback.
+
+    Timing stops once no callback is left.
+    """
+    with _lock:
+        if callback is None:
+            del _callbacks[:]
+        elif callback in _callbacks:
+            _callbacks.remove(callback)
+        if not _callbacks:
+            _uninstall()
+
+
+class Stats(object):
+    """Aggregates records in process, pass `add` to `enable`."""
+
+    def __init__(self, slowest=10):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.subparses = 0
+        self.kinds = Counter()
+        self.branches = Counter()
+        self.slowest = []
+        self._keep = slowest
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.calls += 1
+            self.errors += record['error'] is not None
+            self.total += record['total']
+            for phase, seconds in record['phases'].items():
+                self.phases[phase] += seconds
+            self.subparses += record['subparses']
+            self.kinds[record['kind']] += 1
+            self.branches.update(record['branches'])
+            if self._keep:
+                self.slowest.append(record)
+                self.slowest.sort(key=lambda r: -r['total'])
+                del self.slowest[self._keep:]
+
+    def report(self):
+        """:return: the aggregates as a JSON friendly dict, times in ms"""
+        with self._lock:
+            return dict(calls=self.calls,
+                        errors=self.errors,
+                        total_ms=round(self.total * 1000, 3),
+                        phases_ms=dict((phase, round(seconds * 1000, 3))
+                                       for phase, seconds in self.phases.items()),
+                        subparses=self.subparses,
+                        kinds=dict(self.kinds),
+                        branches=dict(self.branches),
+                        slowest=[dict(kind=r['kind'], phrase=r['phrase'],
+                                      total_ms=round(r['total'] * 1000, 3))
+                                 for r in self.slowest])
+
+
+@contextmanager
+def collect(slowest=10):
+    """Time the calls made in the block and aggregate them in a Stats."""
+    stats = Stats(slowest)
+    enable(stats.add)
+    try:
+        yield stats
+    finally:
+        disable(stats.add)
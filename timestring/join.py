@@ -0,0 +1,95 @@
+"""Sweep line joins between two collections of Ranges.
+
+Comparing every pair costs O(n * m). Sorting the bounds once and sweeping
+them in time order only visits the pairs that overlap, in
+O((n + m) log(n + m) + pairs):
+
+    >>> for session, incident in join(sessions, incidents):
+    ...     print(session, incident)
+
+Both sides may be iterables of Ranges or RangeBatches. Bounds compare as
+microseconds like in timestring.batch: aware Ranges as instants, naive ones
+by wall clock, so do not mix them. Infinite bounds are unbounded.
+"""
+from datetime import timedelta
+from heapq import heappop, heappush
+
+from .batch import INFINITY, NEG_INFINITY, RangeBatch
+
+MODES = ('overlap', 'contains', 'within')
+CLOSED = ('left', 'both')
+
+
+def _columns(ranges):
+    """:return: (starts, ends, items) of Ranges or a RangeBatch"""
+    if isinstance(ranges, RangeBatch):
+        return ranges.starts, ranges.ends, ranges
+    ranges = list(ranges)
+    batch = RangeBatch.from_ranges(ranges)
+    return batch.starts, batch.ends, ranges
+
+
+def _overlap(start, end):
+    if start == NEG_INFINITY or end == INFINITY:
+        return timedelta.max
+    return timedelta(microseconds=end - start)
+
+
+def pairs(left_starts, left_ends, right_starts, right_ends, closed='left'):
+    """Yield the (left index, right index) of every overlapping pair of
+    intervals given as columns of microseconds.
+
+    :param closed: 'left' for half open intervals, which overlap when they
+     share some time (empty ones never do), or 'both' for closed intervals,
+     which also overlap when they touch
+    """
+    if closed not in CLOSED:
+        raise ValueError('closed must be one of %s' % ', '.join(CLOSED))
+    half_open = closed == 'left'
+    events = []
+    for side, starts, ends in ((0, left_starts, left_ends), (1, right_starts, right_ends)):
+        for index, start in enumerate(starts):
+            if ends[index] > start or (not half_open and ends[index] == start):
+                events.append((start, side, index))
+    events.sort()
+
+    # the intervals started so far and not yet ended, as heaps of (end, index)
+    active = ([], [])
+    for start, side, index in events:
+        other = active[1 - side]
+        while other and (other[0][0] <= start if half_open else other[0][0] < start):
+            heappop(other)
+        for _, match in other:
+            yield (index, match) if side == 0 else (match, index)
+        heappush(active[side], ((left_ends if side == 0 else right_ends)[index], index))
+
+
+def join(left, right, mode='overlap', closed='left', min_overlap=None, overlap=False, index=False):
+    """Yield the pairs of a Range of `left` and a Range of `right` that
+    overlap, in the order of their later start.
+
+    :param mode: 'overlap' for any shared time, 'contains' when the left
+     Range contains the right one, 'within' when it is within the right one
+    :param closed: 'left' for half open Ranges (touching Ranges do not
+     overlap), 'both' for closed ones like ``Range in Range``
+    :param min_overlap: skip pairs sharing less time, a timedelta
+    :param overlap: also yield the shared time, a timedelta (timedelta.max
+     when unbounded)
+    :param index: yield the positions in `left` and `right` instead of the
+     Ranges
+    """
+    if mode not in MODES:
+        raise ValueError('mode must be one of %s' % ', '.join(MODES))
+    left_starts, left_ends, left_items = _columns(left)
+    right_starts, right_ends, right_items = _columns(right)
+    for i, j in pairs(left_starts, left_ends, right_starts, right_ends, closed):
+        if mode == 'contains' and not (left_starts[i] <= right_starts[j] and right_ends[j] <= left_ends[i]):
+            continue
+        if mode == 'within' and not (right_starts[j] <= left_starts[i] and left_ends[i] <= right_ends[j]):
+            continue
+        if min_overlap is not None or overlap:
+            shared = _overlap(max(left_starts[i], right_starts[j]), min(left_ends[i], right_ends[j]))
+            if min_overlap is not None and shared < min_overlap:
+                continue
+        pair = (i, j) if index else (left_items[i], right_items[j])
+        yield pair + (shared,) if overlap else pair
@@ -0,0 +1,221 @@
+"""Fast timestamps of log lines, with a parser learnt from sample lines.
+
+A log file writes its timestamps in one layout, so instead of running the
+natural language grammar on every line, `infer` looks at the first lines
+for a known layout and where it sits, and returns a LogParser that decodes
+it by slicing:
+
+    >>> parser = timestring.logs.infer(lines)
+    >>> parser
+    <timestring.LogParser syslog at 0>
+    >>> parser('Jun 16 19:37:22 web sshd[512]: Accepted publickey')
+    <timestring.Date 2017-06-16 19:37:22 ...>
+
+Lines that do not fit the layout are handed to the general parser (the
+first timestring `findall` finds) and counted in `parser.fallbacks`.
+`parse_lines` does both on a stream, sampling its first lines.
+
+Layouts, in the order preferred when several fit as many lines:
+
+- apache: ``16/Jun/2017:19:37:22 +0000``
+- iso: ``2017-06-16T19:37:22``, a space for the T, an optional fraction
+  and an optional zone (Z, +02:00 or +0200)
+- ctime: ``Fri Jun 16 19:37:22 2017``
+- syslog: ``Jun 16 19:37:22``, in the year of `now` or the one before
+  when that would be after `now`
+- epoch_ms and epoch: 13 digit and 10 digit (optionally with a fraction)
+  unix times, local like Date(int)
+
+Zoned layouts give aware Dates in a fixed offset zone, the others naive.
+"""
+import re
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import chain, islice
+
+from timestring import TimestringInvalid
+from .Date import MONTH_ORDINALS, _wrap
+from .Range import Range
+
+SAMPLE = 100
+
+Layout = namedtuple('Layout', 'name pattern decode')
+
+
+@lru_cache(maxsize=64)
+def _offset(text):
+    """:return: the tzinfo of 'Z', '+0200' or '+02:00'"""
+    if text in ('Z', 'z'):
+        return timezone.utc
+    minutes = int(text[1:3]) * 60 + int(text[-2:])
+    return timezone(timedelta(minutes=-minutes if text[0] == '-' else minutes))
+
+
+def _month(text):
+    month = MONTH_ORDINALS.get(text.lower())
+    if month is None:
+        raise ValueError('Not a month: %s' % text)
+    return month
+
+
+def _iso(text, now):
+    value = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                     int(text[11:13]), int(text[14:16]), int(text[17:19]))
+    rest = text[19:]
+    if rest[:1] in ('.', ','):
+        digits = len(rest) - len(rest[1:].lstrip('0123456789'))
+        value = value.replace(microsecond=int(rest[1:digits][:6].ljust(6, '0')))
+        rest = rest[digits:]
+    if rest:
+        value = value.replace(tzinfo=_offset(rest))
+    return value
+
+
+def _apache(text, now):
+    return datetime(int(text[7:11]), _month(text[3:6]), int(text[0:2]),
+                    int(text[12:14]), int(text[15:17]), int(text[18:20]),
+                    tzinfo=_offset(text[21:26]))
+
+
+def _ctime(text, now):
+    return datetime(int(text[20:24]), _month(text[4:7]), int(text[8:10]),
+                    int(text[11:13]), int(text[14:16]), int(text[17:19]))
+
+
+def _syslog(text, now):
+    if now.tzinfo is not None:
+        now = now.replace(tzinfo=None)  # syslog stamps are local wall clock
+    month, day = _month(text[0:3]), int(text[4:6])
+    hour, minute, second = int(text[7:9]), int(text[10:12]), int(text[13:15])
+    value = datetime(now.year, month, day, hour, minute, second)
+    if value > now + timedelta(days=1):
+        # logs are written in the past, "Dec 31" read in January is last year
+        value = value.replace(year=now.year - 1)
+    return value
+
+
+def _epoch(text, now):
+    return datetime.fromtimestamp(float(text) if '.' in text else int(text))
+
+
+def _epoch_ms(text, now):
+    return datetime.fromtimestamp(int(text) / 1000.0)
+
+
+MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
+LAYOUTS = (
+    Layout('apache', r'\d{2}/' + MONTH + r'/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4}', _apache),
+    Layout('iso', r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:[Zz]|[+-]\d{2}:?\d{2})?(?!\d)', _iso),
+    Layout('ctime', r'(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) ' + MONTH + r' [ \d]\d \d{2}:\d{2}:\d{2} \d{4}', _ctime),
+    Layout('syslog', MONTH + r' [ \d]\d \d{2}:\d{2}:\d{2}', _syslog),
+    Layout('epoch_ms', r'(?<![\d.])[1-9]\d{12}(?![\d.])', _epoch_ms),
+    Layout('epoch', r'(?<![\d.])[1-9]\d{9}(?:\.\d+)?(?![\d.])', _epoch),
+)
+_COMPILED = [(layout, re.compile(layout.pattern)) for layout in LAYOUTS]
+
+
+class LogParser(object):
+    """Decodes the timestamps of one layout, see `infer`.
+
+    :ivar layout: the Layout name, None when no sample line had one
+    :ivar start: the offset the timestamp starts at in most lines, where it
+     is matched first; lines with it elsewhere are searched
+    :ivar lines: the lines parsed
+    :ivar fallbacks: the lines handed to the general parser
+    """
+
+    def __init__(self, layout=None, start=None, now=None):
+        self.layout = layout
+        self.start = start
+        self.now = now or datetime.now()
+        self.lines = 0
+        self.fallbacks = 0
+        found = [(found, regex) for found, regex in _COMPILED if found.name == layout]
+        self._regex = found[0][1] if found else None
+        self._decode = found[0][0].decode if found else None
+
+    def __repr__(self):
+        where = 'searched' if self.start is None else 'at %d' % self.start
+        return "<timestring.LogParser %s %s>" % (self.layout, where)
+
+    def _match(self, line):
+        if self.start is not None:
+            match = self._regex.match(line, self.start)
+            if match is not None:
+                return match
+        return self._regex.search(line)
+
+    def __call__(self, line: str):
+        """:return: the Date of the timestamp in `line`, None when the
+         general parser finds none (or an invalid one) either. Of a Range
+         the general parser finds, the start is returned.
+        """
+        self.lines += 1
+        if self._regex is not None:
+            match = self._match(line)
+            if match is not None:
+                try:
+                    return _wrap(self._decode(match.group(), self.now))
+                except ValueError:
+                    pass
+        self.fallbacks += 1
+        from timestring import findall
+        try:
+            found = findall(line)
+        except (TimestringInvalid, ValueError):
+            return None
+        if not found:
+            return None
+        found = found[0][1]
+        return found.start if isinstance(found, Range) else found
+
+    def parse(self, lines):
+        """:return: the Dates (or None) of `lines`"""
+        return [self(line) for line in lines]
+
+
+def infer(lines, sample: int = SAMPLE, now: datetime = None):
+    """Learn the timestamp layout and position of the first `sample` lines.
+
+    The layout matching the most lines wins, and its most common offset
+    is where lines are matched first.
+
+    :param lines: lines of text; only the first `sample` are read
+    :param now: the time syslog timestamps, which have no year, are read at
+    :return: a LogParser
+    """
+    best, best_count, best_starts = None, 0, None
+    sampled = list(islice(lines, sample))
+    for layout, regex in _COMPILED:
+        starts = Counter()
+        for line in sampled:
+            match = regex.search(line)
+            if match is not None:
+                try:
+                    layout.decode(match.group(), now or datetime.now())
+                except ValueError:
+                    continue
+                starts[match.start()] += 1
+        count = sum(starts.values())
+        if count > best_count:
+            best, best_count, best_starts = layout.name, count, starts
+    start = best_starts.most_common(1)[0][0] if best is not None else None
+    return LogParser(best, start, now)
+
+
+def parse_lines(lines, sample: int = SAMPLE, now: datetime = None):
+    """Parse a stream of lines, inferring the layout from its first
+    `sample` lines, which are parsed too.
+
+    >>> parser, dates = parse_lines(open('/var/log/syslog'))
+    >>> for line, date in dates: ...
+    >>> parser.fallbacks
+
+    :return: the LogParser (see `infer`) and a generator of (line, Date or
+     None)
+    """
+    lines = iter(lines)
+    head = list(islice(lines, sample))
+    parser = infer(head, sample, now)
+    return parser, ((line, parser(line)) for line in chain(head, lines))
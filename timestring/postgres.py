@@ -0,0 +1,605 @@
+"""PostgreSQL COPY encoders and decoders for Dates and Ranges.
+
+Values are written in COPY text format: one row per line, columns separated
+by tabs and ``\\N`` for NULL. Timestamps are written the way ``str(datetime)``
+renders them and ranges as ``["start","end")``; a Range with a timezone is a
+tstzrange, otherwise a tsrange.
+
+    >>> with open('visits.copy', 'w') as fp:
+    ...     write_copy(fp, ranges)
+    >>> cursor.copy_expert("COPY visits (during) FROM STDIN",
+    ...                    CopyStream(ranges))
+
+The decoders read PostgreSQL's text output of timestamp, timestamptz, tsrange
+and tstzrange back, a whole column at a time.
+
+    >>> decode_ranges(['["2017-06-16 00:00:00+00","2017-06-17 00:00:00+00")'])
+    [<timestring.Range From 06/16/17 00:00:00 to 06/17/17 00:00:00 4483019280>]
+
+For binary COPY, timestamps are int64 microseconds since 2000-01-01 and
+ranges a flags byte followed by length prefixed bounds.
+
+    >>> write_copy_binary(fp, ranges)
+    >>> read_copy_binary(fp.getvalue(), 'tstzrange')
+    [[<timestring.Range From 06/16/17 00:00:00 to 06/17/17 00:00:00 4483019280>]]
+"""
+import struct
+from datetime import datetime, timedelta
+
+import pytz
+
+from timestring import TimestringInvalid
+from .Date import Date
+from .Range import Range
+from .batch import DateBatch, RangeBatch, EPOCH, INFINITY, NEG_INFINITY, \
+    get_zone, make_date, make_range, from_micros, to_micros
+
+NULL = '\\N'
+CHUNK_ROWS = 1024
+
+
+def encode_timestamp(date, lower=False):
+    """:return: the COPY text of a Date, datetime or 'infinity'
+
+    :param lower: encode infinity as '-infinity', as for a range's start
+    """
+    if isinstance(date, Date):
+        date = date.date
+    if date == 'infinity':
+        return '-infinity' if lower else 'infinity'
+    return str(date)
+
+
+def encode_range(_range):
+    """:return: the COPY text of a Range, 'empty' when start equals end"""
+    start, end = _range.start.date, _range.end.date
+    if start == end and start != 'infinity':
+        return 'empty'
+    return '[%s,%s)' % (
+        '-infinity' if start == 'infinity' else '"%s"' % start,
+        'infinity' if end == 'infinity' else '"%s"' % end,
+    )
+
+
+def encode(value):
+    """:return: the COPY text of a Date, datetime, Range or None"""
+    if value is None:
+        return NULL
+    if isinstance(value, Range):
+        return encode_range(value)
+    return encode_timestamp(value)
+
+
+def _micros_text(micros, aware, lower=False):
+    if micros == INFINITY or micros == NEG_INFINITY:
+        return '-infinity' if lower or micros == NEG_INFINITY else 'infinity'
+    text = str(EPOCH + timedelta(microseconds=micros))
+    return text + '+00:00' if aware else text
+
+
+def _date_batch_cells(batch):
+    aware = batch.tz is not None
+    for micros in batch.micros:
+        yield _micros_text(micros, aware)
+
+
+def _range_batch_cells(batch):
+    aware = batch.tz is not None
+    for start, end in zip(batch.starts, batch.ends):
+        if start == end:
+            yield 'empty'
+            continue
+        start = _micros_text(start, aware, lower=True)
+        end = _micros_text(end, aware)
+        yield '[%s,%s)' % (start if start[0] == '-' else '"%s"' % start,
+                           end if end[0] == 'i' else '"%s"' % end)
+
+
+def cells(column):
+    """Yield the COPY text of each value in a column.
+
+    :param column: an iterable of Dates, datetimes, Ranges and None, or a
+     DateBatch / RangeBatch
+    """
+    if isinstance(column, RangeBatch):
+        return _range_batch_cells(column)
+    if isinstance(column, DateBatch):
+        return _date_batch_cells(column)
+    return map(encode, column)
+
+
+def copy_lines(*columns):
+    """Yield COPY text lines, one per row, zipping the given columns."""
+    if len(columns) == 1:
+        for cell in cells(columns[0]):
+            yield cell + '\n'
+    else:
+        for row in zip(*map(cells, columns)):
+            yield '\t'.join(row) + '\n'
+
+
+def write_copy(fp, *columns):
+    """Write the columns to `fp` in COPY text format.
+
+    :return: the number of rows written
+    """
+    rows = 0
+    chunk = []
+    for line in copy_lines(*columns):
+        chunk.append(line)
+        if len(chunk) == CHUNK_ROWS:
+            fp.write(''.join(chunk))
+            rows += len(chunk)
+            chunk = []
+    if chunk:
+        fp.write(''.join(chunk))
+        rows += len(chunk)
+    return rows
+
+
+class CopyStream(object):
+    """A readable file-like object that encodes rows lazily.
+
+    Pass it to ``cursor.copy_expert`` or ``cursor.copy_from`` to stream the
+    columns without building the whole COPY payload in memory.
+    """
+
+    def __init__(self, *columns):
+        self._lines = copy_lines(*columns)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = ''.join(parts)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+    def readline(self, size=-1):
+        line, self._buffer = self._buffer, ''
+        if '\n' not in line:
+            line += next(self._lines, '')
+        line, newline, self._buffer = line.partition('\n')
+        return line + newline
+
+
+_OFFSETS = {}
+_MICROSECOND = timedelta(microseconds=1)
+_INFINITIES = {'infinity': INFINITY, '-infinity': NEG_INFINITY}
+
+
+def _offset(text):
+    """:return: the timedelta of a '+HH', '-HH:MM' or '+HH:MM:SS' suffix"""
+    offset = _OFFSETS.get(text)
+    if offset is None:
+        parts = [int(part) for part in text[1:].split(':')] + [0, 0]
+        offset = timedelta(hours=parts[0], minutes=parts[1], seconds=parts[2])
+        if text[0] == '-':
+            offset = -offset
+        _OFFSETS[text] = offset
+    return offset
+
+
+def _timestamp(text):
+    """Parse 'YYYY-MM-DD HH:MM:SS[.ffffff][offset]' by position.
+
+    Values with an offset are returned in UTC.
+    """
+    end = len(text)
+    i = 19
+    microsecond = 0
+    try:
+        if i < end and text[i] == '.':
+            j = i + 1
+            while j < end and text[j].isdigit():
+                j += 1
+            microsecond = int(text[i + 1:j].ljust(6, '0')[:6])
+            i = j
+        if i == end:
+            return datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                            int(text[11:13]), int(text[14:16]), int(text[17:19]),
+                            microsecond)
+        return datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                        int(text[11:13]), int(text[14:16]), int(text[17:19]),
+                        microsecond, pytz.utc) - _offset(text[i:])
+    except (ValueError, IndexError):
+        raise TimestringInvalid('Invalid PostgreSQL timestamp: %s' % text)
+
+
+def decode_timestamp(text):
+    """:return: the datetime of a timestamp or timestamptz, 'infinity' for
+     either infinity, or None for NULL
+
+    timestamptz values are returned in UTC, like the instants they are.
+    """
+    if text is None or text == NULL:
+        return None
+    if text in _INFINITIES:
+        return 'infinity'
+    return _timestamp(text)
+
+
+def _bounds(text):
+    """:return: (start, end) datetimes of a range text, None when empty.
+
+    Ranges are normalized to `[)` by moving exclusive lower and inclusive
+    upper bounds one microsecond later; unbounded and infinite bounds are
+    returned as 'infinity'.
+    """
+    if text == 'empty':
+        return None
+    lower, sep, upper = text[1:-1].partition(',')
+    if not sep or text[0] not in '[(' or text[-1] not in '])':
+        raise TimestringInvalid('Invalid PostgreSQL range: %s' % text)
+    lower, upper = lower.strip('"'), upper.strip('"')
+    if lower and lower not in _INFINITIES:
+        lower = _timestamp(lower)
+        if text[0] == '(':
+            lower += _MICROSECOND
+    else:
+        lower = 'infinity'
+    if upper and upper not in _INFINITIES:
+        upper = _timestamp(upper)
+        if text[-1] == ']':
+            upper += _MICROSECOND
+    else:
+        upper = 'infinity'
+    return lower, upper
+
+
+def decode_range(text):
+    """:return: the Range of a tsrange or tstzrange, or None for NULL
+
+    Bounds are normalized to `[)` at microsecond precision and an empty range
+    decodes to a zero length Range at the epoch, which encodes back to
+    'empty'.
+    """
+    if text is None or text == NULL:
+        return None
+    bounds = _bounds(text)
+    if bounds is None:
+        return make_range(make_date(EPOCH), make_date(EPOCH))
+    return make_range(make_date(bounds[0]), make_date(bounds[1]))
+
+
+def decode_timestamps(column, batch=False):
+    """Decode a column of timestamp or timestamptz text.
+
+    :return: a list of Dates (None for NULL), or a DateBatch when `batch`
+     is set; a batch is UTC when any value carries an offset
+    """
+    if not batch:
+        return [None if text is None or text == NULL else make_date(decode_timestamp(text))
+                for text in column]
+    micros = []
+    tz = None
+    for text in column:
+        if text is None or text == NULL:
+            raise TimestringInvalid('NULL timestamp in a batch')
+        value = _INFINITIES.get(text)
+        if value is None:
+            value = _timestamp(text)
+            if value.tzinfo is not None:
+                tz = pytz.utc
+            value = to_micros(value)
+        micros.append(value)
+    return DateBatch(micros, tz=tz)
+
+
+def decode_ranges(column, batch=False):
+    """Decode a column of tsrange or tstzrange text.
+
+    :return: a list of Ranges (None for NULL), or a RangeBatch when `batch`
+     is set; a batch is UTC when any bound carries an offset
+    """
+    if not batch:
+        return [decode_range(text) for text in column]
+    starts, ends = [], []
+    tz = None
+    for text in column:
+        if text is None or text == NULL:
+            raise TimestringInvalid('NULL range in a batch')
+        bounds = _bounds(text)
+        if bounds is None:
+            starts.append(0)
+            ends.append(0)
+            continue
+        lower, upper = bounds
+        if lower == 'infinity':
+            starts.append(NEG_INFINITY)
+        else:
+            if lower.tzinfo is not None:
+                tz = pytz.utc
+            starts.append(to_micros(lower))
+        if upper == 'infinity':
+            ends.append(INFINITY)
+        else:
+            if upper.tzinfo is not None:
+                tz = pytz.utc
+            ends.append(to_micros(upper))
+    return RangeBatch(starts, ends, tz=tz)
+
+
+PG_EPOCH = 946684800000000  # 2000-01-01 in microseconds since the unix epoch
+COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+KINDS = ('timestamp', 'timestamptz', 'tsrange', 'tstzrange')
+
+RANGE_EMPTY = 0x01
+RANGE_LB_INC = 0x02
+RANGE_UB_INC = 0x04
+RANGE_LB_INF = 0x08
+RANGE_UB_INF = 0x10
+
+_INT16 = struct.Struct('!h')
+_INT32 = struct.Struct('!i')
+_INT64 = struct.Struct('!q')
+_FIELD = struct.Struct('!iq')
+_RANGE = struct.Struct('!Biqiq')
+_NULL_FIELD = _INT32.pack(-1)
+
+
+def _to_pg(micros):
+    if micros == INFINITY or micros == NEG_INFINITY:
+        return micros
+    return micros - PG_EPOCH
+
+
+def _from_pg(micros):
+    if micros == INFINITY or micros == NEG_INFINITY:
+        return micros
+    return micros + PG_EPOCH
+
+
+def _range_micros(_range):
+    start = to_micros(_range.start)
+    return NEG_INFINITY if start == INFINITY else start, to_micros(_range.end)
+
+
+def _pack_range_micros(start, end):
+    if start == end:
+        return bytes((RANGE_EMPTY,))
+    return _RANGE.pack(RANGE_LB_INC, 8, _to_pg(start), 8, _to_pg(end))
+
+
+def pack_timestamp(date):
+    """:return: the binary timestamp / timestamptz of a Date or datetime"""
+    return _INT64.pack(_to_pg(to_micros(date)))
+
+
+def pack_range(_range):
+    """:return: the binary tsrange / tstzrange of a Range"""
+    return _pack_range_micros(*_range_micros(_range))
+
+
+def _unpack_range_micros(data, offset=0):
+    """:return: (start, end) unix microseconds of the binary range at
+     `offset`, normalized to [), and the offset after it"""
+    flags = data[offset]
+    offset += 1
+    if flags & RANGE_EMPTY:
+        return 0, 0, offset
+    start, end = NEG_INFINITY, INFINITY
+    if not flags & RANGE_LB_INF:
+        start = _from_pg(_INT64.unpack_from(data, offset + 4)[0])
+        offset += 12
+        if not flags & RANGE_LB_INC and start != NEG_INFINITY and start != INFINITY:
+            start += 1
+    if not flags & RANGE_UB_INF:
+        end = _from_pg(_INT64.unpack_from(data, offset + 4)[0])
+        offset += 12
+        if flags & RANGE_UB_INC and end != NEG_INFINITY and end != INFINITY:
+            end += 1
+    return start, end, offset
+
+
+def unpack_timestamp(data, tz=None):
+    """:return: the datetime (or 'infinity') of a binary timestamp
+
+    :param tz: None for timestamp, the zone to show a timestamptz in
+    """
+    return from_micros(_from_pg(_INT64.unpack_from(data)[0]), get_zone(tz))
+
+
+def unpack_range(data, tz=None):
+    """:return: the Range of a binary tsrange / tstzrange
+
+    Bounds are normalized to [) like `decode_range` and an empty range is a
+    zero length Range at the epoch.
+    """
+    tz = get_zone(tz)
+    start, end, _ = _unpack_range_micros(data)
+    return make_range(make_date(from_micros(start, tz)),
+                      make_date(from_micros(end, tz)))
+
+
+def _binary_fields(column):
+    """Yield the length prefixed binary field of each value in a column."""
+    if isinstance(column, RangeBatch):
+        for start, end in zip(column.starts, column.ends):
+            data = _pack_range_micros(start, end)
+            yield _INT32.pack(len(data)) + data
+    elif isinstance(column, DateBatch):
+        for micros in column.micros:
+            yield _FIELD.pack(8, _to_pg(micros))
+    else:
+        for value in column:
+            if value is None:
+                yield _NULL_FIELD
+            elif isinstance(value, Range):
+                data = pack_range(value)
+                yield _INT32.pack(len(data)) + data
+            else:
+                yield _FIELD.pack(8, _to_pg(to_micros(value)))
+
+
+def pack_fields(column):
+    """:return: the length prefixed binary fields of a column, concatenated"""
+    return b''.join(_binary_fields(column))
+
+
+def _unpack_fields(buffer, ranges, tz, batch):
+    """Decode consecutive length prefixed fields of one kind."""
+    data = memoryview(buffer)
+    end = len(data)
+    offset = 0
+    starts, ends = [], []
+    while offset < end:
+        length = _INT32.unpack_from(data, offset)[0]
+        offset += 4
+        if length < 0:
+            if batch:
+                raise TimestringInvalid('NULL value in a batch')
+            starts.append(None)
+            ends.append(None)
+            continue
+        if ranges:
+            start, stop, _ = _unpack_range_micros(data, offset)
+            ends.append(stop)
+        else:
+            start = _from_pg(_INT64.unpack_from(data, offset)[0])
+        starts.append(start)
+        offset += length
+    return _column_result(starts, ends, ranges, tz, batch)
+
+
+def _column_result(starts, ends, ranges, tz, batch):
+    if batch:
+        return RangeBatch(starts, ends, tz=tz) if ranges else DateBatch(starts, tz=tz)
+    if ranges:
+        return [None if start is None else
+                make_range(make_date(from_micros(start, tz)), make_date(from_micros(end, tz)))
+                for start, end in zip(starts, ends)]
+    return [None if start is None else make_date(from_micros(start, tz))
+            for start in starts]
+
+
+def unpack_timestamps(buffer, tz=None, batch=False):
+    """Decode length prefixed binary timestamps, as made by `pack_fields`.
+
+    :param buffer: bytes or a memoryview
+    :return: a list of Dates (None for NULL), or a DateBatch when `batch`
+    """
+    return _unpack_fields(buffer, False, get_zone(tz), batch)
+
+
+def unpack_ranges(buffer, tz=None, batch=False):
+    """Decode length prefixed binary ranges, as made by `pack_fields`.
+
+    :return: a list of Ranges (None for NULL), or a RangeBatch when `batch`
+    """
+    return _unpack_fields(buffer, True, get_zone(tz), batch)
+
+
+def write_copy_binary(fp, *columns):
+    """Write the columns to the binary file `fp` in binary COPY format.
+
+    :return: the number of rows written
+    """
+    fp.write(COPY_SIGNATURE + _INT32.pack(0) + _INT32.pack(0))
+    count = _INT16.pack(len(columns))
+    rows = 0
+    chunk = []
+    for row in zip(*map(_binary_fields, columns)):
+        chunk.append(count)
+        chunk.extend(row)
+        rows += 1
+        if rows % CHUNK_ROWS == 0:
+            fp.write(b''.join(chunk))
+            chunk = []
+    chunk.append(_INT16.pack(-1))
+    fp.write(b''.join(chunk))
+    return rows
+
+
+def read_copy_binary(buffer, *kinds, tz='UTC', batch=False):
+    """Decode a binary COPY stream.
+
+    :param kinds: the type of each column, one of KINDS
+    :param tz: zone to show timestamptz and tstzrange values in, UTC by default
+    :param batch: return DateBatch / RangeBatch columns
+    :return: a list with one column per kind
+    """
+    tz = get_zone(tz)
+    for kind in kinds:
+        if kind not in KINDS:
+            raise TimestringInvalid('Unknown column type: %s' % kind)
+    data = memoryview(buffer)
+    if bytes(data[:11]) != COPY_SIGNATURE:
+        raise TimestringInvalid('Not a binary COPY stream')
+    offset = 19 + _INT32.unpack_from(data, 15)[0]
+    columns = [([], []) for _ in kinds]
+    while True:
+        count = _INT16.unpack_from(data, offset)[0]
+        offset += 2
+        if count == -1:
+            break
+        if count != len(kinds):
+            raise TimestringInvalid('Expected %d columns, got %d' % (len(kinds), count))
+        for kind, (starts, ends) in zip(kinds, columns):
+            length = _INT32.unpack_from(data, offset)[0]
+            offset += 4
+            if length < 0:
+                if batch:
+                    raise TimestringInvalid('NULL value in a batch')
+                starts.append(None)
+                ends.append(None)
+                continue
+            if kind.endswith('range'):
+                start, end, _ = _unpack_range_micros(data, offset)
+                ends.append(end)
+            else:
+                start = _from_pg(_INT64.unpack_from(data, offset)[0])
+            starts.append(start)
+            offset += length
+    return [_column_result(starts, ends, kind.endswith('range'),
+                           tz if kind in ('timestamptz', 'tstzrange') else None,
+                           batch)
+            for kind, (starts, ends) in zip(kinds, columns)]
+
+
+def adapt_date(date):
+    """:return: the psycopg2 adapter of a Date, a timestamp(tz) literal"""
+    from psycopg2.extensions import AsIs
+    if date.tz:
+        return AsIs("'%s'::timestamptz" % str(date.date))
+    else:
+        return AsIs("'%s'::timestamp" % str(date.date))
+
+
+def adapt_range(_range):
+    """:return: the psycopg2 adapter of a Range, a ts(tz)range literal"""
+    from psycopg2.extensions import AsIs
+    if _range.start.tz:
+        return AsIs("tstzrange('%s', '%s')" % (str(_range.start.date), str(_range.end.date)))
+    else:
+        return AsIs("tsrange('%s', '%s')" % (str(_range.start.date), str(_range.end.date)))
+
+
+def conform(value, protocol):
+    """Adapt a Date or Range for psycopg2's ISQLQuote `protocol`.
+
+    Date and Range.__conform__ delegate here, so psycopg2 adapts them
+    without timestring importing psycopg2 until a query needs it.
+    """
+    try:
+        from psycopg2.extensions import ISQLQuote
+    except ImportError:
+        return None
+    if protocol is ISQLQuote:
+        return adapt_range(value) if isinstance(value, Range) else adapt_date(value)
+
+
+def register_adapters():
+    """Register the Date and Range adapters with psycopg2 explicitly."""
+    from psycopg2.extensions import register_adapter
+    register_adapter(Date, adapt_date)
+    register_adapter(Range, adapt_range)
@@ -0,0 +1,309 @@
+"""Resolved Dates and Ranges cached until their phrase resolves differently.
+
+`Range("today")` is the same Range until midnight and `Range("this hour")`
+until the top of the hour, so parsing them again on every call is wasted.
+The results here are kept with the instant they stop being valid:
+
+    >>> entry = timestring.results.lookup('today', tz='US/Eastern')
+    >>> entry.value
+    <timestring.Range From 06/16/17 00:00:00 to 06/17/17 00:00:00 ...>
+    >>> entry.valid_until
+    datetime.datetime(2017, 6, 17, 0, 0, tzinfo=<DstTzInfo 'US/Eastern' EDT-1 day, 20:00:00 DST>)
+
+and are served without parsing until the clock reaches `valid_until`.
+
+The validity of a phrase is found by resolving it again just before the
+next second, minute, hour, day, week, month and year boundary after `now`:
+the result stays valid up to the first boundary it changes at, and for ever
+(`valid_until` is None) when it is the same a century later too. Phrases
+that change within the second, like "now" or "last 5 minutes", are resolved
+on every call: only that they do is stored, so they are not probed again.
+
+Entries are keyed on the kind, phrase, tz, week_start and context. The
+cached Dates and Ranges are shared by every caller, as Dates are values.
+
+`evaluate` resolves one phrase at many reference instants or in many zones
+into a DateBatch or RangeBatch, resolving it once per stretch of instants
+it does not change in.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+
+from timestring import TimestringInvalid
+from .Date import Date
+from .Range import Range
+from .batch import DateBatch, RangeBatch, INFINITY, NEG_INFINITY, \
+    floor, from_micros, get_zone, shift, to_micros
+
+MAX_ENTRIES = 4096
+UNITS = ('second', 'minute', 'hour', 'day', 'week', 'month', 'year')
+FOREVER = 100  # years after which a result unchanged is taken as absolute
+
+Entry = namedtuple('Entry', 'value valid_until')
+
+
+def _resolve(kind, phrase, zone, week_start, context, now):
+    if kind is Date:
+        return Date(phrase, tz=zone, context=context, now=now)
+    return Range(phrase, tz=zone, week_start=week_start, context=context, now=now)
+
+
+def _bound(value):
+    return value.date if isinstance(value, Date) else value
+
+
+def _key(value):
+    """:return: what two resolutions are compared on"""
+    if isinstance(value, Range):
+        return _bound(value.start), _bound(value.end)
+    return value.date
+
+
+def _instant(wall, zone):
+    """:return: the datetime of wall clock microseconds in `zone`"""
+    if zone is None:
+        return from_micros(wall)
+    from .zones import localize
+    return from_micros(localize([wall], zone, 'earliest', 'shift_forward')[0], zone)
+
+
+def _boundary(wall, unit, week_start):
+    """:return: the wall clock microseconds of the next `unit` boundary"""
+    return shift([floor(wall, unit, week_start=week_start)], 1, unit)[0]
+
+
+def valid_for(kind, phrase, tz=None, week_start=1, context=None, now=None, value=None):
+    """Resolve `phrase` and find until when it resolves the same.
+
+    :param kind: Date or Range
+    :param value: the resolution at `now` when already known
+    :return: an Entry (value, valid_until). valid_until is None for a phrase
+     that does not depend on the time, and `now` for one that changes
+     within the second.
+    """
+    zone = get_zone(tz)
+    if now is None:
+        now = datetime.now(zone)
+    elif zone is not None and now.tzinfo is not None:
+        now = now.astimezone(zone)  # probed on the clock of the zone
+    if value is None:
+        value = _resolve(kind, phrase, zone, week_start, context, now)
+    key = _key(value)
+    wall = to_micros(now.replace(tzinfo=None))
+
+    def same(probe):
+        try:
+            return _key(_resolve(kind, phrase, zone, week_start, context, probe)) == key
+        except (TimestringInvalid, ValueError, OverflowError):
+            return False
+
+    valid_until = now
+    for unit in UNITS:
+        try:
+            boundary = _instant(_boundary(wall, unit, week_start), zone)
+        except (TimestringInvalid, ValueError, OverflowError):
+            break
+        if not same(boundary - timedelta(microseconds=1)):
+            return Entry(value, valid_until)
+        valid_until = boundary
+    if now.year + FOREVER <= 9999 and same(now.replace(year=now.year + FOREVER, month=1, day=1)):
+        return Entry(value, None)
+    return Entry(value, valid_until)
+
+
+class ResultCache(object):
+    """Resolved phrases and their valid_until, the `max_entries` last used."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<timestring.ResultCache %d entries>" % len(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, phrase, kind=Range, tz=None, week_start=1, context=None, now=None):
+        """:return: the Entry (value, valid_until) of `phrase` at `now`, the
+         current time by default, resolving it only when no valid entry is
+         cached
+        """
+        zone = get_zone(tz)
+        if now is None:
+            now = datetime.now(zone)
+        key = (kind, phrase, str(zone) if zone is not None else None, week_start, context)
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None:
+                self._entries.move_to_end(key)
+                since, entry = found
+                if entry is not None and since <= now \
+                        and (entry.valid_until is None or now < entry.valid_until):
+                    self.hits += 1
+                    return entry
+        if found is not None and found[1] is None:
+            # known to change within the second, skip the probes
+            entry = Entry(_resolve(kind, phrase, zone, week_start, context, now), now)
+        else:
+            entry = valid_for(kind, phrase, zone, week_start, context, now)
+        with self._lock:
+            self.misses += 1
+            expired = entry.valid_until is not None and entry.valid_until <= now
+            self._entries[key] = (now, None if expired else entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, phrase, kind=Range, tz=None, week_start=1, context=None, now=None):
+        """:return: the Date or Range of `phrase` at `now`, see `lookup`"""
+        return self.lookup(phrase, kind, tz, week_start, context, now).value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+results = ResultCache()
+
+
+def lookup(phrase, kind=Range, tz=None, week_start=1, context=None, now=None):
+    """:return: the Entry (value, valid_until) of `phrase` in the shared cache"""
+    return results.lookup(phrase, kind, tz, week_start, context, now)
+
+
+def get(phrase, kind=Range, tz=None, week_start=1, context=None, now=None):
+    """:return: the Date or Range of `phrase` from the shared cache"""
+    return results.get(phrase, kind, tz, week_start, context, now)
+
+
+def valid_until(phrase, kind=Range, tz=None, week_start=1, context=None, now=None):
+    """:return: when the cached resolution of `phrase` stops being valid,
+     None when it never does
+    """
+    return results.lookup(phrase, kind, tz, week_start, context, now).valid_until
+
+
+def _sweep(nows, resolve, skip):
+    """Resolve sorted `nows`. With `skip`, runs of equal results are found
+    by galloping and bisecting, and the nows between two that resolve the
+    same take that result without being resolved.
+
+    :return: the results, in the order of `nows`
+    """
+    count = len(nows)
+    results = [None] * count
+
+    def at(index):
+        if results[index] is None:
+            results[index] = resolve(nows[index])
+        return results[index]
+
+    index, run = 0, 1
+    while index < count:
+        value = at(index)
+        last = index
+        if skip:
+            # runs tend to be as long as the one before: check its end first
+            key, step, differs = _key(value), max(run - 1, 1), count
+            while last + 1 < count:
+                ahead = min(last + step, count - 1)
+                if _key(at(ahead)) != key:
+                    differs = ahead
+                    break
+                step = 1 if last == index and step > 1 else step * 2
+                last = ahead
+            while differs - last > 1:
+                middle = (last + differs) // 2
+                if _key(at(middle)) == key:
+                    last = middle
+                else:
+                    differs = middle
+            for between in range(index + 1, last):
+                if results[between] is None:
+                    results[between] = value
+        run = last + 1 - index
+        index = last + 1
+    return results
+
+
+def _micros(bound, start=False):
+    micros = to_micros(bound)
+    return NEG_INFINITY if start and micros == INFINITY else micros
+
+
+def evaluate(phrase, nows=None, tz=None, kind=Range, week_start: int = 1,
+             context=None, skip=True):
+    """Resolve `phrase` at every row of `nows` and `tz`, like
+    ``Range(phrase, tz=tz[i], now=nows[i])`` (or Date) for each row with
+    nows[i] in the zone tz[i].
+
+    >>> evaluate('last week', nows=[datetime(2017, 1, 1) + timedelta(days=n) for n in range(365)])
+    <timestring.RangeBatch 365 ranges None>
+    >>> evaluate('today', tz=['US/Eastern', 'Asia/Tokyo', 'Europe/Paris'])
+    <timestring.RangeBatch 3 ranges UTC>
+
+    :param nows: reference instants (datetimes or Dates), or None for the
+     current instant in every zone. Aware ones are read in the row's zone,
+     naive ones are wall clock times in it (the earliest of a repeated
+     time, shifted forward out of a skipped one).
+    :param tz: a zone, or one zone per row; a list of zones and a list of
+     nows are paired row by row
+    :param skip: resolve a phrase once per stretch of sorted nows it
+     resolves the same in (found by bisecting, so it must not change and
+     change back between two nows); False resolves every distinct
+     (now, zone) row
+    :return: a DateBatch or RangeBatch, of wall clock times when the
+     results are naive and of UTC instants otherwise (in the zone, when
+     only one)
+    """
+    zones = [get_zone(zone) for zone in tz] if isinstance(tz, (list, tuple)) else None
+    if nows is None:
+        instant = datetime.now(get_zone('UTC'))
+        if zones is None:
+            zone = get_zone(tz)
+            nows = [instant.astimezone(zone) if zone is not None else datetime.now()]
+        else:
+            nows = [instant.astimezone(zone) if zone is not None else datetime.now() for zone in zones]
+    else:
+        nows = [_bound(now) for now in nows]
+    if zones is None:
+        zones = [get_zone(tz)] * len(nows)
+    elif len(zones) != len(nows):
+        if len(nows) != 1:
+            raise ValueError('nows and tz must be the same length')
+        nows = nows * len(zones)
+
+    # an instant is read on the clock of its row's zone, a naive now is a
+    # wall clock time of it
+    nows = [now if zone is None else now.astimezone(zone) if now.tzinfo is not None
+            else _instant(to_micros(now), zone) for now, zone in zip(nows, zones)]
+    rows = {}
+    for now, zone in zip(nows, zones):
+        rows.setdefault(zone, set()).add(now)
+    resolved = {}
+    for zone, distinct in rows.items():
+        distinct = sorted(distinct)
+        results = _sweep(distinct, lambda now: _resolve(kind, phrase, zone, week_start, context, now), skip)
+        resolved.update(((now, zone), result) for now, result in zip(distinct, results))
+
+    values = [resolved[row] for row in zip(nows, zones)]
+    bounds = [_bound(bound) for value in values
+              for bound in ((value.start, value.end) if kind is Range else (value,))]
+    aware = set(bound.tzinfo is not None for bound in bounds if bound != 'infinity')
+    if len(aware) > 1:
+        raise TimestringInvalid('Cannot mix naive and zone aware results in one batch')
+    column_zone = None
+    if aware == set([True]):
+        named = set(zones)
+        column_zone = named.pop() if len(named) == 1 and None not in named else get_zone('UTC')
+    if kind is Range:
+        return RangeBatch([_micros(value.start, True) for value in values],
+                          [_micros(value.end) for value in values], tz=column_zone)
+    return DateBatch([_micros(value) for value in values], tz=column_zone)
@@ -0,0 +1,158 @@
+"""ISO 8601 and JSON encoders for many Dates and Ranges at once.
+
+    >>> dumps([Range('today'), Range('this week')])
+    '["2017-06-16T00:00:00/2017-06-17T00:00:00","2017-06-12T00:00:00/2017-06-19T00:00:00"]'
+    >>> dumps(ranges, format='dict')
+    '[{"start":"2017-06-16T00:00:00","end":"2017-06-17T00:00:00","tz":null}, ...]'
+    >>> loads_ranges(text)
+    [<timestring.Range From 06/16/17 00:00:00 to 06/17/17 00:00:00 4483019280>, ...]
+
+Values are written with ``datetime.isoformat`` (no strftime, no locale);
+DateBatches and RangeBatches are converted to their zone with one transition
+table lookup per value. ISO text needs no JSON escaping, so arrays are
+joined directly instead of going through ``json.dumps``.
+"""
+import json
+from datetime import timedelta
+
+from timestring import TimestringInvalid
+from .Date import Date
+from .Range import Range
+from .batch import DateBatch, RangeBatch, EPOCH, INFINITY, NEG_INFINITY
+
+FORMATS = ('iso', 'dict')
+
+
+def _offset(micros):
+    """:return: the ISO 8601 suffix of a UTC offset in microseconds"""
+    sign = '-' if micros < 0 else '+'
+    minutes, seconds = divmod(abs(micros) // 1000000, 60)
+    text = '%s%02d:%02d' % (sign, minutes // 60, minutes % 60)
+    return text + (':%02d' % seconds if seconds else '')
+
+
+def iso_strings(micros, tz=None, lower='infinity'):
+    """Yield the ISO 8601 text of columnar microseconds.
+
+    :param tz: the zone of UTC instants, None for wall clock values
+    :param lower: the text of NEG_INFINITY
+    """
+    if tz is None:
+        for value in micros:
+            if value == INFINITY:
+                yield 'infinity'
+            elif value == NEG_INFINITY:
+                yield lower
+            else:
+                yield (EPOCH + timedelta(microseconds=value)).isoformat()
+        return
+    from .zones import convert
+    offsets = {}
+    for value, wall in zip(micros, convert(micros, tz)):
+        if value == INFINITY:
+            yield 'infinity'
+        elif value == NEG_INFINITY:
+            yield lower
+        else:
+            offset = wall - value
+            suffix = offsets.get(offset)
+            if suffix is None:
+                suffix = offsets[offset] = _offset(offset)
+            yield (EPOCH + timedelta(microseconds=wall)).isoformat() + suffix
+
+
+_zone_names = {}
+
+
+def _zone_name(tz):
+    """:return: the JSON of the pytz zone name of `tz`, memoized"""
+    name = getattr(tz, 'zone', None)
+    text = _zone_names.get(name)
+    if text is None:
+        text = _zone_names[name] = 'null' if name is None else json.dumps(name)
+    return text
+
+
+def _tzinfo(start, end):
+    """:return: the tzinfo of the first finite bound, like Range.tz"""
+    for value in (start, end):
+        if value != 'infinity':
+            return value.tzinfo
+
+
+def _range_items(column, format):
+    if isinstance(column, RangeBatch):
+        starts = iso_strings(column.starts, column.tz, lower='-infinity')
+        ends = iso_strings(column.ends, column.tz)
+        if format == 'iso':
+            for start, end in zip(starts, ends):
+                yield '"%s/%s"' % ('..' if start[0] == '-' else start, '..' if end[0] == 'i' else end)
+        else:
+            tz = _zone_name(column.tz)
+            for start, end in zip(starts, ends):
+                yield '{"start":"%s","end":"%s","tz":%s}' % (start, end, tz)
+    elif format == 'iso':
+        for _range in column:
+            yield '"%s"' % _range.to_iso()
+    else:
+        for _range in column:
+            start, end = _range.start.date, _range.end.date
+            yield '{"start":"%s","end":"%s","tz":%s}' % (
+                '-infinity' if start == 'infinity' else start.isoformat(),
+                'infinity' if end == 'infinity' else end.isoformat(),
+                _zone_name(_tzinfo(start, end)))
+
+
+def _date_items(column, format):
+    if isinstance(column, DateBatch):
+        texts = iso_strings(column.micros, column.tz)
+        tz = _zone_name(column.tz)
+    else:
+        column = list(column)
+        texts = (date.to_iso() for date in column)
+        tz = None
+    if format == 'iso':
+        for text in texts:
+            yield '"%s"' % text
+    elif tz is not None:
+        for text in texts:
+            yield '{"date":"%s","tz":%s}' % (text, tz)
+    else:
+        for date, text in zip(column, texts):
+            yield '{"date":"%s","tz":%s}' % (text, _zone_name(date.tz))
+
+
+def dumps(column, format='iso'):
+    """:return: a JSON array of the Dates or Ranges in `column`
+
+    :param column: a list of Dates or of Ranges, a DateBatch or a RangeBatch
+    :param format: 'iso' for ISO 8601 strings ("start/end" intervals with
+     '..' for infinite bounds), 'dict' for `to_dict` objects
+    """
+    if format not in FORMATS:
+        raise ValueError('format must be one of %s' % ', '.join(FORMATS))
+    if not isinstance(column, (DateBatch, RangeBatch)):
+        column = list(column)
+    if isinstance(column, RangeBatch) or (column and isinstance(column[0], Range)):
+        items = _range_items(column, format)
+    else:
+        items = _date_items(column, format)
+    return '[%s]' % ','.join(items)
+
+
+def _load(text, cls):
+    values = json.loads(text) if isinstance(text, (str, bytes)) else text
+    if not isinstance(values, list):
+        raise TimestringInvalid('Not a JSON array')
+    return [cls.from_dict(value) if isinstance(value, dict) else cls.from_iso(value)
+            for value in values]
+
+
+def loads_dates(text):
+    """:return: the Dates of a `dumps` JSON array (either format)"""
+    return _load(text, Date)
+
+
+def loads_ranges(text):
+    """:return: the Ranges of a `dumps` JSON array (either format)"""
+    return _load(text, Range)
@@ -0,0 +1,164 @@
+"""A ``timestring`` accessor on pandas Series.
+
+    >>> import timestring.series
+    >>> df['window'].timestring.range()
+                    start                 end
+    0 2017-06-19 00:00:00 2017-06-26 00:00:00
+    1 2017-06-16 00:00:00 2017-06-17 00:00:00
+    >>> df['window'].timestring.range(interval=True)
+    IntervalIndex([[2017-06-19, 2017-06-26), [2017-06-16, 2017-06-17)], dtype='interval[datetime64[ns], left]')
+    >>> df[df['sent'].timestring.in_range('last week')]
+
+Each distinct value is parsed once and the results broadcast back. Columns
+are ``datetime64[ns]``, or ``datetime64[ns, tz]`` when a zone is given (or
+any result is zone aware, then UTC). Infinite bounds become pd.Timestamp.min
+and pd.Timestamp.max; with ``errors='coerce'`` values that do not parse
+become NaT instead of raising TimestringInvalid.
+
+pandas is an optional dependency, only needed to import this module.
+"""
+import numpy as np
+import pandas as pd
+import pytz
+
+from timestring import TimestringInvalid
+from .Date import Date
+from .Range import Range
+from .batch import get_zone, to_micros
+
+NAT = np.iinfo(np.int64).min
+ERRORS = ('raise', 'coerce')
+
+
+def _zone(tz, values):
+    """:return: the zone of the resolved columns, None for wall clock values"""
+    if tz is not None:
+        return get_zone(tz)
+    for value in values:
+        if value is not None and value != 'infinity' and value.tzinfo is not None:
+            return pytz.utc
+    return None
+
+
+def _nanos(value, zone, upper):
+    """:return: nanoseconds since the epoch of a resolved datetime"""
+    if value is None:
+        return NAT
+    if value == 'infinity':
+        return (pd.Timestamp.max if upper else pd.Timestamp.min).value
+    if zone is None and value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    elif zone is not None and value.tzinfo is None:
+        value = zone.localize(value) if hasattr(zone, 'localize') else value.replace(tzinfo=zone)
+    nanos = to_micros(value) * 1000
+    if not pd.Timestamp.min.value <= nanos <= pd.Timestamp.max.value:
+        raise TimestringInvalid('Out of the datetime64[ns] range: %s' % value)
+    return nanos
+
+
+def _column(nanos, codes, zone):
+    """Broadcast the values of the uniques back to the rows of `codes`."""
+    values = np.append(np.array(nanos, dtype='int64'), NAT).take(codes)
+    index = pd.DatetimeIndex(values.view('M8[ns]'))
+    if zone is not None:
+        index = index.tz_localize('UTC').tz_convert(zone)
+    return index
+
+
+def _bound(value, upper, tz):
+    """:return: a Timestamp comparable with a column in zone `tz`"""
+    if value == 'infinity':
+        bound = pd.Timestamp.max if upper else pd.Timestamp.min
+        return bound if tz is None else bound.tz_localize('UTC')
+    bound = pd.Timestamp(value)
+    if tz is None:
+        return bound.tz_localize(None) if bound.tzinfo is not None else bound
+    return bound.tz_localize(tz) if bound.tzinfo is None else bound
+
+
+@pd.api.extensions.register_series_accessor('timestring')
+class TimestringAccessor(object):
+    def __init__(self, series):
+        self._series = series
+
+    def _resolve(self, parse, errors):
+        """:return: the factorize codes and `parse` of each unique value"""
+        if errors not in ERRORS:
+            raise ValueError('errors must be one of %s' % ', '.join(ERRORS))
+        codes, uniques = pd.factorize(self._series)
+        results = []
+        for value in uniques:
+            try:
+                results.append(parse(value))
+            except (TimestringInvalid, ValueError):
+                if errors == 'raise':
+                    raise
+                results.append(None)
+        return codes, results
+
+    def _nanos(self, values, zone, upper, errors):
+        nanos = []
+        for value in values:
+            try:
+                nanos.append(_nanos(value, zone, upper))
+            except TimestringInvalid:
+                if errors == 'raise':
+                    raise
+                nanos.append(NAT)
+        return nanos
+
+    def range(self, tz: str = None, now=None, week_start: int = 1, context=None,
+              errors='raise', interval=False, closed='left'):
+        """Resolve every value as a Range.
+
+        :param interval: return an IntervalIndex closed on `closed` instead
+         of a DataFrame of start and end columns
+        :return: a DataFrame with the index of the Series, or an IntervalIndex
+        """
+        def parse(value):
+            if isinstance(value, Range):
+                return value
+            return Range(value, tz=tz, now=now, week_start=week_start, context=context)
+
+        codes, ranges = self._resolve(parse, errors)
+        starts = [r.start.date if r is not None else None for r in ranges]
+        ends = [r.end.date if r is not None else None for r in ranges]
+        zone = _zone(tz, starts + ends)
+        start = _column(self._nanos(starts, zone, False, errors), codes, zone)
+        end = _column(self._nanos(ends, zone, True, errors), codes, zone)
+        if interval:
+            return pd.IntervalIndex.from_arrays(start, end, closed=closed, name=self._series.name)
+        return pd.DataFrame(dict(start=start, end=end), index=self._series.index)
+
+    def date(self, tz: str = None, now=None, context=None, errors='raise'):
+        """Resolve every value as a Date.
+
+        :return: a datetime64 Series with the index of the Series
+        """
+        def parse(value):
+            return (value if isinstance(value, Date) else Date(value, tz=tz, now=now, context=context)).date
+
+        codes, dates = self._resolve(parse, errors)
+        zone = _zone(tz, dates)
+        return pd.Series(_column(self._nanos(dates, zone, True, errors), codes, zone),
+                         index=self._series.index, name=self._series.name)
+
+    def in_range(self, other, tz: str = None, now=None, inclusive='both', errors='raise'):
+        """:return: a boolean Series, True where the value is within `other`
+
+        :param other: a Range or a phrase. Naive bounds are compared as wall
+         clock times in the zone of the values, as ``Date in Range`` does.
+        :param inclusive: "both" (like ``Date in Range``), "left", "right"
+         or "neither"
+
+        >>> df[df['sent'].timestring.in_range('last week')]
+        """
+        dates = self._series
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = self.date(tz=tz, now=now, errors=errors)
+        if not isinstance(other, Range):
+            other = Range(other, tz=tz, now=now)
+        zone = dates.dt.tz
+        return dates.between(_bound(other.start.date, False, zone),
+                             _bound(other.end.date, True, zone),
+                             inclusive=inclusive)
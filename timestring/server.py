@@ -0,0 +1,217 @@
+"""A resident timestring server speaking line delimited JSON.
+
+Keeps the grammar compiled and the parse cache warm between calls, so shell
+scripts and other languages avoid the interpreter start up on every lookup.
+
+    $ timestring serve --socket /tmp/timestring.sock &
+    $ timestring --socket /tmp/timestring.sock next week
+    {"start": "2017-06-19T00:00:00", "end": "2017-06-26T00:00:00"}
+
+Each request is one JSON object per line and gets one JSON line back:
+
+    {"id": 1, "phrases": ["today", "next week"], "tz": "US/Eastern"}
+    {"id": 1, "results": [{"start": ..., "end": ...}, ...], "elapsed_ms": 0.42}
+
+Optional request keys are ``date`` (resolve Dates instead of Ranges), ``tz``,
+``now`` (the reference time) and ``timestamps`` ("iso" or "epoch").
+``{"op": "stats"}`` returns latency percentiles and cache counters.
+"""
+import errno
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections import deque
+from time import perf_counter, time
+
+from .Date import Date
+from .cli import resolve
+from .utils import search
+
+LATENCY_WINDOW = 10000
+
+
+class Stats(object):
+    """Request counters and a window of recent latencies."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time()
+        self.requests = 0
+        self.phrases = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, phrases, errors):
+        with self._lock:
+            self.requests += 1
+            self.phrases += phrases
+            self.errors += errors
+            self.latencies.append(seconds)
+
+    def report(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            report = dict(requests=self.requests,
+                          phrases=self.phrases,
+                          errors=self.errors,
+                          uptime_s=round(time() - self.started, 3))
+        if latencies:
+            def percentile(q):
+                return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+            report.update(mean_ms=round(sum(latencies) / len(latencies) * 1000, 3),
+                          p50_ms=percentile(.5),
+                          p95_ms=percentile(.95),
+                          p99_ms=percentile(.99),
+                          max_ms=round(latencies[-1] * 1000, 3))
+        report['cache'] = search.cache_info()._asdict()
+        return report
+
+
+def respond(request, stats):
+    """:return: the response to one decoded request"""
+    if request.get('op') == 'stats':
+        return dict(id=request.get('id'), stats=stats.report())
+    if request.get('op') == 'ping':
+        return dict(id=request.get('id'), pong=True)
+
+    started = perf_counter()
+    phrases = request.get('phrases')
+    if phrases is None:
+        phrases = [request.get('phrase')]
+    if not isinstance(phrases, list) or not all(isinstance(phrase, str) for phrase in phrases):
+        return dict(id=request.get('id'), error='Invalid phrases: expected a list of strings')
+    date = bool(request.get('date'))
+    tz = request.get('tz')
+    epoch = request.get('timestamps') == 'epoch'
+    errors = 0
+    try:
+        now = Date(request.get('now') or 'now', tz=tz).date
+    except Exception as e:
+        return dict(id=request.get('id'), error='Invalid now: %s' % e)
+
+    results = []
+    for phrase in phrases:
+        try:
+            values = resolve(phrase, date=date, tz=tz, now=now, epoch=epoch)
+            results.append(dict(date=values[0]) if date else dict(start=values[0], end=values[1]))
+        except Exception as e:
+            errors += 1
+            results.append(dict(error=str(e) or e.__class__.__name__))
+    elapsed = perf_counter() - started
+    stats.record(elapsed, len(phrases), errors)
+    return dict(id=request.get('id'), results=results, elapsed_ms=round(elapsed * 1000, 3))
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise ValueError('expected a JSON object')
+            except ValueError as e:
+                response = dict(error='Invalid request: %s' % e)
+            else:
+                response = respond(request, self.server.stats)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def server_close(self):
+            socketserver.UnixStreamServer.server_close(self)
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+
+
+def _listening(socket_path):
+    """:return: whether something accepts connections on `socket_path`"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def make_server(socket_path=None, host='127.0.0.1', port=0):
+    """Bind a server on a Unix socket at `socket_path`, or on host:port.
+
+    Use ``server.serve_forever()`` to run it, ``server.server_address`` for
+    the address actually bound.
+    """
+    if socket_path:
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            if _listening(socket_path):
+                raise OSError(errno.EADDRINUSE, 'A server is listening on %s' % socket_path)
+            os.unlink(socket_path)  # left behind by a previous server
+        server = UnixServer(socket_path, Handler)
+    else:
+        server = TCPServer((host, port), Handler)
+    server.stats = Stats()
+    return server
+
+
+def serve(socket_path=None, host='127.0.0.1', port=0):
+    """Run a server until interrupted or terminated."""
+    server = make_server(socket_path, host, port)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class Client(object):
+    """A connection to a running server.
+
+    >>> with Client('/tmp/timestring.sock') as client:
+    ...     client.request(phrases=['today', 'tomorrow'])
+    """
+
+    def __init__(self, socket_path=None, host='127.0.0.1', port=None, timeout=None):
+        if socket_path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout)
+        self._file = self._socket.makefile('rwb')
+
+    def request(self, **payload):
+        """Send one request and return the decoded response."""
+        self._file.write(json.dumps(payload).encode('utf-8') + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('timestring server closed the connection')
+        return json.loads(line.decode('utf-8'))
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
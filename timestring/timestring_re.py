@@ -3,7 +3,10 @@ import re
 MONTH_NAMES = r'''\b(january|february|march|april|june|july|august|september|october|november|december''' \
               r'''|jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)\b'''
 
-TIMESTRING_RE = re.compile(re.sub('[\t\n\s]', '', re.sub('(\(\?\#[^\)]+\))', '', r'''
+# The readable grammar. The compiled pattern is stripped of the (?# comments)
+# and whitespace; ``python timestring/timestring_re.py`` writes it to
+# _pattern.py so importing timestring does not redo the stripping.
+GRAMMAR = r'''
     (
         ((?P<prefix>between|from|before|after|\>=?|\<=?|greater\s+th(a|e)n(\s+a)?|less\s+th(a|e)n(\s+a)?)\s+)?
         (
@@ -89,4 +92,42 @@ TIMESTRING_RE = re.compile(re.sub('[\t\n\s]', '', re.sub('(\(\?\#[^\)]+\))', '',
             )+
         )
     )
-    ''')), re.I)
+    '''
+
+
+def strip(grammar):
+    """:return: `grammar` without its (?# comments) and whitespace"""
+    return re.sub(r'[\t\n\s]', '', re.sub(r'(\(\?\#[^\)]+\))', '', grammar))
+
+
+def write_pattern(path):
+    """Write the stripped grammar as the prebuilt _pattern module at `path`."""
+    with open(path, 'w') as fp:
+        fp.write('# Generated by `python timestring/timestring_re.py`, do not edit.\n')
+        fp.write('GRAMMAR = %r\n' % GRAMMAR)
+        fp.write('PATTERN = %r\n' % strip(GRAMMAR))
+
+
+try:
+    from ._pattern import GRAMMAR as _BUILT, PATTERN
+except ImportError:
+    _BUILT = PATTERN = None
+if _BUILT != GRAMMAR:  # no prebuilt pattern, or the grammar changed since
+    PATTERN = strip(GRAMMAR)
+
+TIMESTRING_RE = re.compile(PATTERN, re.I)
+
+# Every match of TIMESTRING_RE holds one of these keywords: a digit, a month,
+# weekday, relative day, daytime or duration unit (or its single letter).
+KEYWORDS = (r'\d|[yqdhms](?!\w)(?<![a-z].)|a(pr|ug)|d(ay|ec)|evening|f(eb|ri)|hour'
+            r'|j(an|u[nl])|m(a[ry]|on|inute|orning)|n(ov|ow|oon|ight)|oct|quarter'
+            r'|s(ep|at|un|econd)|t(ue|hu|omorrow|ime)|w(ed|eek)|year')
+KEYWORDS_RE = re.compile(KEYWORDS, re.I)
+LOWER_KEYWORDS_RE = re.compile(KEYWORDS)  # faster, for lowercase ASCII text
+# and none of these characters, so no match spans them.
+BREAKS_RE = re.compile(r'[!?;()\[\]{}"]|\.(?!\d)')
+
+
+if __name__ == '__main__':
+    import os
+    write_pattern(os.path.join(os.path.dirname(os.path.abspath(__file__)), '_pattern.py'))
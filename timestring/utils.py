@@ -1,23 +1,217 @@
-from word2number import w2n
+import re
+from functools import lru_cache
 
 from timestring import TimestringInvalid
+from .timestring_re import TIMESTRING_RE
 
+MATCH_CACHE_SIZE = 4096
+NUM_CACHE_SIZE = 4096
 
-def get_num(num):
-    """
-    :param num: int, float or string repersenting a number, such as '1.5' or
-    'one'
-    """
-    if isinstance(num, (int, float)):
-        return num
+# word2number's american number system, without "point"
+NUMBER_WORDS = dict(
+    zero=0, one=1, two=2, three=3, four=4, five=5, six=6, seven=7, eight=8, nine=9,
+    ten=10, eleven=11, twelve=12, thirteen=13, fourteen=14, fifteen=15, sixteen=16,
+    seventeen=17, eighteen=18, nineteen=19, twenty=20, thirty=30, forty=40, fifty=50,
+    sixty=60, seventy=70, eighty=80, ninety=90, hundred=100,
+    thousand=1000, million=1000000, billion=1000000000,
+)
+DECIMAL = re.compile(r'\s*\d+(\.\d+)?\s*$')
 
-    if 'couple' in (num or ''):
-        return 2
 
+def _combine(values):
+    """word2number's rule for up to four words below a thousand"""
+    if len(values) == 4:
+        return values[0] * values[1] + values[2] + values[3]
+    elif len(values) == 3:
+        return values[0] * values[1] + values[2]
+    elif len(values) == 2:
+        if 100 in values:
+            return values[0] * values[1]
+        return values[0] + values[1]
+    return values[0]
+
+
+def _number_table():
+    """:return: the value of every number word and the usual compositions,
+     "twenty one", "five hundred", "twelve hundred"..."""
+    table = dict(NUMBER_WORDS, couple=2)
+    table['couple of'] = 2
+    for tens in ('twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety'):
+        for unit in ('one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine'):
+            table[tens + ' ' + unit] = NUMBER_WORDS[tens] + NUMBER_WORDS[unit]
+    for word, value in NUMBER_WORDS.items():
+        if 0 < value < 20:
+            table[word + ' hundred'] = value * 100
+    return table
+
+
+_numbers = _number_table()
+
+
+def _parse_num(num):
+    if 'couple' in num:
+        return 2
+    if DECIMAL.match(num):
+        return float(num)
+    words = num.replace('-', ' ').lower().split()
+    values = [NUMBER_WORDS.get(word) for word in words]
+    if words and None not in values and max(values) <= 100:
+        # what word2number computes for words below a thousand
+        return _combine(values)
     try:
         return float(num)
     except ValueError:
+        from word2number import w2n
         try:
-            return w2n.word_to_num(num or 'one')
+            return w2n.word_to_num(num)
         except ValueError:
             raise TimestringInvalid('Unknown number: %s' % num)
+
+
+def get_num(num):
+    """
+    :param num: int, float or string repersenting a number, such as '1.5' or
+    'one'. An empty string (or None) is one.
+    """
+    if isinstance(num, (int, float)):
+        return num
+    if not num:
+        return 1
+
+    value = _numbers.get(num)
+    if value is None:
+        value = _parse_num(num)
+        if len(_numbers) < NUM_CACHE_SIZE:
+            _numbers[num] = value
+    return value
+
+
+# the PhraseCache consulted on misses, see timestring.cache
+persistent = None
+
+
+@lru_cache(maxsize=MATCH_CACHE_SIZE)
+def search(string):
+    """:return: the groupdict of the first TIMESTRING_RE match in `string`,
+     or None. Results are cached and shared, so do not modify them.
+    """
+    if persistent is None:
+        res = TIMESTRING_RE.search(string)
+        return res.groupdict() if res else None
+    # one entry for "Next Week", " next week" and "next week"
+    phrase = string.strip().lower()
+    hit, match = persistent.get(phrase)
+    if hit:
+        return match
+    res = TIMESTRING_RE.search(phrase)
+    match = res.groupdict() if res else None
+    persistent.put(phrase, match)
+    return match
+
+
+def groups(match):
+    """:return: a new dict of the groups of a `search` result that matched"""
+    return dict((k, v) for k, v in match.items() if v)
+
+
+GROUPS = tuple(TIMESTRING_RE.groupindex)
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+DIRECTIONS = dict(next='next', last='prev', this='this')
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def fields(year: int = None, month: int = None, day: int = None,
+           hour: int = None, minute: int = None, second: int = None,
+           weekday=None, relative_day: str = None, daytime: str = None,
+           direction: str = None, num=None, unit: str = None, sign: int = None):
+    """:return: the TIMESTRING_RE groups a phrase of these fields matches,
+     which Date and Range accept in place of the phrase
+
+    :param month: 1..12 or a month name
+    :param weekday: 1 (Monday) .. 7 or a weekday name
+    :param relative_day: "today", "yesterday", "tomorrow", ...
+    :param daytime: "morning", "noon", "evening", ...
+    :param direction: "next", "last" or "this", as in "next monday",
+     "last 2 weeks" or "this month"
+    :param num: the number of `unit`s of a duration, 1 by default
+    :param unit: the unit of a duration, "week", "days", ...
+    :param sign: -1 for a duration ago, 1 for one from now
+    """
+    match = dict.fromkeys(GROUPS)
+    if direction is not None:
+        if direction not in DIRECTIONS:
+            raise ValueError('direction must be one of %s' % ', '.join(DIRECTIONS))
+        match['recurrence'] = direction
+        match[DIRECTIONS[direction]] = direction
+    if sign is not None and sign not in (-1, 1):
+        raise ValueError('sign must be one of -1, 1')
+
+    if weekday is not None:
+        if isinstance(weekday, int):
+            if not 1 <= weekday <= 7:
+                raise TimestringInvalid('Weekday not in range 1..7: %d' % weekday)
+            weekday = WEEKDAYS[weekday - 1]
+        match['weekday'] = weekday.lower()
+    if relative_day is not None:
+        match['relative_day'] = relative_day.lower()
+
+    if day is not None:
+        # "june 16 2017"
+        match.update(date_5=True, year=_text(year), month=_text(month), date=_text(day))
+    elif month is not None:
+        # "june 2017"
+        match.update(month_1=_text(month).lower(), year_5=_text(year), date_6=year is not None or None)
+    elif year is not None:
+        # "2017"
+        match.update(date_6=True, year_5=_text(year))
+
+    if daytime is not None:
+        match.update(time_2=True, daytime=daytime.lower())
+    elif hour is not None:
+        match.update(time_2=True, hour=_text(hour), minute=_text(minute), seconds=_text(second))
+
+    if unit is not None:
+        match.update(duration=True, num=num, delta=unit.lower())
+        if sign == -1:
+            match['ago'] = 'ago'
+        elif sign == 1:
+            match['in'] = 'in'
+    return match
+
+
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+EOM = ('clamp', 'preserve')
+
+
+def check_eom(eom):
+    if eom not in EOM:
+        raise ValueError('eom must be one of %s' % ', '.join(EOM))
+
+
+def days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return DAYS_IN_MONTH[month - 1]
+
+
+def add_months(value, months, eom='clamp'):
+    """Move a datetime by whole calendar months.
+
+    :param eom: days past the end of the target month are clamped to its
+     last day ('clamp', Jan 31 + 1 month is Feb 28), with 'preserve' the
+     last day of a month also stays the last day (Feb 28 + 1 month is Mar 31)
+    """
+    if not months:
+        return value
+    year, month = divmod(value.year * 12 + value.month - 1 + months, 12)
+    month += 1
+    if not 1 <= year <= 9999:
+        raise TimestringInvalid('Year out of range: %d' % year)
+    last = days_in_month(year, month)
+    day = value.day
+    if day > last or (eom == 'preserve' and day == days_in_month(value.year, value.month)):
+        day = last
+    return value.replace(year=year, month=month, day=day)
@@ -0,0 +1,247 @@
+"""Bulk time zone conversion with precomputed transition tables.
+
+A zone's UTC offset changes at a few hundred instants at most, so instead of
+``tz.fromutc`` / ``tz.localize`` per value, the zone's transitions are read
+once into two int64 columns and each value is looked up with a bisect, or
+with ``numpy.searchsorted`` when the values are a numpy array.
+
+Values are microseconds since the epoch, like in timestring.batch: UTC
+instants on one side, wall clock times on the other.
+
+    >>> convert([1497571200000000], 'US/Eastern')      # UTC -> wall clock
+    array('q', [1497556800000000])
+    >>> localize([1497556800000000], 'US/Eastern')     # wall clock -> UTC
+    array('q', [1497571200000000])
+
+Wall clock times are not always unique: when clocks go back an hour the
+times in that hour happen twice (ambiguous) and when they go forward an
+hour never happens (nonexistent). `localize` raises TimestringInvalid for
+both unless told which instant to use.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import timedelta
+from functools import lru_cache
+
+from timestring import TimestringInvalid
+from .Date import Date
+from .batch import EPOCH, INFINITY, NEG_INFINITY, get_zone, to_micros
+
+AMBIGUOUS = ('raise', 'earliest', 'latest')
+NONEXISTENT = ('raise', 'shift_forward', 'shift_backward')
+
+
+def _micros(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+class TransitionTable(object):
+    """The UTC offsets of a zone: ``offsets[i]`` applies from
+    ``transitions[i]`` (UTC microseconds) until the next transition.
+    """
+
+    def __init__(self, tz):
+        self.tz = tz
+        if hasattr(tz, '_utc_transition_times'):  # pytz DstTzInfo
+            self.transitions = array('q', [NEG_INFINITY])
+            self.transitions.extend(to_micros(when) for when in tz._utc_transition_times[1:])
+            self.offsets = array('q', (_micros(info[0]) for info in tz._transition_info))
+            self.tzinfos = [tz._tzinfos[info] for info in tz._transition_info]
+        elif tz.utcoffset(None) is not None:  # a fixed offset
+            self.transitions = array('q', [NEG_INFINITY])
+            self.offsets = array('q', [_micros(tz.utcoffset(None))])
+            self.tzinfos = [tz]
+        else:
+            raise TimestringInvalid('No transition table for %s, use a pytz zone' % tz)
+        self.min_offset = min(self.offsets)
+        self._numpy = None
+
+    def __repr__(self):
+        return "<timestring.TransitionTable %s %d transitions>" % (self.tz, len(self.transitions))
+
+    def index(self, micros):
+        """:return: the index of the offset in effect at the UTC instant"""
+        return bisect_right(self.transitions, micros) - 1
+
+    def numpy(self):
+        """:return: the table as numpy arrays (transitions, offsets)"""
+        if self._numpy is None:
+            import numpy as np
+            self._numpy = (np.frombuffer(self.transitions, dtype='int64'),
+                           np.frombuffer(self.offsets, dtype='int64'))
+        return self._numpy
+
+
+@lru_cache(maxsize=64)
+def _table(tz):
+    return TransitionTable(tz)
+
+
+def transitions(tz):
+    """:return: the (cached) TransitionTable of a zone name or tzinfo"""
+    return _table(get_zone(tz))
+
+
+def _is_numpy(values):
+    return type(values).__module__ == 'numpy'
+
+
+def _check(ambiguous, nonexistent):
+    if ambiguous not in AMBIGUOUS:
+        raise ValueError('ambiguous must be one of %s' % ', '.join(AMBIGUOUS))
+    if nonexistent not in NONEXISTENT:
+        raise ValueError('nonexistent must be one of %s' % ', '.join(NONEXISTENT))
+
+
+def convert(micros, tz):
+    """Convert UTC instants to wall clock times in `tz`.
+
+    :param micros: microseconds since the epoch, an iterable, array('q') or
+     numpy int64 array (returned as the same kind)
+    :return: wall clock microseconds, infinities are kept
+    """
+    table = transitions(tz)
+    if _is_numpy(micros):
+        import numpy as np
+        bounds, offsets = table.numpy()
+        micros = np.asarray(micros, dtype='int64')
+        infinite = (micros == INFINITY) | (micros == NEG_INFINITY)
+        local = micros + offsets[np.searchsorted(bounds, micros, side='right') - 1]
+        return np.where(infinite, micros, local)
+
+    bounds, offsets = table.transitions, table.offsets
+    result = array('q')
+    for value in micros:
+        if value == INFINITY or value == NEG_INFINITY:
+            result.append(value)
+        else:
+            result.append(value + offsets[bisect_right(bounds, value) - 1])
+    return result
+
+
+def _resolve(wall, table, ambiguous, nonexistent):
+    """:return: the UTC instant of a wall clock time"""
+    bounds, offsets = table.transitions, table.offsets
+    # Only the offsets in effect up to wall - min(offset) can apply, and zone
+    # transitions are far enough apart that three candidates cover them.
+    last = bisect_right(bounds, wall - table.min_offset) - 1
+    found = []
+    gap = None
+    for i in range(max(0, last - 2), last + 1):
+        utc = wall - offsets[i]
+        if bounds[i] <= utc and (i + 1 == len(bounds) or utc < bounds[i + 1]):
+            found.append(utc)
+        elif i and wall - offsets[i - 1] >= bounds[i] > utc:
+            gap = bounds[i]  # the clocks jumped over wall at this transition
+    if len(found) == 1:
+        return found[0]
+    if found:
+        if ambiguous == 'raise':
+            raise TimestringInvalid('Ambiguous time in %s: %s' % (table.tz, EPOCH + timedelta(microseconds=wall)))
+        return min(found) if ambiguous == 'earliest' else max(found)
+    if nonexistent == 'raise':
+        raise TimestringInvalid('Nonexistent time in %s: %s' % (table.tz, EPOCH + timedelta(microseconds=wall)))
+    return gap if nonexistent == 'shift_forward' else gap - 1
+
+
+def localize(micros, tz, ambiguous='raise', nonexistent='raise'):
+    """Convert wall clock times in `tz` to UTC instants.
+
+    :param micros: wall clock microseconds since the epoch, an iterable,
+     array('q') or numpy int64 array (returned as the same kind)
+    :param ambiguous: for times that happen twice, 'raise' TimestringInvalid,
+     take the 'earliest' or the 'latest' instant
+    :param nonexistent: for times skipped by the clocks, 'raise'
+     TimestringInvalid, 'shift_forward' to the first existing instant
+     after or 'shift_backward' to the last one before
+    :return: UTC microseconds, infinities are kept
+    """
+    _check(ambiguous, nonexistent)
+    table = transitions(tz)
+    if _is_numpy(micros):
+        return _localize_numpy(micros, table, ambiguous, nonexistent)
+    result = array('q')
+    for value in micros:
+        if value == INFINITY or value == NEG_INFINITY:
+            result.append(value)
+        else:
+            result.append(_resolve(value, table, ambiguous, nonexistent))
+    return result
+
+
+def _localize_numpy(micros, table, ambiguous, nonexistent):
+    import numpy as np
+    bounds, offsets = table.numpy()
+    wall = np.asarray(micros, dtype='int64')
+    infinite = (wall == INFINITY) | (wall == NEG_INFINITY)
+    last = np.searchsorted(bounds, wall - table.min_offset, side='right') - 1
+    ends = np.append(bounds[1:], INFINITY)
+
+    earliest = np.full(wall.shape, INFINITY, dtype='int64')
+    latest = np.full(wall.shape, NEG_INFINITY, dtype='int64')
+    count = np.zeros(wall.shape, dtype='int64')
+    gap = np.zeros(wall.shape, dtype='int64')
+    for back in (2, 1, 0):
+        i = np.maximum(last - back, 0)
+        if back:  # clamped candidates repeat index 0
+            valid = last - back >= 0
+        else:
+            valid = np.ones(wall.shape, dtype=bool)
+        utc = wall - offsets[i]
+        jumped = valid & (i > 0) & (wall - offsets[np.maximum(i - 1, 0)] >= bounds[i]) & (bounds[i] > utc)
+        gap = np.where(jumped, bounds[i], gap)
+        valid &= (bounds[i] <= utc) & (utc < ends[i])
+        earliest = np.where(valid, np.minimum(earliest, utc), earliest)
+        latest = np.where(valid, np.maximum(latest, utc), latest)
+        count += valid
+
+    result = earliest if ambiguous != 'latest' else latest
+    twice = (count > 1) & ~infinite
+    if ambiguous == 'raise' and twice.any():
+        wall_time = EPOCH + timedelta(microseconds=int(wall[twice][0]))
+        raise TimestringInvalid('Ambiguous time in %s: %s' % (table.tz, wall_time))
+    never = (count == 0) & ~infinite
+    if never.any():
+        if nonexistent == 'raise':
+            wall_time = EPOCH + timedelta(microseconds=int(wall[never][0]))
+            raise TimestringInvalid('Nonexistent time in %s: %s' % (table.tz, wall_time))
+        result = np.where(never, gap if nonexistent == 'shift_forward' else gap - 1, result)
+    return np.where(infinite, wall, result)
+
+
+def convert_datetimes(values, tz):
+    """:return: aware datetimes in `tz` for datetimes or Dates (naive ones
+     are taken as UTC), 'infinity' is kept
+    """
+    table = transitions(tz)
+    bounds, offsets, tzinfos = table.transitions, table.offsets, table.tzinfos
+    result = []
+    for value in values:
+        if isinstance(value, Date):
+            value = value.date
+        if value == 'infinity':
+            result.append(value)
+            continue
+        micros = to_micros(value.replace(tzinfo=None) - value.utcoffset() if value.tzinfo else value)
+        i = bisect_right(bounds, micros) - 1
+        result.append((EPOCH + timedelta(microseconds=micros + offsets[i])).replace(tzinfo=tzinfos[i]))
+    return result
+
+
+def localize_datetimes(values, tz, ambiguous='raise', nonexistent='raise'):
+    """:return: aware datetimes in `tz` for naive wall clock datetimes or
+     Dates, 'infinity' is kept. See `localize` for the policies.
+    """
+    _check(ambiguous, nonexistent)
+    table = transitions(tz)
+    result = []
+    for value in values:
+        if isinstance(value, Date):
+            value = value.date
+        if value == 'infinity':
+            result.append(value)
+            continue
+        utc = _resolve(to_micros(value.replace(tzinfo=None)), table, ambiguous, nonexistent)
+        i = table.index(utc)
+        result.append((EPOCH + timedelta(microseconds=utc + table.offsets[i])).replace(tzinfo=table.tzinfos[i]))
+    return result